@@ -0,0 +1,150 @@
+import numpy as np
+
+# Count given to windows in which the group cannot be placed, so that they never have the least covid chairs
+NO_WINDOW = np.iinfo(np.int32).max
+
+
+def _sum_windows(values, first, length, n_windows):
+    """Sums values over windows of columns [first + i, first + i + length) for each i in range(n_windows), for all rows at once
+
+    Args:
+        values (numpy.ndarray(int)): values[row, column]
+        first (int): First column of the first window
+        length (int): Number of columns in a window
+        n_windows (int): Number of windows
+
+    Returns:
+        numpy.ndarray(int): sums[row, i]
+    """
+    cumulative = np.zeros((values.shape[0], values.shape[1] + 1), dtype=np.int32)
+    np.cumsum(values, axis=1, out=cumulative[:, 1:])
+    return (
+        cumulative[:, first + length : first + length + n_windows]
+        - cumulative[:, first : first + n_windows]
+    )
+
+
+def get_window_sums(eligible, group_size: int):
+    """Counts for every window of group_size seats next to each other its eligible seats, and the eligible seats that a group placed there would block in its own row and in the rows above and below it.
+
+    A group occupying columns c up to c + group_size - 1 in row r blocks the seats at columns c - 2, c - 1, c + group_size and c + group_size + 1 in row r, and the seats at columns c - 1 up to c + group_size in the rows r - 1 and r + 1. The counts of all windows are computed at once with prefix sums over the rows.
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column], True if a group can still be placed on the seat
+        group_size (int): Number of seats of the group, at most the number of columns
+
+    Returns:
+        tuple(numpy.ndarray(int32)): free_seats, same_row and adjacent_rows, each [row, column] for the window starting at (row, column)
+    """
+    row_nr, column_nr = eligible.shape
+    n_windows = column_nr - group_size + 1
+
+    # Pad one row above and below, and two columns on both sides, so that window borders never fall outside the grid
+    padded = np.zeros((row_nr + 2, column_nr + 4), dtype=np.int32)
+    padded[1:-1, 2:-2] = eligible
+    same_row = padded[1:-1]
+    adjacent_rows = padded[:-2] + padded[2:]
+
+    # In the padded grid, the window starting at column c spans the columns c + 2 up to c + group_size + 1
+    free_seats = _sum_windows(same_row, 2, group_size, n_windows)
+    same_row_counts = (
+        same_row[:, 0:n_windows]
+        + same_row[:, 1 : 1 + n_windows]
+        + same_row[:, group_size + 2 : group_size + 2 + n_windows]
+        + same_row[:, group_size + 3 : group_size + 3 + n_windows]
+    )
+    adjacent_row_counts = _sum_windows(adjacent_rows, 1, group_size + 2, n_windows)
+    return free_seats, same_row_counts, adjacent_row_counts
+
+
+def get_covid_chair_counts(eligible, group_size: int):
+    """Computes for every window of group_size seats next to each other, the number of eligible seats that would become unavailable by placing a group there (the covid chairs), see get_window_sums.
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column], True if a group can still be placed on the seat
+        group_size (int): Number of seats of the group
+
+    Returns:
+        numpy.ndarray(int32): counts[row, column] for the window starting at (row, column). NO_WINDOW if the group cannot be placed there.
+    """
+    row_nr, column_nr = eligible.shape
+    if column_nr - group_size + 1 <= 0:
+        return np.full((row_nr, 0), NO_WINDOW, dtype=np.int32)
+
+    free_seats, same_row_counts, adjacent_row_counts = get_window_sums(eligible, group_size)
+    counts = same_row_counts + adjacent_row_counts
+    counts[free_seats != group_size] = NO_WINDOW
+    return counts
+
+
+def get_covid_chair_counts_for_run(eligible, run, group_size: int):
+    """Computes the covid chairs of every window of group_size seats inside a single series of eligible seats
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column]
+        run (PlacementPossibility): The series of eligible seats
+        group_size (int): Number of seats of the group
+
+    Returns:
+        numpy.ndarray(int32): counts[i] for the window starting i columns right of the first seat of run
+    """
+    row, column = run.coordinates
+    # Only the seats within corona distance of the series matter: one row above and below it, and two columns to the left and right
+    first_row = max(row - 1, 0)
+    first_column = max(column - 2, 0)
+    band = eligible[first_row : row + 2, first_column : column + run.size + 2]
+    counts = get_covid_chair_counts(band, group_size)
+    first_window = column - first_column
+    return counts[row - first_row, first_window : first_window + run.size - group_size + 1]
+
+
+def get_sliding_covid_chair_counts(eligible, neighboor_table, run, group_size: int):
+    """Computes the covid chairs of every window of group_size seats inside a single series of eligible seats, by sliding the window over the series once.
+
+    Each seat of the series contributes its eligible neighboors. A reference count per neighboor tracks by how many seats of the current window it is blocked, so that moving the window one column only adds the entering seat and removes the exiting seat. This takes O(run.size) time.
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column]
+        neighboor_table (NeighboorTable): Lookup of the neighbooring seats of the cinema
+        run (PlacementPossibility): The series of eligible seats
+        group_size (int): Number of seats of the group
+
+    Returns:
+        list(int): counts[i] for the window starting i columns right of the first seat of run
+    """
+    if group_size > run.size:
+        return []
+    flat_eligible = eligible.reshape(-1)
+    first_seat = neighboor_table.get_index(run.coordinates)
+    contributions = [
+        [
+            neighboor
+            for neighboor in neighboor_table.get_neighboors(first_seat + i)
+            if flat_eligible.item(neighboor)
+        ]
+        for i in range(run.size)
+    ]
+
+    reference_counts = {}
+    blocked = 0
+    # With more than one seat, every seat of the window is a neighboor of another seat of the window, but it is no covid chair
+    own_seats = group_size if group_size > 1 else 0
+
+    counts = []
+    for entering in range(run.size):
+        for neighboor in contributions[entering]:
+            reference_count = reference_counts.get(neighboor, 0)
+            if reference_count == 0:
+                blocked += 1
+            reference_counts[neighboor] = reference_count + 1
+
+        exiting = entering - group_size
+        if exiting >= 0:
+            for neighboor in contributions[exiting]:
+                reference_counts[neighboor] -= 1
+                if reference_counts[neighboor] == 0:
+                    blocked -= 1
+
+        if entering >= group_size - 1:
+            counts.append(blocked - own_seats)
+    return counts
@@ -0,0 +1,447 @@
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from multiprocessing import cpu_count
+import json
+import math
+import os
+import random
+import numpy as np
+from algorithms.covid_chairs import get_window_sums
+from algorithms.online import NoPlacementFoundError, OnlineAlgorithm
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import PlacementPossibility
+from problem.offline_problem import MAX_GROUP_SIZE
+from utils.test_file import generate_group_sequence_from_rng
+
+# File with the fitted scorer that Learned loads
+MODEL_FILE = "models/scorer.json"
+# Features of a window of eligible seats in which the group would be placed, see get_window_feature_grids
+FEATURES = (
+    "covid_chairs_in_row",
+    "covid_chairs_in_adjacent_rows",
+    "slack",
+    "exact_fit",
+    "at_end_of_series",
+    "fragments",
+    "small_fragments",
+    "row_position",
+    "column_position",
+)
+# Sampled halls for training: number of rows and columns, and the chance that a position is a seat
+ROW_RANGE = (4, 14)
+COLUMN_RANGE = (8, 24)
+SEAT_PROBABILITY_RANGE = (0.75, 1.0)
+# Chance that a sampled hall has an empty column or row as aisle
+AISLE_PROBABILITY = 0.5
+# Average group size of generate_group_sequence; sequences bring about this many seats per seat of the hall
+MEAN_GROUP_SIZE = 3.45
+DEMAND = 0.8
+# Number of seconds that the ILP of a sampled hall may take
+TRAIN_TIME_LIMIT = 10
+# Fitting of the scorer per group size, see fit_scorer
+L2_PENALTY = 1e-3
+FIT_STEPS = 500
+LEARNING_RATE = 0.5
+
+
+def _get_series_lengths(eligible):
+    """Counts for every position the eligible seats next to each other that end, and that start, at the position
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column]
+
+    Returns:
+        tuple(numpy.ndarray(int)): left and right, [row, column]; 0 for positions that are not eligible
+    """
+    columns = np.arange(eligible.shape[1])
+    last_blocked = np.maximum.accumulate(np.where(eligible, -1, columns), axis=1)
+    left = columns - last_blocked
+    first_blocked = np.maximum.accumulate(np.where(eligible[:, ::-1], -1, columns), axis=1)
+    right = (columns - first_blocked)[:, ::-1]
+    return left, right
+
+
+def get_window_feature_grids(eligible, group_size: int):
+    """Computes the features of every window of group_size seats next to each other, all at once over the eligibility array.
+
+    The features are the covid chairs in the row of the window and in the rows above and below it, the eligible seats left in the
+    series of the window (slack), whether the window fills its series or starts at an end of it, the number of series that remain on the
+    left and right after the covid chairs and how many of them take less than three seats, and how far the window is from the front or
+    back row and from the side of the hall, as a fraction.
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column], True if a group can still be placed on the seat
+        group_size (int): Number of seats of the group, at most the number of columns
+
+    Returns:
+        tuple(numpy.ndarray(bool), list(numpy.ndarray)): valid[row, column], True if the group fits in the window starting at (row, column),
+        and per feature its values [row, column]; only the values of valid windows are meaningful
+    """
+    row_nr, column_nr = eligible.shape
+    n_windows = column_nr - group_size + 1
+    free_seats, same_row, adjacent_rows = get_window_sums(eligible, group_size)
+    left, right = _get_series_lengths(eligible)
+    left_slack = left[:, :n_windows] - 1
+    right_slack = right[:, group_size - 1 :] - 1
+    slack = left_slack + right_slack
+    # The two seats next to the group are covid chairs, the rest of the slack on each side remains a series
+    left_fragment = left_slack - 2
+    right_fragment = right_slack - 2
+    rows = np.arange(row_nr)[:, None]
+    columns = np.arange(n_windows)
+
+    grids = [
+        same_row,
+        adjacent_rows,
+        slack,
+        slack == 0,
+        (left_slack == 0) | (right_slack == 0),
+        (left_fragment > 0).astype(np.int32) + (right_fragment > 0),
+        ((left_fragment > 0) & (left_fragment < 3)).astype(np.int32) + ((right_fragment > 0) & (right_fragment < 3)),
+        np.minimum(rows, row_nr - 1 - rows) / max(row_nr - 1, 1),
+        np.minimum(columns, column_nr - group_size - columns) / max(column_nr - group_size, 1),
+    ]
+    return free_seats == group_size, grids
+
+
+def get_window_features(eligible, group_size: int):
+    """Gathers the features of the windows in which the group fits, see get_window_feature_grids
+
+    Args:
+        eligible (numpy.ndarray(bool)): eligible[row, column], True if a group can still be placed on the seat
+        group_size (int): Number of seats of the group
+
+    Returns:
+        tuple(numpy.ndarray(float), numpy.ndarray(int), numpy.ndarray(int)): features[window, feature], and the row and column of the most
+        left seat of each window, from the top left to the bottom right
+    """
+    if eligible.shape[1] - group_size + 1 <= 0:
+        return np.zeros((0, len(FEATURES))), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    valid, grids = get_window_feature_grids(eligible, group_size)
+    rows, columns = np.nonzero(valid)
+    features = np.empty((rows.size, len(FEATURES)))
+    for number, grid in enumerate(grids):
+        features[:, number] = np.broadcast_to(grid, valid.shape)[rows, columns]
+    return features, rows, columns
+
+
+class Scorer:
+    """
+    Linear scorer of the windows in which a group can be placed, with a table of weights per group size.
+    The window with the highest score is chosen.
+    ...
+
+    Attributes
+    ----------
+    mean : numpy.ndarray(float)
+        Mean of each feature over the training windows
+    scale : numpy.ndarray(float)
+        Standard deviation of each feature over the training windows
+    weights : numpy.ndarray(float)
+        weights[group size - 1, feature] of the standardized features
+    """
+
+    def __init__(self, mean, scale, weights) -> None:
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        # Standardizing only adds the same constant to the scores of all windows, so the weights can be applied to the features directly
+        self.raw_weights = self.weights / self.scale
+
+    @classmethod
+    def from_file(cls, path):
+        """Reads a scorer that was written by save
+
+        Args:
+            path (str): JSON file
+
+        Raises:
+            ValueError: If the scorer was fitted on other features
+
+        Returns:
+            Scorer
+        """
+        with open(path) as file:
+            model = json.load(file)
+        if tuple(model["features"]) != FEATURES:
+            raise ValueError("scorer in", path, "was fitted on the features", model["features"], "instead of", FEATURES)
+        return cls(model["mean"], model["scale"], model["weights"])
+
+    def save(self, path):
+        """Writes the scorer to a JSON file
+
+        Args:
+            path (str): JSON file
+        """
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        model = {
+            "features": list(FEATURES),
+            "mean": np.round(self.mean, 6).tolist(),
+            "scale": np.round(self.scale, 6).tolist(),
+            "weights": np.round(self.weights, 6).tolist(),
+        }
+        with open(path, "w") as file:
+            json.dump(model, file, indent=1)
+
+    def score(self, features, group_size):
+        """Scores windows for a group
+
+        Args:
+            features (numpy.ndarray(float)): features[window, feature], from get_window_features
+            group_size (int): Number of seats of the group
+
+        Returns:
+            numpy.ndarray(float): Score per window
+        """
+        return features @ self.raw_weights[group_size - 1]
+
+    def score_grid(self, eligible, group_size):
+        """Scores all windows for a group at once, without gathering their features first
+
+        Args:
+            eligible (numpy.ndarray(bool)): eligible[row, column], True if a group can still be placed on the seat
+            group_size (int): Number of seats of the group
+
+        Returns:
+            numpy.ndarray(float): scores[row, column] of the window starting at (row, column), -inf if the group does not fit there
+        """
+        row_nr, column_nr = eligible.shape
+        if column_nr - group_size + 1 <= 0:
+            return np.full((row_nr, 0), -np.inf)
+
+        valid, grids = get_window_feature_grids(eligible, group_size)
+        scores = np.zeros(valid.shape)
+        for weight, grid in zip(self.raw_weights[group_size - 1], grids):
+            scores += weight * grid
+        scores[~valid] = -np.inf
+        return scores
+
+
+@lru_cache(maxsize=None)
+def load_scorer(path=MODEL_FILE):
+    """Reads the scorer in the given file once per process
+
+    Args:
+        path (str, optional): JSON file. Defaults to MODEL_FILE.
+
+    Returns:
+        Scorer
+    """
+    return Scorer.from_file(path)
+
+
+class Learned(OnlineAlgorithm):
+    """
+    Places each group in the window with the highest score of a linear Scorer, which was fitted on the seatings of the offline ILP, see train_scorer.
+    The scores of all windows are computed at once over the eligibility array, as Greedy does for the covid chairs. On ties, the window nearest to the top left is chosen.
+    ...
+
+    Attributes
+    ----------
+    scorer : Scorer
+        The fitted scorer, read from its file once per process
+    """
+
+    def __init__(self, *args, model_file=MODEL_FILE, **kwargs) -> None:
+        """
+        Args:
+            model_file (str, optional): File of the scorer. Defaults to MODEL_FILE.
+            For the other arguments, see OnlineAlgorithm.
+        """
+        self.scorer = load_scorer(model_file)
+        super().__init__(*args, **kwargs)
+
+    def choose_candidate(self, options):
+        scores = self.scorer.score_grid(self.cinema.eligible, self.group_size)
+
+        # argmax keeps the first of the best windows, scanning from the top left
+        index = int(np.argmax(scores)) if scores.size else 0
+        if scores.size == 0 or scores.flat[index] == -np.inf:
+            raise NoPlacementFoundError(self.group_size)
+
+        row, column = divmod(index, scores.shape[1])
+        return PlacementPossibility(self.group_size, (row, column))
+
+
+def sample_hall(rng):
+    """Samples the grid of a hall for training
+
+    Args:
+        rng (random.Random): Random generator
+
+    Returns:
+        list(list(int)): grid[row][column], 1 for a seat
+    """
+    row_nr = rng.randint(*ROW_RANGE)
+    column_nr = rng.randint(*COLUMN_RANGE)
+    probability = rng.uniform(*SEAT_PROBABILITY_RANGE)
+    grid = [[int(rng.random() < probability) for _ in range(column_nr)] for _ in range(row_nr)]
+    if rng.random() < AISLE_PROBABILITY:
+        aisle = rng.randrange(column_nr)
+        for row in grid:
+            row[aisle] = 0
+    if rng.random() < AISLE_PROBABILITY:
+        grid[rng.randrange(row_nr)] = [0] * column_nr
+    return grid
+
+
+def sample_group_sequence(grid, rng):
+    """Samples the groups that arrive for a hall, with about DEMAND times as many people as seats
+
+    Args:
+        grid (list(list(int))): grid[row][column], 1 for a seat
+        rng (random.Random): Random generator
+
+    Returns:
+        list(int): Group sizes
+    """
+    n = max(math.ceil(DEMAND * sum(map(sum, grid)) / MEAN_GROUP_SIZE), 1)
+    return generate_group_sequence_from_rng(n, rng)
+
+
+def solve_offline(grid, group_sizes, time_limit=TRAIN_TIME_LIMIT):
+    """Seats the groups with the offline ILP, as if all of them were known in advance
+
+    Args:
+        grid (list(list(int))): grid[row][column], 1 for a seat
+        group_sizes (list(int)): Group sizes
+        time_limit (int, optional): Number of seconds that the ILP may take. Defaults to TRAIN_TIME_LIMIT.
+
+    Returns:
+        list(tuple(int, int, int)): (row, column, size) of each seated group
+    """
+    # Imported here, since the offline problem imports the online algorithms for its first solution
+    from problem.matrix_problem import MatrixProblem
+
+    counts = [group_sizes.count(size) for size in range(1, MAX_GROUP_SIZE + 1)]
+    p = MatrixProblem(grid, counts, len(grid), len(grid[0]), [0] * MAX_GROUP_SIZE)
+    p.get_solution(time_limit)
+    return list(p.solution.placements)
+
+
+def get_decisions(grid, group_sizes, placements):
+    """Replays the offline seating in the order in which the groups arrive. Each group that the ILP seated gives one decision
+    between all windows in which it fits at that moment, of which the windows of its size in the offline seating that are still free are chosen.
+    The group is then placed in the first of these. Groups that the ILP did not seat are skipped.
+
+    Args:
+        grid (list(list(int))): grid[row][column], 1 for a seat
+        group_sizes (list(int)): Group sizes in the order of arrival
+        placements (list(tuple(int, int, int))): (row, column, size) of each group in the offline seating
+
+    Returns:
+        list(tuple(int, numpy.ndarray(float), numpy.ndarray(bool))): Group size, features[window, feature] and whether each window was chosen,
+        for the decisions with more than one window
+    """
+    cinema = ArrayCinema(grid, len(grid), len(grid[0]))
+    remaining = {size: [] for size in range(1, MAX_GROUP_SIZE + 1)}
+    for row, column, size in placements:
+        remaining[size].append((row, column))
+
+    decisions = []
+    for size in group_sizes:
+        if not remaining[size]:
+            continue
+        features, rows, columns = get_window_features(cinema.eligible, size)
+        chosen = np.isin(rows * cinema.column_nr + columns, [row * cinema.column_nr + column for row, column in remaining[size]])
+        if rows.size > 1 and not chosen.all():
+            decisions.append((size, features, chosen))
+        cinema.place_group(remaining[size].pop(0), size)
+    return decisions
+
+
+def collect_decisions(seed, time_limit=TRAIN_TIME_LIMIT):
+    """Samples a hall and a group sequence, seats it with the offline ILP and gets the decisions of the seating. Runs in a worker process of train_scorer.
+
+    Args:
+        seed (?): Seed of the hall and the group sequence
+        time_limit (int, optional): Number of seconds that the ILP may take. Defaults to TRAIN_TIME_LIMIT.
+
+    Returns:
+        list(tuple(int, numpy.ndarray(float), numpy.ndarray(bool))): see get_decisions
+    """
+    rng = random.Random(seed)
+    grid = sample_hall(rng)
+    group_sizes = sample_group_sequence(grid, rng)
+    return get_decisions(grid, group_sizes, solve_offline(grid, group_sizes, time_limit))
+
+
+def fit_weights(features, chosen, decision_starts, steps=FIT_STEPS, learning_rate=LEARNING_RATE, l2_penalty=L2_PENALTY):
+    """Fits the weights of a conditional logit model on decisions: the chance that a window is chosen is proportional to the exponent of its score.
+    Maximizes the log likelihood of choosing one of the chosen windows of every decision with gradient ascent, with an L2 penalty on the weights.
+
+    Args:
+        features (numpy.ndarray(float)): Standardized features[window, feature] of the windows of all decisions
+        chosen (numpy.ndarray(bool)): Whether each window was chosen
+        decision_starts (numpy.ndarray(int)): Index of the first window of each decision
+        steps (int, optional): Number of gradient steps. Defaults to FIT_STEPS.
+        learning_rate (float, optional): Size of the gradient steps. Defaults to LEARNING_RATE.
+        l2_penalty (float, optional): Weight of the L2 penalty. Defaults to L2_PENALTY.
+
+    Returns:
+        numpy.ndarray(float): Weight per feature
+    """
+    decision_of_window = np.repeat(np.arange(decision_starts.size), np.diff(np.append(decision_starts, chosen.size)))
+    weights = np.zeros(features.shape[1])
+    for _ in range(steps):
+        scores = features @ weights
+        scores -= np.maximum.reduceat(scores, decision_starts)[decision_of_window]
+        exponents = np.exp(scores)
+        # Chance of each window among all windows, and among the chosen windows of its decision
+        probabilities = exponents / np.add.reduceat(exponents, decision_starts)[decision_of_window]
+        chosen_exponents = exponents * chosen
+        chosen_probabilities = chosen_exponents / np.add.reduceat(chosen_exponents, decision_starts)[decision_of_window]
+        gradient = features.T @ (chosen_probabilities - probabilities) / decision_starts.size - l2_penalty * weights
+        weights += learning_rate * gradient
+    return weights
+
+
+def fit_scorer(decisions):
+    """Fits a scorer with a table of weights per group size on the decisions of offline seatings
+
+    Args:
+        decisions (list(tuple(int, numpy.ndarray(float), numpy.ndarray(bool)))): see get_decisions
+
+    Returns:
+        Scorer
+    """
+    all_features = np.concatenate([features for _, features, _ in decisions])
+    mean = all_features.mean(axis=0)
+    scale = all_features.std(axis=0)
+    scale[scale == 0] = 1
+
+    weights = np.zeros((MAX_GROUP_SIZE, len(FEATURES)))
+    for size in range(1, MAX_GROUP_SIZE + 1):
+        size_decisions = [(features, chosen) for group_size, features, chosen in decisions if group_size == size]
+        if not size_decisions:
+            continue
+        features = (np.concatenate([features for features, _ in size_decisions]) - mean) / scale
+        chosen = np.concatenate([chosen for _, chosen in size_decisions])
+        decision_starts = np.cumsum([0] + [len(chosen) for _, chosen in size_decisions[:-1]])
+        weights[size - 1] = fit_weights(features, chosen, decision_starts)
+    return Scorer(mean, scale, weights)
+
+
+def train_scorer(n_halls, seed=0, n_jobs=None, path=MODEL_FILE, time_limit=TRAIN_TIME_LIMIT):
+    """Solves the offline ILP for n_halls sampled halls and group sequences in parallel, fits a scorer on their decisions and writes it to a file
+
+    Args:
+        n_halls (int): Number of sampled halls
+        seed (int, optional): Seed of the first hall, the others get the next seeds. Defaults to 0.
+        n_jobs (int, optional): Number of worker processes. Defaults to the number of cores.
+        path (str, optional): File of the scorer. Defaults to MODEL_FILE.
+        time_limit (int, optional): Number of seconds that each ILP may take. Defaults to TRAIN_TIME_LIMIT.
+
+    Returns:
+        tuple(Scorer, int): The scorer and the number of decisions it was fitted on
+    """
+    seeds = range(seed, seed + n_halls)
+    with ProcessPoolExecutor(max_workers=n_jobs or cpu_count()) as executor:
+        results = executor.map(collect_decisions, seeds, [time_limit] * n_halls)
+        decisions = [decision for result in results for decision in result]
+    scorer = fit_scorer(decisions)
+    scorer.save(path)
+    return scorer, len(decisions)
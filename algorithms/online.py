@@ -1,10 +1,27 @@
 from abc import abstractmethod
-from problem.entities.cinema import PlacementPossibility
+from itertools import chain, islice, permutations
+from problem.entities.cinema import Cinema, PlacementPossibility
 from problem.problem import Online
 from problem.entities.groups import OnlineGroups
-from logger.complete_logger import get_logger, dummy_logger
+from logger.complete_logger import get_logger, dummy_logger, close_logger
+from logger.trace import PlacementTrace
+from algorithms.covid_chairs import (
+    NO_WINDOW,
+    get_covid_chair_counts,
+    get_covid_chair_counts_for_run,
+    get_sliding_covid_chair_counts,
+)
+import numpy as np
 import abc
 import random
+import time
+
+# Number of seconds that choosing the placements of a batch of groups may take, see OnlineAlgorithm.seat_batch
+BATCH_TIME_BUDGET = 0.2
+# Number of orders of a batch of groups that are tried at most
+MAX_BATCH_ORDERS = 120
+# Number of groups in a batch at most. Orders that only swap groups of the same size are skipped one by one, which takes up to factorial of this.
+MAX_BATCH_SIZE = 8
 
 
 class NoGroupsLeftError(Exception):
@@ -31,26 +48,60 @@ class OnlineAlgorithm(abc.ABC):
 
     NO_PLACE_INDICATION = "0 0"
 
-    def __init__(self, filepath) -> None:
+    # Defaults for the run settings of execute
+    report = True
+    trace = None
+
+    def __init__(self, filepath=None, cinema_class=Cinema, template=None) -> None:
+        """
+        Args:
+            filepath (str, optional): Path to the input file with the cinema grid and the group sequence
+            cinema_class (type, optional): Backend that holds the seating state: Cinema (objects per position) or ArrayCinema (NumPy arrays). Defaults to Cinema.
+            template (CinemaTemplate, optional): Already parsed input, used instead of filepath so that the file does not have to be read again.
+        """
+        if filepath is None and template is None:
+            raise ValueError("Either a filepath or a template should be given.")
         self.filepath = filepath
+        self.cinema_class = cinema_class
+        self.template = template
         self._init_state()
 
     def _init_state(self):
-        """Initiates the state of the online algorithm object. It sets the cinema and group attributes based on the filepath given during instantiation.
+        """Initiates the state of the online algorithm object. It sets the cinema and group attributes based on the template or filepath given during instantiation.
+        """
+        if self.template is not None:
+            self.cinema = self.template.build(self.cinema_class)
+            self.groups = OnlineGroups(list(self.template.groups))
+        else:
+            problem = Online(self.filepath, self.cinema_class)
+            self.cinema = problem.cinema
+            self.groups = problem.groups
+        self._initial_state = (self.cinema.snapshot(), self.groups.get_remaining_groups())
+
+    def reset_state(self):
+        """Resets the cinema and the groups to the state when the object was instantiated, without reading the input or building the cinema again
+        """
+        cinema_snapshot, groups = self._initial_state
+        self.cinema.restore(cinema_snapshot)
+        self.groups = OnlineGroups(groups)
+
+    def run_many(self, group_sequences, **execute_kwargs) -> list:
+        """Runs the algorithm for each group sequence on the empty cinema. The parsed grid and the neighboor table are reused, so each sequence only costs the placement work.
+
+        Args:
+            group_sequences (list(list(int))): Group sequences to place
+            execute_kwargs: Passed on to execute
+
+        Returns:
+            list(int): The number of filled seats for each group sequence
         """
-        problem = Online(self.filepath)
-        self.cinema = problem.cinema
-        self.groups = problem.groups
-
-    # def reset_state(self):
-    #     """Resets the object's state to the original state when the object was instantiated
-    #     """
-    #     attrs = vars(self).keys()
-    #     for attr in attrs:
-    #         if attr == "filepath":
-    #             continue
-    #         delattr(self, attr)
-    #     self._init_state()
+        results = []
+        for groups in group_sequences:
+            self.reset_state()
+            self.set_new_groups(groups)
+            self.execute(**execute_kwargs)
+            results.append(self.filled_seats)
+        return results
 
     def set_new_groups(self, group_list: list):
         """Overrides the groups from the grid text file. Can be used to run the algorithm on user defined group sequence.
@@ -73,10 +124,10 @@ class OnlineAlgorithm(abc.ABC):
         """
         try:
             group_size = self.groups.get_next_group()
-            self.logger.info(f"Group size to be placed: {group_size}")
+            self.logger.info("Group size to be placed: %s", group_size)
 
         except IndexError as err:
-            self.logger.warning(f"No more groups in deque before 0 is reached")
+            self.logger.warning("No more groups in deque before 0 is reached")
             self.logger.debug(err)
             raise NoGroupsLeftError
         if group_size == 0:
@@ -100,13 +151,16 @@ class OnlineAlgorithm(abc.ABC):
         self.logger.info(self.cinema)
 
         options = self.cinema.get_placement_possibilities()
-        self.logger.info(f"Number of remaining options: {len(options)}")
+        self.logger.info("Number of remaining options: %s", len(options))
         return options
 
     @abstractmethod
-    def choose_candidate(self) -> PlacementPossibility:
+    def choose_candidate(self, options) -> PlacementPossibility:
         """Chooses which placement possibility is used to place the current group. Must be implemented in each algorithm variant specifically.
 
+        Args:
+            options (FreeRunIndex): The uninterrupted series of eligible seats in the cinema. Iterating over it yields PlacementPossibility objects from the top left to the bottom right of the grid, and it can be queried for the best, worst or first fit.
+
         Returns:
             PlacementPossibility
         """
@@ -118,79 +172,256 @@ class OnlineAlgorithm(abc.ABC):
         Args:
             placement (PlacementPossibility)
         """
-        self.cinema.place_group(
-            placement.coordinates, self.group_size, str(self.counter)
-        )
+        self.cinema.place_group(placement.coordinates, self.group_size, self.counter)
         self.logger.info(
-            f"Group of size: {self.group_size} is placed at placement {placement.coordinates} of size {placement.size}"
+            "Group of size: %s is placed at placement %s of size %s",
+            self.group_size,
+            placement.coordinates,
+            placement.size,
         )
+        if self.trace is not None:
+            self.trace.record_placement(
+                self.counter, self.group_size, placement.coordinates
+            )
         # Requirement: report where the group is placed:
-        print(
-            self.convert_position_coordinates_to_row_and_col_number(
-                placement.coordinates
+        if self.report:
+            print(
+                self.convert_position_coordinates_to_row_and_col_number(
+                    placement.coordinates
+                )
             )
-        )
 
     @staticmethod
     def convert_position_coordinates_to_row_and_col_number(position_tuple):
         return f"{position_tuple[0] + 1} {position_tuple[1] + 1}"
 
-    def log_end_results(self, folder):
-        logger = get_logger(f"{self.__class__.__name__}_results", subfolder=folder)
-        logger.info(
-            f"Execution is stopped after an attempt to place the '{self.counter}' group"
+    def log_end_results(self):
+        self.logger.info(
+            "Execution is stopped after an attempt to place the '%s' group", self.counter
+        )
+        self.logger.info("%s number of seats were filled", self.filled_seats)
+        self.logger.info(
+            "%s number of remaining free seats", self.get_remaining_free_seats()
         )
-        logger.info(f"{self.filled_seats} number of seats were filled")
-        remaining = self.get_remaining_free_seats()
-        logger.info(f"{remaining} number of remaining free seats")
 
-    def execute(self, logging_folder=None, log_grid=True):
-        """Runs the algorithm
+    def start_run(self, logging_folder=None, trace_file=None, report=True):
+        """Prepares the logger, the trace and the counters for placing groups one at a time with seat_group
 
         Args:
-            logging_folder (str, optional): Determines where the logs are stored in the log folder. If kept as 'None', no logs will be made. Defaults to None.
-            log_grid (bool, optional): Determines if the grid prints will be saved in the logs. Defaults to True.
-
-        Returns:
-            Cinema
+            logging_folder (str, optional): Determines where the log of this run is stored in the log folder. If kept as 'None', no logs will be made and no log messages are formatted. Defaults to None.
+            trace_file (str, optional): Path of a .jsonl file in which only the placement events of this run are recorded, see PlacementTrace. Defaults to None.
+            report (bool, optional): Determines if the placements are printed. Defaults to True.
         """
         if logging_folder:
             print("Logs will be saved in:", logging_folder)
+            self.logger = get_logger(self.__class__.__name__, subfolder=logging_folder)
+        else:
+            self.logger = dummy_logger()
+        self.trace = PlacementTrace(trace_file) if trace_file else None
+        self.report = report
         self.counter = 0
         self.filled_seats = 0
-        while True:
-            self.counter += 1
-            if logging_folder:
-                self.logger = get_logger(
-                    f"{self.__class__.__name__}-{str(self.counter)}",
-                    subfolder=logging_folder + "/groups",
-                )
-            else:
-                self.logger = dummy_logger()
-            if log_grid:
-                self.logger.info(self.cinema)
-            try:
-                self.group_size = self.get_next_group()
-            except NoGroupsLeftError as err:
-                print(err)
-                break
+        # Groups are placed with the counter as id, so the ids of an earlier run on this cinema are forgotten
+        self.cinema.group_seats = {}
 
-            self.get_remaining_free_seats()
+    def seat_group(self, group_size):
+        """Places one group in the cinema, if there is a placement for it. The run must have been started with start_run.
 
-            free_seat_options = self.cinema.get_placement_possibilities()
+        Args:
+            group_size (int): The size of the group
 
-            try:
-                placement = self.choose_candidate(free_seat_options)
-            except NoPlacementFoundError as err:
-                self.logger.info(err)
+        Returns:
+            tuple(int, int): (row, column) of the most left seat of the group, or None if no placement was found
+        """
+        self.counter += 1
+        self.group_size = group_size
+        try:
+            placement = self.choose_candidate(self.cinema.free_runs)
+        except NoPlacementFoundError as err:
+            self.logger.info(err)
+            if self.trace is not None:
+                self.trace.record_no_placement(self.counter, self.group_size)
+            if self.report:
                 print(self.NO_PLACE_INDICATION)
+            return None
+
+        self.place_candidate(placement)
+        self.filled_seats += self.group_size
+        return placement.coordinates
+
+    def release_group(self, group_id):
+        """Frees the seats of a group that was seated in this run, for example when it cancels, so that later groups can be seated there
+
+        Args:
+            group_id (int): Number of the group in the run, starting at 1, which is the id it was placed with
+
+        Raises:
+            KeyError: If the group is not seated
+
+        Returns:
+            tuple(tuple(int, int)): Coordinates of the seats that the group occupied
+        """
+        seats = self.cinema.release_group(group_id)
+        self.filled_seats -= len(seats)
+        self.logger.info("Group %s of size %s is released from placement %s", group_id, len(seats), seats[0])
+        return seats
+
+    def try_batch_order(self, group_sizes, order):
+        """Places a batch of groups one at a time in the given order, each with choose_candidate. The cinema is not restored afterwards.
+
+        Args:
+            group_sizes (list(int)): The sizes of the groups in the batch, in the order in which they arrived
+            order (tuple(int)): Indices in group_sizes, in the order in which the groups are placed
+
+        Returns:
+            list(tuple(int, int)): Per group in group_sizes the (row, column) of its most left seat, or None if it was not placed
+        """
+        placements = [None] * len(group_sizes)
+        for index in order:
+            self.group_size = group_sizes[index]
+            try:
+                placement = self.choose_candidate(self.cinema.free_runs)
+            except NoPlacementFoundError:
+                continue
+            self.cinema.place_group(placement.coordinates, self.group_size)
+            placements[index] = placement.coordinates
+        return placements
+
+    def solve_batch_exactly(self, group_sizes, time_limit):
+        """Places as many seats of a batch of groups as possible, by solving the offline ILP on the eligible seats
+
+        Args:
+            group_sizes (list(int)): The sizes of the groups in the batch, in the order in which they arrived
+            time_limit (float): Number of seconds that the solver may take
+
+        Returns:
+            list(tuple(int, int)): Per group in group_sizes the (row, column) of its most left seat, or None if it was not placed
+        """
+        # The solver imports the online algorithms for its warm start
+        from problem.matrix_problem import MatrixProblem
+        from problem.offline_problem import MAX_GROUP_SIZE
+
+        number_of_groups = [group_sizes.count(size) for size in range(1, MAX_GROUP_SIZE + 1)]
+        grid = self.cinema.eligible.astype(int).tolist()
+        p = MatrixProblem(grid, number_of_groups, self.cinema.row_nr, self.cinema.column_nr, [0] * MAX_GROUP_SIZE)
+        p.get_solution(time_limit)
+        placements = [None] * len(group_sizes)
+        for row, column, size in p.solution.placements:
+            # The groups of the same size get the placements in the order in which they arrived
+            index = next(index for index, group_size in enumerate(group_sizes) if group_size == size and placements[index] is None)
+            placements[index] = (row, column)
+        return placements
+
+    def seat_batch(self, group_sizes, time_budget=BATCH_TIME_BUDGET, exact=True):
+        """Places a batch of groups that arrived together, choosing their placements jointly instead of one at a time.
+        The groups are placed with choose_candidate in several orders, largest groups first and in the order of arrival first,
+        and the order that seats the most people is kept. On a tie, the order that leaves the most eligible seats is kept.
+        If no order seats all groups, the offline ILP on the eligible seats is solved as well in the rest of the time budget,
+        unless the best order already takes every eligible seat or no group fits in the eligible seats.
+        The run must have been started with start_run.
+
+        Args:
+            group_sizes (list(int)): The sizes of the groups in the batch, in the order in which they arrived
+            time_budget (float, optional): Number of seconds after which no more orders are tried and the ILP is not started. Defaults to BATCH_TIME_BUDGET.
+            exact (bool, optional): Determines if the ILP is solved when no order seats all groups. Defaults to True.
+
+        Returns:
+            list(tuple(int, int)): Per group in group_sizes the (row, column) of its most left seat, or None if it was not placed
+        """
+        start = time.perf_counter()
+        snapshot = self.cinema.snapshot()
+        eligible_seats = int(self.cinema.eligible.sum())
+        best_score, best_placements = None, None
+        for order in islice(get_batch_orders(group_sizes), MAX_BATCH_ORDERS):
+            if best_score is not None and time.perf_counter() - start > time_budget:
+                break
+            placements = self.try_batch_order(group_sizes, order)
+            seats = sum(size for size, placement in zip(group_sizes, placements) if placement is not None)
+            score = (seats, int(self.cinema.eligible.sum()))
+            self.cinema.restore(snapshot)
+            if best_score is None or score > best_score:
+                best_score, best_placements = score, placements
+
+        # No seating takes more seats than are eligible, so then the ILP cannot seat more people than the best order
+        remaining_time = time_budget - (time.perf_counter() - start)
+        if (
+            exact
+            and best_score[0] < min(sum(group_sizes), eligible_seats)
+            and min(group_sizes) <= eligible_seats
+            and remaining_time > 0
+        ):
+            placements = self.solve_batch_exactly(group_sizes, remaining_time)
+            if sum(size for size, placement in zip(group_sizes, placements) if placement is not None) > best_score[0]:
+                best_placements = placements
+
+        # The placements keep their distance from each other, so they can be made in the order of arrival
+        first_counter = self.counter
+        for index, (group_size, coordinates) in enumerate(zip(group_sizes, best_placements)):
+            self.counter = first_counter + index + 1
+            self.group_size = group_size
+            if coordinates is None:
+                self.logger.info(NoPlacementFoundError(group_size))
+                if self.trace is not None:
+                    self.trace.record_no_placement(self.counter, group_size)
+                if self.report:
+                    print(self.NO_PLACE_INDICATION)
                 continue
+            self.place_candidate(PlacementPossibility(group_size, coordinates))
+            self.filled_seats += group_size
+        return best_placements
+
+    def execute(self, logging_folder=None, log_grid=True, trace_file=None, report=True, batch_size=1):
+        """Runs the algorithm
+
+        Args:
+            logging_folder (str, optional): Determines where the log of this run is stored in the log folder. All groups of the run are logged to one file. If kept as 'None', no logs will be made and no log messages are formatted. Defaults to None.
+            log_grid (bool, optional): Determines if the grid prints will be saved in the logs. Defaults to True.
+            trace_file (str, optional): Path of a .jsonl file in which only the placement events of this run are recorded, see PlacementTrace. Defaults to None.
+            report (bool, optional): Determines if the placements and the number of filled seats are printed. Defaults to True.
+            batch_size (int, optional): Number of groups that are placed together with seat_batch, from 1 up to MAX_BATCH_SIZE. With 1, every group is placed as soon as it arrives. Defaults to 1.
+
+        Raises:
+            ValueError: If batch_size is smaller than 1 or larger than MAX_BATCH_SIZE
 
-            self.place_candidate(placement)
-            self.filled_seats += self.group_size
+        Returns:
+            Cinema
+        """
+        if not 1 <= batch_size <= MAX_BATCH_SIZE:
+            raise ValueError("batch_size should be from 1 up to", MAX_BATCH_SIZE, "but is", batch_size)
+        self.start_run(logging_folder, trace_file, report)
+        try:
+            groups_left = True
+            while groups_left:
+                if log_grid:
+                    self.logger.info(self.cinema)
+                batch = []
+                try:
+                    while len(batch) < batch_size:
+                        batch.append(self.get_next_group())
+                except NoGroupsLeftError as err:
+                    groups_left = False
+                    end_message = err
+
+                if batch_size == 1 and batch:
+                    self.seat_group(batch[0])
+                elif batch:
+                    self.seat_batch(batch)
+
+            # The attempt to place the next group counts, as in the log of the end results
+            self.counter += 1
+            if report:
+                print(end_message)
 
-        self.log_end_results(logging_folder)
-        print(f"filled seats = {self.filled_seats}")
+            if logging_folder:
+                self.log_end_results()
+        finally:
+            if self.trace is not None:
+                self.trace.close()
+            if logging_folder:
+                close_logger(self.logger)
+
+        if report:
+            print(f"filled seats = {self.filled_seats}")
         return self.cinema
 
     def get_number_of_covid_seats_for_placement_possibility(
@@ -216,17 +447,12 @@ class BestFit(OnlineAlgorithm):
 
     def choose_candidate(self, options):
 
-        candidates = filter_placement_possibilities_on_minimum_size(
-            options, self.group_size
-        )
+        candidate = options.smallest_at_least(self.group_size)
 
-        if not candidates:
+        if candidate is None:
             raise NoPlacementFoundError(self.group_size)
 
-        option_sizes = [size for size in candidates.keys()]
-        self.logger.info(f"Sizes of options are: {option_sizes}")
-
-        return candidates[min(candidates.keys())][0]
+        return candidate
 
 
 class FirstFit(OnlineAlgorithm):
@@ -234,130 +460,152 @@ class FirstFit(OnlineAlgorithm):
 
     def choose_candidate(self, options):
 
-        found_placement = False
-        for option in options:
-            if option.size >= self.group_size:
-                return option
+        candidate = options.first_at_least(self.group_size)
 
-        if not found_placement:
+        if candidate is None:
             raise NoPlacementFoundError(self.group_size)
 
+        return candidate
+
 
 class WorstFit(OnlineAlgorithm):
     """Opposite of BestFit. It will use the largest bin size"""
 
     def choose_candidate(self, options):
 
-        candidates = filter_placement_possibilities_on_minimum_size(
-            options, self.group_size
-        )
-        if not candidates:
-            raise NoPlacementFoundError(self.group_size)
+        candidate = options.largest()
 
-        option_sizes = [size for size in candidates.keys()]
-        self.logger.info(f"Sizes of options are: {option_sizes}")
+        if candidate is None or candidate.size < self.group_size:
+            raise NoPlacementFoundError(self.group_size)
 
-        return candidates[max(candidates.keys())][0]
+        return candidate
 
 
-class Hybrid(OnlineAlgorithm):
+class CovidChairAlgorithm(OnlineAlgorithm):
     """
-    A merge between the BestFit algorithm and the Greedy algorithm. Will perform BestFit first for each group. Then, it uses Greedy as tiebreaker for the best possibilities that BestFit found.
+    Base class for the algorithms that choose between placements on the number of covid chairs: the eligible seats that would become unavailable by the placement.
+    ...
+
+    Attributes
+    ----------
+    scoring : str
+        How the covid chairs of the windows in a series of eligible seats are counted:
+        "prefix_sums" evaluates all windows at once in vectorised form over the eligibility array,
+        "sliding_window" walks the series once and only adds and removes the neighboors of the seats that enter and exit the window.
+        Both lead to the same placements.
     """
 
-    def choose_candidate(self, options):
-        placement_possibilities = filter_placement_possibilities_on_minimum_size(
-            options, self.group_size
-        )
+    SCORING_MODES = ("prefix_sums", "sliding_window")
 
-        if not placement_possibilities:
-            raise NoPlacementFoundError(self.group_size)
+    def __init__(self, *args, scoring="prefix_sums", **kwargs) -> None:
+        if scoring not in self.SCORING_MODES:
+            raise ValueError(
+                "scoring argument should be one of", self.SCORING_MODES, "but is", scoring
+            )
+        self.scoring = scoring
+        super().__init__(*args, **kwargs)
 
-        # Select best fitting first bin from possibilities:
-        selected_bin = placement_possibilities[min(placement_possibilities.keys())][0]
+    def get_covid_chairs_for_run(self, run):
+        """Counts the covid chairs of every window of the current group size within a series of eligible seats
 
-        try:
-            sub_possibilities = selected_bin.get_sub_possibilities(self.group_size)
-        except Exception as err:
-            if selected_bin.size < self.group_size:
-                self.logger.debug(err)
-                raise NoPlacementFoundError(self.group_size)
-            else:
-                raise
-
-        # Determine for each sub possibility the number of covid chairs that it would result into
-        candidates = {}
-        for possibility in sub_possibilities:
-            covid_chairs = self.get_number_of_covid_seats_for_placement_possibility(
-                possibility
+        Args:
+            run (PlacementPossibility): The series of eligible seats
+
+        Returns:
+            list(int): counts[i] for the window starting i columns right of the first seat of run
+        """
+        if self.scoring == "sliding_window":
+            return get_sliding_covid_chair_counts(
+                self.cinema.eligible, self.cinema.neighboor_table, run, self.group_size
             )
-            if covid_chairs not in candidates:
-                candidates.update({covid_chairs: [possibility]})
-            else:
-                candidates[covid_chairs].append(possibility)
+        return get_covid_chair_counts_for_run(
+            self.cinema.eligible, run, self.group_size
+        ).tolist()
+
+    def get_least_covid_chairs_window(self, runs):
+        """Finds the window with the least covid chairs in the given series of eligible seats. The first one found is kept on ties.
 
-        if not candidates:
+        Args:
+            runs (iterable(PlacementPossibility)): The series of eligible seats, that are all large enough for the current group
+
+        Raises:
+            NoPlacementFoundError: If there are no series
+
+        Returns:
+            PlacementPossibility
+        """
+        least_covid_chairs = None
+        best_window = None
+        for run in runs:
+            covid_chairs = self.get_covid_chairs_for_run(run)
+            offset = min(range(len(covid_chairs)), key=covid_chairs.__getitem__)
+            if least_covid_chairs is None or covid_chairs[offset] < least_covid_chairs:
+                least_covid_chairs = covid_chairs[offset]
+                row, column = run.coordinates
+                best_window = PlacementPossibility(self.group_size, (row, column + offset))
+
+        if best_window is None:
             raise NoPlacementFoundError(self.group_size)
+        return best_window
 
-        # Return the first candidate from the least covid chairs candidates
-        return candidates[min(candidates.keys())][0]
 
+class Hybrid(CovidChairAlgorithm):
+    """
+    A merge between the BestFit algorithm and the Greedy algorithm. Will perform BestFit first for each group. Then, it uses Greedy as tiebreaker for the best possibilities that BestFit found.
+    """
+
+    def choose_candidate(self, options):
+        # Select best fitting first bin from possibilities:
+        selected_bin = options.smallest_at_least(self.group_size)
+
+        if selected_bin is None:
+            raise NoPlacementFoundError(self.group_size)
+
+        # Return the first sub possibility with the least covid chairs
+        return self.get_least_covid_chairs_window([selected_bin])
 
-class Greedy(OnlineAlgorithm):
+
+class Greedy(CovidChairAlgorithm):
     """
     Searches for a spot in the cinema for the group that leads to the list extra seats that are made unavaible due to corona distance.
     """
 
     def choose_candidate(self, options):
-
-        # Gather all sub possibilities from which a super possibility consists:
-        sub_possibilities = []
-        for super_possibility in options:
-            try:
-                new_sub_possibilities = super_possibility.get_sub_possibilities(
-                    self.group_size
-                )
-            except Exception as err:
-                if super_possibility.size < self.group_size:
-                    self.logger.debug(err)
-                    continue
-                else:
-                    raise
-            sub_possibilities = sub_possibilities + new_sub_possibilities
-
-        # Determine for each sub possibility the number of covid chairs that it would result into
-        candidates = {}
-        for possibility in sub_possibilities:
-            covid_chairs = self.get_number_of_covid_seats_for_placement_possibility(
-                possibility
+        if self.scoring == "sliding_window":
+            return self.get_least_covid_chairs_window(
+                run for run in options if run.size >= self.group_size
             )
-            if covid_chairs not in candidates:
-                candidates.update({covid_chairs: [possibility]})
-            else:
-                candidates[covid_chairs].append(possibility)
 
-        if not candidates:
+        # Determine for each sub possibility (window of group size eligible seats) the number of covid chairs that it would result into
+        covid_chairs = get_covid_chair_counts(self.cinema.eligible, self.group_size)
+
+        if covid_chairs.size == 0:
+            raise NoPlacementFoundError(self.group_size)
+
+        # Return the first candidate from the least covid chairs candidates, scanning from the top left
+        index = int(np.argmin(covid_chairs))
+        if covid_chairs.flat[index] == NO_WINDOW:
             raise NoPlacementFoundError(self.group_size)
 
-        # Return the first candidate from the least covid chairs candidates
-        return candidates[min(candidates.keys())][0]
+        row, column = divmod(index, covid_chairs.shape[1])
+        return PlacementPossibility(self.group_size, (row, column))
 
 
-def filter_placement_possibilities_on_minimum_size(options, minimum_size: int):
-    """Can be used to filter all possibilities for placement of groups in a cinema for possibilities of minimum size, and orders  the result on size.   Generates dictionary with key=PlacementPossibility.size and values list(PlacementPosibilities)
+def get_batch_orders(group_sizes):
+    """Generates the orders in which a batch of groups can be placed: first from the largest to the smallest group, then in the order of arrival,
+    then the other orders. Orders that only swap groups of the same size are left out.
 
     Args:
-        options (list(PlacementPossbility)): A list with all placement possibilities (merged per row) remaining in the cinema. 
-        minimum_size (int): The minimum size of seats next to each other, to filter the possibilities on.
+        group_sizes (list(int)): The sizes of the groups in the batch, in the order in which they arrived
 
-    Returns:
-        [type]: [description]
+    Yields:
+        tuple(int): Indices in group_sizes, in the order in which the groups are placed
     """
-    candidates = {}
-    for option in options:
-        if option.size >= minimum_size:
-            if option.size not in candidates:
-                candidates.update({option.size: [option]})
-            else:
-                candidates[option.size].append(option)
-    return candidates
+    seen = set()
+    largest_first = tuple(sorted(range(len(group_sizes)), key=lambda index: -group_sizes[index]))
+    # The permutations are generated one at a time, since only the first MAX_BATCH_ORDERS orders are tried
+    for order in chain((largest_first, tuple(range(len(group_sizes)))), permutations(range(len(group_sizes)))):
+        sizes = tuple(group_sizes[index] for index in order)
+        if sizes not in seen:
+            seen.add(sizes)
+            yield order
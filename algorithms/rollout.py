@@ -0,0 +1,239 @@
+from concurrent.futures import ProcessPoolExecutor
+import random
+import time
+import numpy as np
+from algorithms.covid_chairs import NO_WINDOW, get_covid_chair_counts
+from algorithms.online import BestFit, NoPlacementFoundError, OnlineAlgorithm
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import CinemaTemplate, PlacementPossibility
+from utils.test_file import generate_group_sequence_from_rng
+
+# Number of placements with the least covid chairs that are compared with rollouts
+N_CANDIDATES = 4
+# Number of sampled group sequences per candidate, at most
+N_SAMPLES = 32
+# Number of groups in a sampled group sequence
+HORIZON = 40
+# Number of seconds that the rollouts of one decision may take
+TIME_BUDGET = 0.1
+# Number of sampled group sequences per task of a worker process
+SAMPLES_PER_TASK = 4
+
+# Policy of the worker process, see init_rollout_worker
+_policy = None
+
+
+def create_rollout_policy(template, base_policy):
+    """Creates the online algorithm that places the sampled groups in the rollouts, on its own ArrayCinema
+
+    Args:
+        template (CinemaTemplate): The cinema
+        base_policy (type): OnlineAlgorithm subclass
+
+    Returns:
+        OnlineAlgorithm
+    """
+    policy = base_policy(template=template, cinema_class=ArrayCinema)
+    policy.start_run(report=False)
+    return policy
+
+
+def init_rollout_worker(template, base_policy):
+    """Creates the rollout policy of a worker process once, so that tasks only carry the state of the cinema"""
+    global _policy
+    _policy = create_rollout_policy(template, base_policy)
+
+
+def run_rollouts(policy, eligible, candidates, group_size, sequences):
+    """Places the group at each candidate, followed by each sampled group sequence with the policy
+
+    Args:
+        policy (OnlineAlgorithm): Policy with an ArrayCinema, of which the state is overwritten
+        eligible (numpy.ndarray(bool)): Eligible seats of the cinema before the group is placed
+        candidates (list(tuple(int, int))): (row, column) of the most left seat of the group, per candidate
+        group_size (int): The size of the group
+        sequences (list(list(int))): Sampled group sequences
+
+    Returns:
+        list(int): Per candidate the number of seats that the sampled groups filled, summed over the sequences
+    """
+    policy.cinema.load_eligible(eligible)
+    start = policy.cinema.snapshot()
+    totals = []
+    for candidate in candidates:
+        total = 0
+        for sequence in sequences:
+            policy.cinema.restore(start)
+            policy.cinema.place_group(candidate, group_size)
+            policy.filled_seats = 0
+            for size in sequence:
+                if len(policy.cinema.free_runs) == 0:
+                    break
+                policy.seat_group(size)
+            total += policy.filled_seats
+        totals.append(total)
+    return totals
+
+
+def run_rollouts_in_worker(eligible, candidates, group_size, sequences):
+    """run_rollouts with the policy of the worker process"""
+    return run_rollouts(_policy, eligible, candidates, group_size, sequences)
+
+
+class Rollout(OnlineAlgorithm):
+    """
+    Looks ahead before placing a group. The placements with the least covid chairs are the candidates.
+    For each candidate, future group sequences are sampled with generate_group_sequence_from_rng and placed after the group by a fast base policy on an ArrayCinema.
+    The candidate after which the sampled groups fill the most seats on average is chosen; on a tie the one with the least covid chairs.
+    All candidates are compared on the same sampled sequences.
+    ...
+
+    Attributes
+    ----------
+    n_candidates : int
+        Number of placements that are compared
+    n_samples : int
+        Number of sampled group sequences per decision, at most
+    horizon : int
+        Number of groups in a sampled sequence
+    time_budget : float
+        Number of seconds after which no more sequences are sampled for a decision. At least one round of sequences is always placed.
+    base_policy : type
+        OnlineAlgorithm subclass that places the sampled groups
+    n_jobs : int
+        Number of worker processes for the rollouts. With 1, the rollouts run in this process.
+        The worker processes are started for the first decision, and stopped at the end of execute or by close.
+    probability : list(float)
+        Probability of each group size from 1 to 8 in the sampled sequences
+    """
+
+    def __init__(
+        self,
+        *args,
+        n_candidates=N_CANDIDATES,
+        n_samples=N_SAMPLES,
+        horizon=HORIZON,
+        time_budget=TIME_BUDGET,
+        base_policy=BestFit,
+        n_jobs=1,
+        probability=None,
+        seed=None,
+        **kwargs,
+    ) -> None:
+        """
+        Args:
+            seed (optional): Seed of the sampled group sequences. Defaults to None.
+            For the other arguments, see the attributes of the class and OnlineAlgorithm.
+        """
+        self.n_candidates = n_candidates
+        self.n_samples = n_samples
+        self.horizon = horizon
+        self.time_budget = time_budget
+        self.base_policy = base_policy
+        self.n_jobs = n_jobs
+        self.probability = probability
+        self.rng = random.Random(seed)
+        self.pool = None
+        super().__init__(*args, **kwargs)
+        self.rollout_template = self.template or CinemaTemplate.from_file(self.filepath)
+        if self.n_jobs > 1:
+            self.policy = None
+        else:
+            self.policy = create_rollout_policy(self.rollout_template, base_policy)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def get_pool(self):
+        """Starts the worker processes of the rollouts, if they are not running
+
+        Returns:
+            ProcessPoolExecutor
+        """
+        if self.pool is None:
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.n_jobs, initializer=init_rollout_worker, initargs=(self.rollout_template, self.base_policy)
+            )
+        return self.pool
+
+    def sample_sequence(self):
+        """Samples a future group sequence
+
+        Returns:
+            list(int): Group sizes
+        """
+        kwargs = {} if self.probability is None else {"probability": self.probability}
+        return generate_group_sequence_from_rng(self.horizon, self.rng, **kwargs)
+
+    def get_candidates(self):
+        """Finds the placements of the current group with the least covid chairs
+
+        Raises:
+            NoPlacementFoundError: If the group does not fit anywhere
+
+        Returns:
+            list(tuple(int, int)): (row, column) of the most left seat, from the least covid chairs to the most, and from the top left on ties
+        """
+        covid_chairs = get_covid_chair_counts(self.cinema.eligible, self.group_size)
+        counts = covid_chairs.ravel()
+        windows = np.flatnonzero(counts != NO_WINDOW)
+        if windows.size == 0:
+            raise NoPlacementFoundError(self.group_size)
+        best = windows[np.argsort(counts[windows], kind="stable")[: self.n_candidates]]
+        return [divmod(int(index), covid_chairs.shape[1]) for index in best]
+
+    def evaluate_candidates(self, candidates):
+        """Places the sampled group sequences after each candidate, until n_samples sequences are placed or the time budget is used
+
+        Args:
+            candidates (list(tuple(int, int))): (row, column) of the most left seat of the group, per candidate
+
+        Returns:
+            numpy.ndarray(int): Per candidate the number of seats that the sampled groups filled, summed over the sequences
+        """
+        deadline = time.perf_counter() + self.time_budget
+        eligible = self.cinema.eligible.copy()
+        totals = np.zeros(len(candidates), dtype=np.int64)
+        n_sampled = 0
+        while n_sampled < self.n_samples and (n_sampled == 0 or time.perf_counter() < deadline):
+            if self.n_jobs == 1:
+                sequences = [self.sample_sequence()]
+                totals += run_rollouts(self.policy, eligible, candidates, self.group_size, sequences)
+            else:
+                # One round gives every worker process a task
+                tasks = [[self.sample_sequence() for _ in range(SAMPLES_PER_TASK)] for _ in range(self.n_jobs)]
+                futures = [
+                    self.get_pool().submit(run_rollouts_in_worker, eligible, candidates, self.group_size, sequences)
+                    for sequences in tasks
+                ]
+                for future in futures:
+                    totals += future.result()
+                sequences = [sequence for task in tasks for sequence in task]
+            n_sampled += len(sequences)
+        return totals
+
+    def choose_candidate(self, options):
+        candidates = self.get_candidates()
+        if len(candidates) == 1:
+            return PlacementPossibility(self.group_size, candidates[0])
+        totals = self.evaluate_candidates(candidates)
+        # argmax keeps the first candidate on ties, which has the least covid chairs
+        return PlacementPossibility(self.group_size, candidates[int(np.argmax(totals))])
+
+    def execute(self, *args, **kwargs):
+        """Runs the algorithm, see OnlineAlgorithm.execute. The worker processes of the rollouts are stopped afterwards."""
+        try:
+            return super().execute(*args, **kwargs)
+        finally:
+            self.close()
+
+    def close(self):
+        """Stops the worker processes of the rollouts. They are started again for the next decision.
+        Only needed when groups are placed with seat_group instead of execute, which can also be done in a with statement.
+        """
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
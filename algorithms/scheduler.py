@@ -0,0 +1,183 @@
+import asyncio
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import cpu_count
+from algorithms.service import ALGORITHMS, DEFAULT_ALGORITHM, LatencyRecorder, SeatingService, release_group
+from problem.entities.cinema import Cinema
+
+# Algorithms that count covid chairs for every placement, which is too slow to do in the event loop
+OFFLOADED_ALGORITHMS = ("Greedy", "Hybrid")
+OPEN, SEAT, CANCEL, CLOSE = "open", "seat", "cancel", "close"
+
+# The shows of the worker process, by name
+_shows = {}
+
+
+def run_batch(requests):
+    """Carries out a batch of requests in a worker process, on the shows that the process holds.
+
+    Args:
+        requests (list(tuple)): (OPEN, show, (template, algorithm, cinema_class)), (SEAT, show, group size), (CANCEL, show, group) or (CLOSE, show, None)
+
+    Returns:
+        list: Per request None for OPEN, the coordinates and the placement time in nanoseconds for SEAT, the number of freed seats for CANCEL,
+            the number of filled seats for CLOSE, or the exception that the request raised
+    """
+    results = []
+    for command, show, argument in requests:
+        try:
+            if command == OPEN:
+                template, algorithm, cinema_class = argument
+                alg = ALGORITHMS[algorithm](template=template, cinema_class=cinema_class)
+                alg.start_run(report=False)
+                _shows[show] = alg
+                results.append(None)
+            elif command == SEAT:
+                start = time.perf_counter_ns()
+                coordinates = _shows[show].seat_group(argument)
+                results.append((coordinates, time.perf_counter_ns() - start))
+            elif command == CANCEL:
+                results.append(release_group(_shows[show], show, argument))
+            else:
+                results.append(_shows.pop(show).filled_seats)
+        except Exception as err:
+            results.append(err)
+    return results
+
+
+class ShowScheduler(SeatingService):
+    """
+    SeatingService that seats the groups of Greedy and Hybrid shows in worker processes, so that a large hall does not hold up the other shows.
+    Every show stays in one worker process, its shard, for as long as it is open. Only the requests travel between the processes, not the cinemas.
+    The requests that arrive during one iteration of the event loop are sent to each shard in one batch.
+    A shard carries out its batches one after the other, so the requests of a show are carried out in the order in which they arrived.
+    The other algorithms seat their groups in the event loop, as in SeatingService.
+    """
+
+    def __init__(self, cinema_class=Cinema, n_jobs=None, offloaded=OFFLOADED_ALGORITHMS) -> None:
+        """
+        Args:
+            cinema_class (type, optional): Backend that holds the seating state of each show: Cinema or ArrayCinema. Defaults to Cinema.
+            n_jobs (int, optional): Number of worker processes. Defaults to the number of cores.
+            offloaded (tuple(str), optional): Names of the algorithms of which the shows are held by the worker processes. Defaults to OFFLOADED_ALGORITHMS.
+        """
+        super().__init__(cinema_class)
+        self.offloaded = offloaded
+        self.shards = [ProcessPoolExecutor(max_workers=1) for _ in range(n_jobs or cpu_count())]
+        # Number of open shows per shard
+        self.shard_loads = [0] * len(self.shards)
+        # Shard and algorithm of every show held by a worker process
+        self.shard_of = {}
+        # Requests per shard that wait for the end of the iteration of the event loop, with the futures of their results
+        self.batches = {}
+        # Futures of the seat requests of which the latency is not recorded yet
+        self.pending_seats = set()
+
+    def check_new_show(self, show, algorithm):
+        if show in self.shard_of:
+            raise ValueError(f"show {show} is already open")
+        super().check_new_show(show, algorithm)
+
+    def submit(self, shard, request):
+        """Adds a request to the batch of a shard, which is sent at the end of the current iteration of the event loop
+
+        Args:
+            shard (int): Index of the shard
+            request (tuple): See run_batch
+
+        Returns:
+            asyncio.Future: The result of the request
+        """
+        loop = asyncio.get_running_loop()
+        if not self.batches:
+            loop.call_soon(self.send_batches)
+        future = loop.create_future()
+        self.batches.setdefault(shard, []).append((request, future))
+        return future
+
+    def send_batches(self):
+        """Sends the waiting requests to their shards, one batch per shard"""
+        loop = asyncio.get_running_loop()
+        for shard, batch in self.batches.items():
+            requests = [request for request, _ in batch]
+            futures = [future for _, future in batch]
+            done = loop.run_in_executor(self.shards[shard], run_batch, requests)
+            done.add_done_callback(lambda done, futures=futures: set_results(done, futures))
+        self.batches = {}
+
+    async def open_show(self, show, filepath, algorithm=DEFAULT_ALGORITHM):
+        if algorithm not in self.offloaded:
+            return await super().open_show(show, filepath, algorithm)
+        self.check_new_show(show, algorithm)
+        template = self.get_template(filepath)
+        # The show is registered before the request is sent, so that its next requests go to the same shard
+        shard = min(range(len(self.shards)), key=self.shard_loads.__getitem__)
+        self.shard_of[show] = (shard, algorithm)
+        self.shard_loads[shard] += 1
+        self.latencies.setdefault(algorithm, LatencyRecorder())
+        try:
+            await self.submit(shard, (OPEN, show, (template, algorithm, self.cinema_class)))
+        except BaseException:
+            if self.shard_of.get(show) == (shard, algorithm):
+                del self.shard_of[show]
+                self.shard_loads[shard] -= 1
+            raise
+
+    async def seat_group(self, show, group_size):
+        if show not in self.shard_of:
+            return await super().seat_group(show, group_size)
+        shard, algorithm = self.shard_of[show]
+        future = self.submit(shard, (SEAT, show, group_size))
+        self.pending_seats.add(future)
+        try:
+            coordinates, nanoseconds = await future
+        finally:
+            self.pending_seats.discard(future)
+        self.latencies[algorithm].record(nanoseconds)
+        return coordinates
+
+    async def wait_for_placements(self):
+        # Unlike gather, wait does not cancel the seat requests if this request is cancelled.
+        # The seat requests started waiting first, so they resume and record their latency before this returns
+        if self.pending_seats:
+            await asyncio.wait(set(self.pending_seats))
+
+    async def cancel_group(self, show, group):
+        if show not in self.shard_of:
+            return await super().cancel_group(show, group)
+        shard, _ = self.shard_of[show]
+        return await self.submit(shard, (CANCEL, show, group))
+
+    async def close_show(self, show):
+        if show not in self.shard_of:
+            return await super().close_show(show)
+        shard, _ = self.shard_of.pop(show)
+        self.shard_loads[shard] -= 1
+        return await self.submit(shard, (CLOSE, show, None))
+
+    def shutdown(self):
+        """Stops the worker processes"""
+        for shard in self.shards:
+            shard.shutdown()
+
+
+def set_results(done, futures):
+    """Passes the results of a batch to the futures of its requests
+
+    Args:
+        done (asyncio.Future): Result of run_batch
+        futures (list(asyncio.Future)): Futures of the requests in the batch
+    """
+    if done.exception() is not None:
+        for future in futures:
+            if not future.cancelled():
+                future.set_exception(done.exception())
+        return
+    for future, result in zip(futures, done.result()):
+        if future.cancelled():
+            # The connection of the request was closed
+            continue
+        if isinstance(result, Exception):
+            future.set_exception(result)
+        else:
+            future.set_result(result)
@@ -0,0 +1,361 @@
+import asyncio
+import os
+import stat
+import sys
+import time
+from collections import deque
+import numpy as np
+from algorithms.online import BestFit, FirstFit, Greedy, Hybrid, WorstFit, OnlineAlgorithm
+from problem.entities.cinema import Cinema, CinemaTemplate
+from problem.offline_problem import MAX_GROUP_SIZE
+
+ALGORITHMS = {algorithm.__name__: algorithm for algorithm in (FirstFit, BestFit, WorstFit, Hybrid, Greedy)}
+DEFAULT_ALGORITHM = "Greedy"
+PERCENTILES = (50, 90, 99, 99.9)
+# Number of most recent placements of which the latency is kept per algorithm
+MAX_LATENCIES = 100_000
+
+
+class ShowNotOpenError(Exception):
+    def __init__(self, show):
+        self.show = show
+        super().__init__(show)
+
+    def __str__(self):
+        return f"show {self.show} is not open"
+
+
+class LatencyRecorder:
+    """
+    Keeps the latencies of the most recent placements, to report their percentiles.
+    ...
+
+    Attributes
+    ----------
+    count : int
+        Number of placements recorded since the start, also the ones that are no longer kept
+    """
+
+    def __init__(self, max_latencies=MAX_LATENCIES) -> None:
+        """
+        Args:
+            max_latencies (int, optional): Number of most recent latencies that are kept. Defaults to MAX_LATENCIES.
+        """
+        self._latencies = deque(maxlen=max_latencies)
+        self.count = 0
+
+    def record(self, nanoseconds):
+        """Records the latency of one placement
+
+        Args:
+            nanoseconds (int): Time that the placement took
+        """
+        self._latencies.append(nanoseconds)
+        self.count += 1
+
+    def get_percentiles(self, percentiles=PERCENTILES):
+        """Computes the percentiles of the kept latencies
+
+        Args:
+            percentiles (tuple(float), optional): Defaults to PERCENTILES.
+
+        Returns:
+            dict(float: float): The latency in microseconds per percentile, empty if nothing was recorded
+        """
+        if not self._latencies:
+            return {}
+        values = np.percentile(np.fromiter(self._latencies, dtype=np.int64), percentiles) / 1000
+        return dict(zip(percentiles, values.tolist()))
+
+    def __str__(self) -> str:
+        text = f"n={self.count}"
+        for percentile, microseconds in self.get_percentiles().items():
+            text += f" p{percentile:g}={microseconds:.1f}us"
+        return text
+
+
+class SeatingService:
+    """
+    Keeps the cinemas of many shows in memory and seats groups in them one at a time, as they arrive.
+    Requests and answers are lines of text, read from stdin or a local socket:
+
+        open <show> <input file> [algorithm]    ->  ok
+        seat <show> <group size>                ->  <row> <column>, or 0 0 if the group does not fit
+        cancel <show> <group>                   ->  ok
+        close <show>                            ->  filled seats = <number>
+        stats                                   ->  latency percentiles of the placements per algorithm, including the earlier seat requests
+        quit                                    ->  ends the connection
+
+    Rows and columns start at 1, as in the output of OnlineAlgorithm. A group of size 0 closes the show, like the 0 that ends a group sequence.
+    Group sizes outside 0 up to MAX_GROUP_SIZE, and requests that fail, are answered with error and a description.
+    The groups of a show are numbered from 1 in the order of their seat requests; cancel frees the seats of a group by its number.
+    The grid of every input file is only read once, and shared by the shows in the same hall.
+    """
+
+    def __init__(self, cinema_class=Cinema) -> None:
+        """
+        Args:
+            cinema_class (type, optional): Backend that holds the seating state of each show: Cinema or ArrayCinema. Defaults to Cinema.
+        """
+        self.cinema_class = cinema_class
+        self.templates = {}
+        self.shows = {}
+        self.latencies = {}
+
+    def get_template(self, filepath):
+        """Parses an input file once, and returns the same template for later shows in that hall
+
+        Args:
+            filepath (str): Path to the input file
+
+        Returns:
+            CinemaTemplate
+        """
+        if filepath not in self.templates:
+            self.templates[filepath] = CinemaTemplate.from_file(filepath)
+        return self.templates[filepath]
+
+    def check_new_show(self, show, algorithm):
+        """Checks that a show can be opened
+
+        Args:
+            show (str): Name of the show
+            algorithm (str): Name of the online algorithm that seats the groups
+
+        Raises:
+            ValueError: If the show is already open, or the algorithm is unknown
+        """
+        if show in self.shows:
+            raise ValueError(f"show {show} is already open")
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"algorithm should be one of {', '.join(ALGORITHMS)}")
+
+    def get_show(self, show):
+        """Returns the online algorithm that seats the groups of an open show
+
+        Args:
+            show (str): Name of the show
+
+        Raises:
+            ShowNotOpenError: If the show is not open
+
+        Returns:
+            OnlineAlgorithm
+        """
+        if show not in self.shows:
+            raise ShowNotOpenError(show)
+        return self.shows[show]
+
+    async def open_show(self, show, filepath, algorithm=DEFAULT_ALGORITHM):
+        """Creates the empty cinema of a show
+
+        Args:
+            show (str): Name of the show
+            filepath (str): Path to the input file of the hall
+            algorithm (str, optional): Name of the online algorithm that seats the groups. Defaults to DEFAULT_ALGORITHM.
+
+        Raises:
+            ValueError: If the show is already open, or the algorithm is unknown
+        """
+        self.check_new_show(show, algorithm)
+        alg: OnlineAlgorithm = ALGORITHMS[algorithm](template=self.get_template(filepath), cinema_class=self.cinema_class)
+        alg.start_run(report=False)
+        self.shows[show] = alg
+        self.latencies.setdefault(algorithm, LatencyRecorder())
+
+    async def seat_group(self, show, group_size):
+        """Seats a group in a show, and records how long the placement took
+
+        Args:
+            show (str): Name of the show
+            group_size (int): The size of the group
+
+        Raises:
+            ShowNotOpenError: If the show is not open
+
+        Returns:
+            tuple(int, int): (row, column) of the most left seat of the group, or None if no placement was found
+        """
+        alg = self.get_show(show)
+        start = time.perf_counter_ns()
+        coordinates = alg.seat_group(group_size)
+        self.latencies[alg.__class__.__name__].record(time.perf_counter_ns() - start)
+        return coordinates
+
+    async def cancel_group(self, show, group):
+        """Frees the seats of a group in a show
+
+        Args:
+            show (str): Name of the show
+            group (int): Number of the group in the show, starting at 1
+
+        Raises:
+            ShowNotOpenError: If the show is not open
+            ValueError: If the group is not seated in the show
+
+        Returns:
+            int: The number of freed seats
+        """
+        return release_group(self.get_show(show), show, group)
+
+    async def close_show(self, show):
+        """Removes the cinema of a show
+
+        Args:
+            show (str): Name of the show
+
+        Raises:
+            ShowNotOpenError: If the show is not open
+
+        Returns:
+            int: The number of filled seats of the show
+        """
+        self.get_show(show)
+        return self.shows.pop(show).filled_seats
+
+    async def wait_for_placements(self):
+        """Waits until the latencies of the seat requests that were made so far are recorded. The groups that are seated in the event loop are recorded at once."""
+
+    def get_stats(self):
+        """Returns the latency percentiles of the placements per algorithm, on one line"""
+        return "; ".join(f"{algorithm} {recorder}" for algorithm, recorder in self.latencies.items()) or "n=0"
+
+    async def handle_request(self, line):
+        """Carries out one request
+
+        Args:
+            line (str): The request, see the class description
+
+        Returns:
+            str: The answer
+        """
+        words = line.split()
+        if not words:
+            return ""
+        command, arguments = words[0], words[1:]
+        try:
+            if command == "seat" and len(arguments) == 2:
+                group_size = int(arguments[1])
+                if not 0 <= group_size <= MAX_GROUP_SIZE:
+                    raise ValueError(f"group size should be from 0 up to {MAX_GROUP_SIZE}, but is {group_size}")
+                if group_size == 0:
+                    return f"filled seats = {await self.close_show(arguments[0])}"
+                coordinates = await self.seat_group(arguments[0], group_size)
+                if coordinates is None:
+                    return OnlineAlgorithm.NO_PLACE_INDICATION
+                return OnlineAlgorithm.convert_position_coordinates_to_row_and_col_number(coordinates)
+            if command == "open" and len(arguments) in (2, 3):
+                await self.open_show(*arguments)
+                return "ok"
+            if command == "cancel" and len(arguments) == 2:
+                await self.cancel_group(arguments[0], int(arguments[1]))
+                return "ok"
+            if command == "close" and len(arguments) == 1:
+                return f"filled seats = {await self.close_show(arguments[0])}"
+            if command == "stats" and not arguments:
+                await self.wait_for_placements()
+                return self.get_stats()
+        except (OSError, ValueError, ShowNotOpenError) as err:
+            return f"error {err}"
+        except Exception as err:
+            # An error of the algorithm only fails its own request, not the connection
+            return f"error {type(err).__name__}: {err}"
+        return f"error unknown request: {line.strip()}"
+
+    async def serve(self, reader, writer):
+        """Answers the requests of one connection until it is closed or quits.
+        The next requests are read while earlier ones are carried out, and the answers are written in the order of the requests.
+
+        Args:
+            reader (asyncio.StreamReader): Lines with requests
+            writer (asyncio.StreamWriter or StdoutWriter): Receives the answers
+        """
+        requests = asyncio.Queue()
+
+        async def write_answers():
+            while True:
+                request = await requests.get()
+                if request is None:
+                    break
+                writer.write((await request).encode() + b"\n")
+                await writer.drain()
+
+        writing = asyncio.create_task(write_answers())
+        try:
+            async for line in reader:
+                if line.split() == [b"quit"]:
+                    break
+                # Tasks start in the order in which they are created, so the requests of a show are carried out in order
+                requests.put_nowait(asyncio.create_task(self.handle_request(line.decode())))
+        finally:
+            requests.put_nowait(None)
+            await writing
+            writer.close()
+
+    async def serve_stdin(self):
+        """Answers the requests on stdin on stdout, until stdin is closed"""
+        await self.serve(await open_stdin(), StdoutWriter())
+
+    async def serve_socket(self, path=None, port=None):
+        """Answers the requests of every connection to a local socket, until the process is stopped
+
+        Args:
+            path (str, optional): Path of a Unix socket. Defaults to None.
+            port (int, optional): Port on localhost, used if no path is given. Defaults to None.
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self.serve, path=path)
+        else:
+            server = await asyncio.start_server(self.serve, host="127.0.0.1", port=port)
+        async with server:
+            await server.serve_forever()
+
+
+def release_group(alg, show, group):
+    """Frees the seats of a group with the online algorithm of its show
+
+    Args:
+        alg (OnlineAlgorithm): The online algorithm of the show
+        show (str): Name of the show
+        group (int): Number of the group in the show, starting at 1
+
+    Raises:
+        ValueError: If the group is not seated in the show
+
+    Returns:
+        int: The number of freed seats
+    """
+    try:
+        return len(alg.release_group(group))
+    except KeyError:
+        raise ValueError(f"group {group} of show {show} is not seated") from None
+
+
+class StdoutWriter:
+    """Writes the answers of the service to stdout, with the interface of asyncio.StreamWriter"""
+
+    def write(self, data):
+        sys.stdout.buffer.write(data)
+
+    async def drain(self):
+        sys.stdout.buffer.flush()
+
+    def close(self):
+        sys.stdout.buffer.flush()
+
+
+async def open_stdin():
+    """Makes a stream of the lines on stdin, without blocking the event loop
+
+    Returns:
+        asyncio.StreamReader
+    """
+    reader = asyncio.StreamReader()
+    if stat.S_ISREG(os.fstat(sys.stdin.fileno()).st_mode):
+        # A file cannot be watched by the event loop, but it is also never waited for
+        reader.feed_data(sys.stdin.buffer.read())
+        reader.feed_eof()
+    else:
+        loop = asyncio.get_running_loop()
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    return reader
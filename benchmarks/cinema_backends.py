@@ -0,0 +1,91 @@
+"""Compares the object based Cinema with the array based ArrayCinema on large random grids.
+
+Run from the root of the project:
+
+    python -m benchmarks.cinema_backends
+"""
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+
+from algorithms.online import BestFit, Greedy
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import Cinema
+from utils.test_file import generate_group_sequence
+
+ROWS = 200
+COLUMNS = 200
+SEAT_PROBABILITY = 0.9
+N_GROUPS = 500
+
+
+def generate_grid(rows, columns, seat_probability, seed):
+    random.seed(seed)
+    return [
+        [int(random.random() < seat_probability) for _ in range(columns)]
+        for _ in range(rows)
+    ]
+
+
+def write_online_input(grid, groups):
+    """Writes the grid and group sequence as an online input file to a temporary location
+
+    Returns:
+        str: path of the file
+    """
+    handle, filepath = tempfile.mkstemp(suffix=".txt", text=True)
+    with os.fdopen(handle, mode="w") as file:
+        file.write(f"{len(grid)}\n{len(grid[0])}\n")
+        file.writelines("".join(str(position) for position in row) + "\n" for row in grid)
+        file.writelines(f"{group}\n" for group in groups + [0])
+    return filepath
+
+
+def measure_construction(cinema_class, grid):
+    """Returns the construction time in seconds, and the peak memory in MB"""
+    rows = [row[:] for row in grid]
+    tracemalloc.start()
+    start = time.perf_counter()
+    cinema_class(rows, len(rows), len(rows[0]))
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak / 1e6
+
+
+def measure_placement(algorithm, cinema_class, filepath):
+    """Returns the mean time per group in milliseconds, and the number of filled seats"""
+    alg = algorithm(filepath, cinema_class)
+    start = time.perf_counter()
+    alg.execute(report=False)
+    duration = time.perf_counter() - start
+    return duration / alg.counter * 1000, alg.filled_seats
+
+
+def main():
+    grid = generate_grid(ROWS, COLUMNS, SEAT_PROBABILITY, seed="benchmark")
+    groups = generate_group_sequence(N_GROUPS, seed="benchmark")
+    filepath = write_online_input(grid, groups)
+
+    print(f"Grid of {ROWS}x{COLUMNS}, {N_GROUPS} groups")
+    print(
+        f"{'backend':<12}{'build (s)':>12}{'peak (MB)':>12}"
+        f"{'BestFit (ms/group)':>22}{'Greedy (ms/group)':>22}{'filled BestFit/Greedy':>24}"
+    )
+    try:
+        for cinema_class in (Cinema, ArrayCinema):
+            build_time, peak = measure_construction(cinema_class, grid)
+            best_fit, filled = measure_placement(BestFit, cinema_class, filepath)
+            greedy, greedy_filled = measure_placement(Greedy, cinema_class, filepath)
+            print(
+                f"{cinema_class.__name__:<12}{build_time:>12.3f}{peak:>12.1f}"
+                f"{best_fit:>22.3f}{greedy:>22.3f}{f'{filled}/{greedy_filled}':>24}"
+            )
+    finally:
+        os.remove(filepath)
+
+
+if __name__ == "__main__":
+    main()
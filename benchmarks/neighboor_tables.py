@@ -0,0 +1,59 @@
+"""Compares building the networkx seating graph with building the NeighboorTable on a 500x500 grid.
+
+Run from the root of the project:
+
+    python -m benchmarks.neighboor_tables
+"""
+import time
+import tracemalloc
+
+from benchmarks.cinema_backends import generate_grid
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import Cinema
+from problem.entities.neighboors import NeighboorTable
+from problem.entities.utils import create_cinema_graph
+
+ROWS = 500
+COLUMNS = 500
+SEAT_PROBABILITY = 0.9
+
+
+def measure(build, *args):
+    """Returns the time in seconds and the peak memory in MB to run build(*args)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    build(*args)
+    duration = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return duration, peak / 1e6
+
+
+def build_graph():
+    # Plain integers as nodes, so only the graph itself is measured
+    nodes = [[row * COLUMNS + column for column in range(COLUMNS)] for row in range(ROWS)]
+    return create_cinema_graph(nodes)
+
+
+def build_cinema(cinema_class, grid):
+    return cinema_class([row[:] for row in grid], ROWS, COLUMNS)
+
+
+def main():
+    grid = generate_grid(ROWS, COLUMNS, SEAT_PROBABILITY, seed="benchmark")
+
+    print(f"Grid of {ROWS}x{COLUMNS}")
+    print(f"{'structure':<28}{'build (s)':>12}{'peak (MB)':>12}")
+    cases = [
+        ("networkx seating graph", build_graph),
+        ("NeighboorTable", NeighboorTable, grid),
+        ("Cinema", build_cinema, Cinema, grid),
+        ("ArrayCinema", build_cinema, ArrayCinema, grid),
+    ]
+    for name, build, *args in cases:
+        duration, peak = measure(build, *args)
+        print(f"{name:<28}{duration:>12.3f}{peak:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
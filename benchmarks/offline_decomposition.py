@@ -0,0 +1,56 @@
+"""Compares solving large halls as one SparseProblem with solving them per component with DecomposedProblem.
+
+The halls consist of copies of the grid of offline_test, separated by empty rows and columns.
+
+Run from the root of the project:
+
+    python -m benchmarks.offline_decomposition
+"""
+import time
+
+from problem.decomposed_problem import DecomposedProblem
+from problem.entities.input import Input
+from problem.offline_problem import SparseProblem
+
+BLOCK_FILE = "input/offline_test.txt"
+REPETITIONS = [2, 4, 8]
+GROUPS_PER_BLOCK = 30
+
+
+def generate_hall(block, repetitions):
+    """Places repetitions x repetitions copies of block in a grid, with an empty row and column after each copy"""
+    grid = []
+    for _ in range(repetitions):
+        for row in block:
+            grid.append((row + [0]) * repetitions)
+        grid.append([0] * ((len(block[0]) + 1) * repetitions))
+    return grid
+
+
+def measure(problem_class, grid, groups):
+    """Returns the solve time in seconds and the number of taken seats"""
+    p = problem_class([row[:] for row in grid], groups.copy(), len(grid), len(grid[0]), [0] * len(groups))
+    start = time.perf_counter()
+    p.get_solution()
+    duration = time.perf_counter() - start
+    return duration, p.get_taken_seats()
+
+
+def main():
+    block = Input(BLOCK_FILE, "offline").grid
+
+    print(f"{'hall':<12}{'seats':>8}{'sparse (s)':>12}{'decomposed (s)':>16}{'taken':>8}")
+    for repetitions in REPETITIONS:
+        grid = generate_hall(block, repetitions)
+        groups = [GROUPS_PER_BLOCK * repetitions * repetitions] * 8
+        sparse_time, sparse_taken = measure(SparseProblem, grid, groups)
+        decomposed_time, decomposed_taken = measure(DecomposedProblem, grid, groups)
+        taken = sparse_taken if sparse_taken == decomposed_taken else f"{sparse_taken}/{decomposed_taken}"
+        print(
+            f"{f'{len(grid)}x{len(grid[0])}':<12}{sum(map(sum, grid)):>8}"
+            f"{sparse_time:>12.2f}{decomposed_time:>16.2f}{taken:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
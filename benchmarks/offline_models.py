@@ -0,0 +1,84 @@
+"""Compares the size and build time of the full ILP of Problem, the sparse ILP of SparseProblem,
+and the same sparse ILP built as a matrix by MatrixProblem, on offline input files.
+
+Run from the root of the project:
+
+    python -m benchmarks.offline_models [--solve] [input files]
+
+With --solve all models are also solved, which can take up to the time limit of 600 seconds per model.
+"""
+import os
+import sys
+import tempfile
+import time
+
+from problem.entities.input import Input
+from problem.matrix_problem import MatrixProblem
+from problem.offline_problem import Problem, SparseProblem
+
+FILES = [
+    "input/test_input.txt",
+    "input/offline_thin.txt",
+    "input/offline_wide.txt",
+    "input/offline_random50x50.txt",
+]
+
+
+def write_model(p, path):
+    """Writes the model to an MPS file, as is done before CBC solves it"""
+    if isinstance(p, MatrixProblem):
+        p.write_mps(path)
+    else:
+        p.model.writeMPS(path, rename=1)
+
+
+def measure(problem_class, file_input, solve):
+    """
+    Returns the model size, the build time and the time to write the model to a file in seconds,
+    and the solve time and taken seats if solve is True
+    """
+    p = problem_class(
+        [row[:] for row in file_input.grid],
+        file_input.groups.copy(),
+        file_input.row_nr,
+        file_input.column_nr,
+        file_input.vips,
+    )
+    start = time.perf_counter()
+    p.build_model()
+    build_time = time.perf_counter() - start
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        write_model(p, os.path.join(folder, "model.mps"))
+        write_time = time.perf_counter() - start
+    solve_time = taken = None
+    if solve:
+        start = time.perf_counter()
+        p.solve()
+        solve_time = time.perf_counter() - start
+        taken = p.get_taken_seats()
+    return p.get_model_size(), build_time, write_time, solve_time, taken
+
+
+def main():
+    solve = "--solve" in sys.argv[1:]
+    files = [argument for argument in sys.argv[1:] if argument != "--solve"] or FILES
+
+    print(
+        f"{'file':<34}{'model':<8}{'variables':>11}{'constraints':>13}{'nonzeros':>10}"
+        f"{'build (s)':>11}{'write (s)':>11}{'solve (s)':>11}{'taken':>7}"
+    )
+    for filepath in files:
+        file_input = Input(filepath, "offline")
+        for name, problem_class in (("full", Problem), ("sparse", SparseProblem), ("matrix", MatrixProblem)):
+            size, build_time, write_time, solve_time, taken = measure(problem_class, file_input, solve)
+            solve_column = "-" if solve_time is None else f"{solve_time:.2f}"
+            taken_column = "-" if taken is None else taken
+            print(
+                f"{filepath:<34}{name:<8}{size['variables']:>11}{size['constraints']:>13}{size['nonzeros']:>10}"
+                f"{build_time:>11.2f}{write_time:>11.2f}{solve_column:>11}{taken_column:>7}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compares the row profile DP of RowProfileProblem with the sparse ILP of SparseProblem on narrow halls.
+
+Run from the root of the project:
+
+    python -m benchmarks.offline_profile
+"""
+import time
+
+from benchmarks.cinema_backends import generate_grid
+from problem.entities.input import Input
+from problem.offline_problem import SparseProblem
+from problem.profile_problem import RowProfileProblem
+
+FILES = [
+    "input/test_input.txt",
+    "input/Exact5.txt",
+    "input/offline_thin.txt",
+    "input/offline_10x10.txt",
+]
+# Long generated halls with few columns
+GENERATED_ROWS = [100, 200]
+GENERATED_COLUMNS = 8
+SEAT_PROBABILITY = 0.8
+# Only the small groups are scarce, so the DP only has to count those
+GENERATED_GROUPS = [10, 8, 6, 200, 200, 200, 200, 200]
+
+
+def measure(problem_class, grid, groups, vips):
+    """Returns the solve time in seconds and the number of taken seats, or None if the DP would keep too many values"""
+    p = problem_class([row[:] for row in grid], groups.copy(), len(grid), len(grid[0]), vips)
+    if isinstance(p, RowProfileProblem) and not p.is_tractable():
+        return None
+    start = time.perf_counter()
+    p.get_solution()
+    duration = time.perf_counter() - start
+    return duration, p.get_taken_seats()
+
+
+def main():
+    halls = []
+    for filepath in FILES:
+        file_input = Input(filepath, "offline")
+        halls.append((filepath, file_input.grid, file_input.groups, file_input.vips))
+    for rows in GENERATED_ROWS:
+        grid = generate_grid(rows, GENERATED_COLUMNS, SEAT_PROBABILITY, seed="benchmark")
+        halls.append((f"generated {rows}x{GENERATED_COLUMNS}", grid, GENERATED_GROUPS, [0] * 8))
+
+    print(f"{'hall':<28}{'ILP (s)':>10}{'DP (s)':>10}{'taken':>8}")
+    for name, grid, groups, vips in halls:
+        ilp_time, ilp_taken = measure(SparseProblem, grid, groups, vips)
+        dp = measure(RowProfileProblem, grid, groups, vips)
+        if dp is None:
+            print(f"{name:<28}{ilp_time:>10.2f}{'-':>10}{ilp_taken:>8}")
+            continue
+        dp_time, dp_taken = dp
+        taken = ilp_taken if ilp_taken == dp_taken else f"{ilp_taken}/{dp_taken}"
+        print(f"{name:<28}{ilp_time:>10.2f}{dp_time:>10.2f}{taken:>8}")
+
+
+if __name__ == "__main__":
+    main()
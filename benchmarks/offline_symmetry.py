@@ -0,0 +1,75 @@
+"""Compares the sparse ILP with and without symmetry breaking constraints and row capacity cuts on offline input files.
+
+Run from the root of the project:
+
+    python -m benchmarks.offline_symmetry [input files]
+
+Every model is solved for at most TIME_LIMIT seconds. A * after the time means that the seating was not proven optimal.
+"""
+import sys
+import time
+
+from problem.entities.input import Input
+from problem.offline_problem import SparseProblem
+
+FILES = [
+    "input/Exact2.txt",
+    "input/Exact4.txt",
+    "input/Exact6.txt",
+    "input/offline_10x10.txt",
+    "input/offline_12x12.txt",
+    "input/offline_13x13.txt",
+    "input/offline_15x15.txt",
+    "input/offline_test.txt",
+    "input/offline_20x20.txt",
+]
+# Name, symmetry breaking, capacity cuts
+SETTINGS = [
+    ("none", False, False),
+    ("symmetry", True, False),
+    ("cuts", False, True),
+    ("both", True, True),
+]
+TIME_LIMIT = 120
+
+
+def measure(file_input, symmetry_breaking, capacity_cuts):
+    """Returns the time in seconds to build and solve the model, the Incumbent and the number of branch and bound nodes"""
+    p = SparseProblem(
+        [row[:] for row in file_input.grid],
+        file_input.groups.copy(),
+        file_input.row_nr,
+        file_input.column_nr,
+        file_input.vips,
+    )
+    p.symmetry_breaking = symmetry_breaking
+    p.capacity_cuts = capacity_cuts
+    start = time.perf_counter()
+    incumbent = p.get_solution(time_limit=TIME_LIMIT)
+    duration = time.perf_counter() - start
+    return duration, incumbent, p.nodes
+
+
+def main():
+    files = sys.argv[1:] or FILES
+
+    header = f"{'file':<30}{'symmetry':>10}"
+    for name, _, _ in SETTINGS:
+        header += f"{f'{name} (s)':>14}{'nodes':>8}"
+    print(header + f"{'taken':>8}")
+    for filepath in files:
+        file_input = Input(filepath, "offline")
+        p = SparseProblem(file_input.grid, file_input.groups, file_input.row_nr, file_input.column_nr, file_input.vips)
+        symmetries = "".join(letter for letter, symmetric in zip("LTH", p.get_symmetries()) if symmetric) or "-"
+        line = f"{filepath:<30}{symmetries:>10}"
+        taken = set()
+        for _, symmetry_breaking, capacity_cuts in SETTINGS:
+            duration, incumbent, nodes = measure(file_input, symmetry_breaking, capacity_cuts)
+            proven = "" if incumbent.bound == incumbent.seats else "*"
+            line += f"{f'{duration:.2f}{proven}':>14}{str(nodes):>8}"
+            taken.add(incumbent.seats)
+        print(line + f"{'/'.join(map(str, sorted(taken))):>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compares solving the sparse ILP from scratch with starting CBC from the seating of the online Greedy and Hybrid algorithms.
+
+Run from the root of the project:
+
+    python -m benchmarks.offline_warm_start [input files]
+"""
+import sys
+import time
+
+from problem.entities.input import Input
+from problem.incumbent import get_greedy_seating
+from problem.offline_problem import SparseProblem
+
+FILES = [
+    "input/offline_thin.txt",
+    "input/offline_wide.txt",
+    "input/offline_groupSeats.txt",
+    "input/offline_10x10.txt",
+    "input/offline_12x12.txt",
+    "input/offline_13x13.txt",
+    "input/offline_15x15.txt",
+]
+
+
+def measure_heuristic(file_input):
+    """Returns the time in seconds to find the first seating, and its number of taken seats"""
+    start = time.perf_counter()
+    placements = get_greedy_seating(
+        file_input.grid, file_input.groups, file_input.row_nr, file_input.column_nr, file_input.vips
+    )
+    duration = time.perf_counter() - start
+    return duration, None if placements is None else sum(size for _, _, size in placements)
+
+
+def measure_solve(file_input, warm_start):
+    """Returns the total time in seconds to build and solve the model, and the number of taken seats"""
+    p = SparseProblem(
+        [row[:] for row in file_input.grid],
+        file_input.groups.copy(),
+        file_input.row_nr,
+        file_input.column_nr,
+        file_input.vips,
+    )
+    p.warm_start = warm_start
+    start = time.perf_counter()
+    p.get_solution()
+    duration = time.perf_counter() - start
+    return duration, p.get_taken_seats()
+
+
+def main():
+    files = sys.argv[1:] or FILES
+
+    print(
+        f"{'file':<32}{'heuristic (s)':>15}{'first seats':>13}"
+        f"{'cold (s)':>10}{'warm (s)':>10}{'optimum':>9}"
+    )
+    for filepath in files:
+        file_input = Input(filepath, "offline")
+        heuristic_time, heuristic_seats = measure_heuristic(file_input)
+        cold_time, cold_taken = measure_solve(file_input, warm_start=False)
+        warm_time, warm_taken = measure_solve(file_input, warm_start=True)
+        taken = cold_taken if cold_taken == warm_taken else f"{cold_taken}/{warm_taken}"
+        print(
+            f"{filepath:<32}{heuristic_time:>15.2f}{str(heuristic_seats):>13}"
+            f"{cold_time:>10.2f}{warm_time:>10.2f}{taken:>9}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Compares the number of filled seats of Hybrid when every group is placed as soon as it arrives, with placing batches of groups together.
+
+Run from the root of the project:
+
+    python -m benchmarks.online_batches [input files]
+
+The latency is the longest time that choosing and making the placements of one batch took.
+"""
+import glob
+import sys
+import time
+
+from algorithms.online import Hybrid
+from problem.entities.cinema import CinemaTemplate
+
+FILES = sorted(glob.glob("input/online/*.txt")) + ["input/online_input_big1.txt"]
+BATCH_SIZES = [1, 2, 4, 8]
+
+
+class TimedHybrid(Hybrid):
+    """Hybrid that keeps the longest time that placing one group or one batch took"""
+
+    max_latency = 0.0
+
+    def seat_group(self, group_size):
+        start = time.perf_counter()
+        coordinates = super().seat_group(group_size)
+        self.max_latency = max(self.max_latency, time.perf_counter() - start)
+        return coordinates
+
+    def seat_batch(self, group_sizes, *args, **kwargs):
+        start = time.perf_counter()
+        placements = super().seat_batch(group_sizes, *args, **kwargs)
+        self.max_latency = max(self.max_latency, time.perf_counter() - start)
+        return placements
+
+
+def main():
+    files = sys.argv[1:] or FILES
+
+    header = f"{'file':<35}"
+    for batch_size in BATCH_SIZES:
+        header += f"{f'k={batch_size} seats':>14}{'latency (s)':>13}"
+    print(header)
+    totals = [0] * len(BATCH_SIZES)
+    for filepath in files:
+        template = CinemaTemplate.from_file(filepath)
+        line = f"{filepath:<35}"
+        for number, batch_size in enumerate(BATCH_SIZES):
+            alg = TimedHybrid(template=template)
+            alg.execute(log_grid=False, report=False, batch_size=batch_size)
+            totals[number] += alg.filled_seats
+            line += f"{alg.filled_seats:>14}{alg.max_latency:>13.3f}"
+        print(line)
+    print(f"{'total':<35}" + "".join(f"{total:>14}{'':>13}" for total in totals))
+
+
+if __name__ == "__main__":
+    main()
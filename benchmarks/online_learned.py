@@ -0,0 +1,54 @@
+"""Compares the number of filled seats and the time per group of BestFit, Greedy, Hybrid and Learned on sampled group sequences,
+with the seats that the offline ILP fills when all groups of a sequence are known in advance.
+
+Run from the root of the project, after training the scorer with main_scorer.py:
+
+    python -m benchmarks.online_learned [input files]
+
+Every algorithm gets the same N_SEQUENCES group sequences of SEQUENCE_LENGTH groups per input file, on an ArrayCinema.
+"""
+import glob
+import sys
+import time
+
+from algorithms.learned import Learned, solve_offline
+from algorithms.online import BestFit, Greedy, Hybrid
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import CinemaTemplate
+from utils.test_file import generate_group_sequences
+
+FILES = sorted(glob.glob("input/online/*.txt")) + ["input/online_input_big1.txt"]
+N_SEQUENCES = 5
+SEQUENCE_LENGTH = 80
+ALGORITHMS = [BestFit, Greedy, Hybrid, Learned]
+
+
+def main():
+    files = sys.argv[1:] or FILES
+    sequences = generate_group_sequences(N_SEQUENCES, SEQUENCE_LENGTH, "learned")
+
+    header = f"{'file':<35}{'ILP seats':>10}"
+    for algorithm in ALGORITHMS:
+        header += f"{f'{algorithm.__name__} seats':>16}{'us/group':>10}"
+    print(header)
+    totals = [0] * (len(ALGORITHMS) + 1)
+    for filepath in files:
+        template = CinemaTemplate.from_file(filepath)
+        optimum = sum(
+            size for sequence in sequences for _, _, size in solve_offline(template.grid, sequence)
+        ) / N_SEQUENCES
+        totals[0] += optimum
+        line = f"{filepath:<35}{optimum:>10.1f}"
+        for number, algorithm in enumerate(ALGORITHMS, 1):
+            alg = algorithm(template=template, cinema_class=ArrayCinema)
+            start = time.perf_counter()
+            seats = alg.run_many(sequences, log_grid=False, report=False)
+            duration = time.perf_counter() - start
+            totals[number] += sum(seats) / N_SEQUENCES
+            line += f"{sum(seats) / N_SEQUENCES:>16.1f}{duration / (N_SEQUENCES * SEQUENCE_LENGTH) * 1e6:>10.0f}"
+        print(line)
+    print(f"{'total':<35}" + "".join(f"{total:>10.1f}" if number == 0 else f"{total:>16.1f}{'':>10}" for number, total in enumerate(totals)))
+
+
+if __name__ == "__main__":
+    main()
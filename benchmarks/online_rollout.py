@@ -0,0 +1,49 @@
+"""Compares the number of filled seats of Greedy, Hybrid and Rollout on sampled group sequences.
+
+Run from the root of the project:
+
+    python -m benchmarks.online_rollout [input files]
+
+Every algorithm gets the same N_SEQUENCES group sequences of SEQUENCE_LENGTH groups per input file.
+"""
+import sys
+import time
+
+from algorithms.online import Greedy, Hybrid
+from algorithms.rollout import Rollout
+from problem.entities.cinema import CinemaTemplate
+from utils.test_file import generate_group_sequences
+
+FILES = [
+    "input/online/Online9.txt",
+    "input/online/Online10.txt",
+    "input/online/Online12.txt",
+    "input/online/Online13.txt",
+]
+N_SEQUENCES = 5
+SEQUENCE_LENGTH = 60
+ALGORITHMS = [Greedy, Hybrid, Rollout]
+
+
+def main():
+    files = sys.argv[1:] or FILES
+    sequences = generate_group_sequences(N_SEQUENCES, SEQUENCE_LENGTH, "rollout")
+
+    header = f"{'file':<30}"
+    for algorithm in ALGORITHMS:
+        header += f"{f'{algorithm.__name__} seats':>16}{'time (s)':>10}"
+    print(header)
+    for filepath in files:
+        template = CinemaTemplate.from_file(filepath)
+        line = f"{filepath:<30}"
+        for algorithm in ALGORITHMS:
+            alg = algorithm(template=template)
+            start = time.perf_counter()
+            seats = alg.run_many(sequences, log_grid=False, report=False)
+            duration = time.perf_counter() - start
+            line += f"{sum(seats) / len(seats):>16.1f}{duration:>10.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
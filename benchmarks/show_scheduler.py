@@ -0,0 +1,58 @@
+"""Compares the throughput of the SeatingService, which seats all groups in the event loop, with the ShowScheduler, which seats them in worker processes, for a growing number of shows.
+
+Run from the root of the project:
+
+    python -m benchmarks.show_scheduler [input file]
+
+Every show gets the group sequence of the input file, and all shows send their groups at the same time, one group after the other.
+"""
+import asyncio
+import sys
+import time
+
+from algorithms.scheduler import ShowScheduler
+from algorithms.service import SeatingService
+from problem.entities.cinema import CinemaTemplate
+
+FILE = "input/online_input_big1.txt"
+SHOW_COUNTS = [1, 4, 16, 64]
+ALGORITHM = "Greedy"
+
+
+async def run_shows(service, filepath, groups, n_shows):
+    """Opens the shows, seats the groups of all of them at the same time and closes them
+
+    Returns:
+        float: Number of placed groups per second
+    """
+    shows = [f"show{number}" for number in range(n_shows)]
+    await asyncio.gather(*(service.open_show(show, filepath, ALGORITHM) for show in shows))
+
+    async def seat_groups(show):
+        for group_size in groups:
+            await service.seat_group(show, group_size)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(seat_groups(show) for show in shows))
+    duration = time.perf_counter() - start
+    await asyncio.gather(*(service.close_show(show) for show in shows))
+    return n_shows * len(groups) / duration
+
+
+def main():
+    filepath = sys.argv[1] if len(sys.argv) > 1 else FILE
+    groups = [size for size in CinemaTemplate.from_file(filepath).groups if size > 0]
+
+    print(f"{'shows':>6}{'service (groups/s)':>22}{'scheduler (groups/s)':>24}")
+    scheduler = ShowScheduler()
+    try:
+        for n_shows in SHOW_COUNTS:
+            inline = asyncio.run(run_shows(SeatingService(), filepath, groups, n_shows))
+            scheduled = asyncio.run(run_shows(scheduler, filepath, groups, n_shows))
+            print(f"{n_shows:>6}{inline:>22.0f}{scheduled:>24.0f}")
+    finally:
+        scheduler.shutdown()
+
+
+if __name__ == "__main__":
+    main()
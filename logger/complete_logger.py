@@ -5,11 +5,22 @@ import threading
 
 
 def dummy_logger():
+    """Logger that discards everything. Its level is above CRITICAL, so that log calls return before any message is formatted."""
     logger = logging.getLogger("dummy")
-    logger.addHandler(logging.NullHandler())
+    if not logger.handlers:
+        logger.addHandler(logging.NullHandler())
+    logger.setLevel(logging.CRITICAL + 1)
+    logger.propagate = False
     return logger
 
 
+def close_logger(logger):
+    """Closes and removes all handlers of the logger, so that its files are released and later calls to get_logger do not add handlers on top of them"""
+    for handler in logger.handlers[:]:
+        handler.close()
+        logger.removeHandler(handler)
+
+
 def get_logger(filename, name=__name__, subfolder=None):
     try:
         name = filename
@@ -42,6 +53,8 @@ def get_logger(filename, name=__name__, subfolder=None):
 
     logger = logging.getLogger(f"{name}_logger")
     logger.setLevel(logging.DEBUG)
+    # Reusing the name of a logger replaces its handlers instead of adding to them
+    close_logger(logger)
 
     # Handlers
     c_handler = logging.StreamHandler()
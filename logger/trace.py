@@ -0,0 +1,55 @@
+import os
+
+
+class PlacementTrace:
+    """
+    Compact trace of the placement events of a single run, written as JSON lines to one buffered file:
+    {"group": 1, "size": 3, "row": 0, "column": 4} for a placed group, and {"group": 2, "size": 8, "row": null, "column": null} for a group that could not be placed.
+    Rows and columns start at 0. The file stays open until close is called, so callers close it in a finally block, as OnlineAlgorithm.execute does, or use the trace as a context manager.
+    """
+
+    BUFFER_SIZE = 1 << 16
+
+    def __init__(self, filepath) -> None:
+        """Opens the trace file, overwriting an existing one
+
+        Args:
+            filepath (str): Path of the .jsonl file
+        """
+        folder = os.path.dirname(filepath)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.filepath = filepath
+        self._file = open(filepath, mode="w", buffering=self.BUFFER_SIZE)
+
+    def record_placement(self, group, size, coordinates):
+        """Records that a group is placed
+
+        Args:
+            group (int): Number of the group in the sequence
+            size (int): Group size
+            coordinates (tuple(int, int)): (row, column) of the most left seat of the group
+        """
+        self._file.write(
+            f'{{"group": {group}, "size": {size}, "row": {coordinates[0]}, "column": {coordinates[1]}}}\n'
+        )
+
+    def record_no_placement(self, group, size):
+        """Records that no place was found for a group
+
+        Args:
+            group (int): Number of the group in the sequence
+            size (int): Group size
+        """
+        self._file.write(
+            f'{{"group": {group}, "size": {size}, "row": null, "column": null}}\n'
+        )
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
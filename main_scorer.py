@@ -0,0 +1,12 @@
+import argparse
+from algorithms.learned import MODEL_FILE, train_scorer
+
+parser = argparse.ArgumentParser(description="Fits the scorer of the Learned online algorithm on offline seatings of sampled halls.")
+parser.add_argument("--halls", type=int, default=400, help="number of sampled halls and group sequences to solve with the ILP")
+parser.add_argument("--seed", type=int, default=0, help="seed of the first sampled hall")
+parser.add_argument("--jobs", type=int, help="number of worker processes, the number of cores by default")
+parser.add_argument("--output", default=MODEL_FILE, help="file to write the scorer to")
+args = parser.parse_args()
+
+scorer, n_decisions = train_scorer(args.halls, args.seed, args.jobs, args.output)
+print(f"Fitted the scorer on {n_decisions} decisions of {args.halls} halls, written to {args.output}")
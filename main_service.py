@@ -0,0 +1,31 @@
+import argparse
+import asyncio
+import sys
+from algorithms.scheduler import ShowScheduler
+from algorithms.service import SeatingService
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import Cinema
+
+parser = argparse.ArgumentParser(description="Seats groups in the cinemas of many shows, one request at a time.")
+parser.add_argument("--socket", help="listen on this Unix socket instead of stdin")
+parser.add_argument("--port", type=int, help="listen on this port of localhost instead of stdin")
+parser.add_argument("--array", action="store_true", help="keep the seating state in NumPy arrays")
+parser.add_argument("--jobs", type=int, help="seat the groups of Greedy and Hybrid shows in this many worker processes")
+args = parser.parse_args()
+
+cinema_class = ArrayCinema if args.array else Cinema
+if args.jobs is None:
+    service = SeatingService(cinema_class)
+else:
+    service = ShowScheduler(cinema_class, args.jobs)
+try:
+    if args.socket is None and args.port is None:
+        asyncio.run(service.serve_stdin())
+    else:
+        asyncio.run(service.serve_socket(args.socket, args.port))
+except KeyboardInterrupt:
+    pass
+finally:
+    print(service.get_stats(), file=sys.stderr)
+    if args.jobs is not None:
+        service.shutdown()
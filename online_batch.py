@@ -1,6 +1,8 @@
 from utils.test_file import generate_group_sequence
 from multiprocessing import Pool, cpu_count
 from joblib import Parallel, delayed
+from problem.entities.cinema import CinemaTemplate
+import math
 
 # from algorithms.online import FirstFit, BestFit, WorstFit, MinCovidChairs, Hybrid_BF_CC
 import pandas as pd
@@ -12,6 +14,9 @@ from os import listdir
 # GROUPS_LIST = [generate_group_sequence(50) for i in range(100)]
 # FILE_DIR = "input/online"
 
+# Number of chunks per worker, so that workers that finish early can pick up remaining chunks
+CHUNKS_PER_WORKER = 4
+
 
 def run_algorithm_with_original_groups(algorithm, filepath):
     alg = algorithm(filepath)
@@ -19,12 +24,46 @@ def run_algorithm_with_original_groups(algorithm, filepath):
     return len(cinema_result.get_occupied_seats())
 
 
-def repeat_algorithm_with_different_groups(algorithm, filepath, groups_list):
-    results = Parallel(n_jobs=10)(
-        delayed(do_for_different_group)(algorithm, filepath, group)
-        for group in groups_list
+def repeat_algorithm_with_different_groups(
+    algorithm, filepath, groups_list, n_jobs=None, chunk_size=None
+):
+    """Runs the algorithm for every group sequence on the cinema from filepath, in parallel.
+
+    The input file is parsed once into a CinemaTemplate, which is sent to the workers. Each worker builds a cinema from it once per chunk of group sequences, resets it for every sequence, and returns the results per chunk.
+
+    Args:
+        algorithm (type): OnlineAlgorithm subclass, or a functools.partial of one with extra arguments
+        filepath (str): Path to the input file with the cinema grid
+        groups_list (list(list(int))): Group sequences
+        n_jobs (int, optional): Number of workers. Defaults to the number of cores, but not more than there are group sequences.
+        chunk_size (int, optional): Number of group sequences per task. Defaults to spreading the sequences over CHUNKS_PER_WORKER tasks per worker.
+
+    Returns:
+        list(int): Number of occupied seats for each group sequence, in the order of groups_list
+    """
+    if not groups_list:
+        return []
+    template = CinemaTemplate.from_file(filepath)
+    n_jobs = n_jobs or min(cpu_count(), len(groups_list))
+    chunk_size = chunk_size or math.ceil(len(groups_list) / (n_jobs * CHUNKS_PER_WORKER))
+    chunks = [
+        groups_list[start : start + chunk_size]
+        for start in range(0, len(groups_list), chunk_size)
+    ]
+
+    results = Parallel(n_jobs=n_jobs)(
+        delayed(do_for_chunk_of_groups)(algorithm, template, chunk) for chunk in chunks
     )
-    return results
+    return [seats_occupied for chunk in results for seats_occupied in chunk]
+
+
+def do_for_chunk_of_groups(algorithm, template, groups_chunk):
+    """Builds the cinema from the template once, and resets it for each group sequence in the chunk
+
+    Returns:
+        list(int): Number of occupied seats for each group sequence
+    """
+    return algorithm(template=template).run_many(groups_chunk, report=False)
 
 
 def do_for_different_group(algorithm, filepath, groups):
@@ -37,4 +76,3 @@ def do_for_different_group(algorithm, filepath, groups):
 
 def get_file_names(directory):
     return [file for file in listdir(directory)]
-
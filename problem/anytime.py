@@ -0,0 +1,192 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+import math
+import os
+import re
+import select
+import tempfile
+import threading
+import time
+
+# Default number of seconds that the offline problem may be solved for
+TIME_LIMIT = 600
+# Number of seconds that CBC gets at least, also when the time limit has already passed, to return a seating
+MIN_TIME_LIMIT = 1
+# Number of seconds to wait for CBC to write to its log
+POLL_INTERVAL = 0.1
+EPSILON = 1e-6
+
+# CBC minimizes the negated objective, so its log shows the number of taken seats with either sign
+INCUMBENT_PATTERN = re.compile(r"Integer solution of (-?[\d.]+)")
+BOUND_PATTERN = re.compile(r"(?:best possible|Continuous objective value is|Upper bound:)\s*(-?[\d.]+)")
+NODES_PATTERN = re.compile(r"Enumerated nodes:\s*(\d+)")
+
+
+class Incumbent(NamedTuple):
+    """The best seating found so far"""
+
+    seats: int
+    bound: Optional[int]  # most seats that any seating can take, None if not known yet
+    seconds: float  # since the start of the solve
+
+    @property
+    def gap(self):
+        """Fraction of the bound by which the seating may still be improved, None if the bound is not known."""
+        if self.bound is None:
+            return None
+        return (self.bound - self.seats) / self.bound if self.bound > 0 else 0.0
+
+
+class Progress:
+    """
+    Keeps the best number of taken seats and the best bound found since the start of a solve,
+    and reports every better seating to a callback.
+    """
+
+    def __init__(self, callback=None):
+        """
+        Initialize variables.
+
+        :param callback: Function that is called with an Incumbent whenever a better seating is found
+        """
+        self.callback = callback
+        self.start = time.perf_counter()
+        self.seats = None
+        self.bound = None
+        self.nodes = None
+
+    def get_elapsed(self):
+        """Return the number of seconds since the start of the solve."""
+        return time.perf_counter() - self.start
+
+    def get_remaining(self, time_limit):
+        """
+        Get the number of seconds that a solver may still use.
+
+        :param time_limit: Number of seconds that the whole solve may take
+        :return: Number of seconds, at least MIN_TIME_LIMIT
+        """
+        return max(time_limit - self.get_elapsed(), MIN_TIME_LIMIT)
+
+    def update(self, seats=None, bound=None):
+        """
+        Record a seating and a bound, and report the seating if it takes more seats than the best one so far.
+
+        :param seats: Number of taken seats of a seating
+        :param bound: Upper bound on the number of taken seats, may be fractional
+        """
+        if bound is not None:
+            bound = math.floor(bound + EPSILON)
+            self.bound = bound if self.bound is None else min(self.bound, bound)
+        if seats is not None and (self.seats is None or seats > self.seats):
+            self.seats = seats
+            if self.callback is not None:
+                self.callback(self.get_incumbent())
+
+    def get_incumbent(self, seats=None):
+        """
+        Get the best seating so far with its bound.
+
+        :param seats: Number of taken seats of the final seating, the best recorded one by default
+        :return: Incumbent
+        """
+        seats = (self.seats or 0) if seats is None else seats
+        bound = None if self.bound is None else max(self.bound, seats)
+        return Incumbent(seats, bound, self.get_elapsed())
+
+    def follow_cbc(self, solve):
+        """
+        Run CBC in a thread while reading its log, and record every seating and bound that it reports.
+
+        :param solve: Function that takes the path of the log file and runs CBC
+        :return: True if CBC reported a bound on its final seating, so that the seating is not proven optimal
+        """
+        final_bound = False
+        pending = ""
+        # The log is closed after the executor, so that CBC and the done callback are finished with it
+        with CbcLog() as log, ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(solve, log.path)
+            future.add_done_callback(lambda _: log.stop_waiting())
+            while True:
+                done = future.done()
+                text = log.read(0 if done else POLL_INTERVAL)
+                # CBC may be halfway writing the last line
+                *lines, pending = (pending + text).split("\n")
+                for line in lines:
+                    final_bound |= self.read_line(line)
+                if done and not text:
+                    break
+            future.result()
+        return final_bound | self.read_line(pending)
+
+    def read_line(self, line):
+        """
+        Record the seating, bound or number of branch and bound nodes on a line of the log of CBC.
+
+        :param line: String
+        :return: True if the line holds the bound of the final seating
+        """
+        incumbent = INCUMBENT_PATTERN.search(line)
+        if incumbent:
+            self.update(seats=round(abs(float(incumbent.group(1)))))
+        bound = BOUND_PATTERN.search(line)
+        if bound:
+            self.update(bound=abs(float(bound.group(1))))
+        nodes = NODES_PATTERN.search(line)
+        if nodes:
+            self.nodes = int(nodes.group(1))
+        return line.startswith("Upper bound:")
+
+
+class CbcLog:
+    """
+    The file to which CBC writes its log. If possible this is a pseudo terminal, to which CBC writes every line
+    as soon as it is done. Otherwise it is a temporary file, to which CBC writes its log in blocks.
+    """
+
+    def __enter__(self):
+        """Open the pseudo terminal or create the temporary file."""
+        if hasattr(os, "openpty"):
+            # The terminal stays open on both ends until the log is closed, also after CBC is done
+            self.terminal, self.writer = os.openpty()
+            self.path = os.ttyname(self.writer)
+            self.file = None
+            # Becomes readable once CBC is done, to stop waiting for the terminal
+            self.done_reader, self.done_writer = os.pipe()
+        else:
+            fd, self.path = tempfile.mkstemp(suffix=".log")
+            os.close(fd)
+            self.file = open(self.path)
+            self.done = threading.Event()
+        return self
+
+    def stop_waiting(self):
+        """Let reads return at once, because CBC is done."""
+        if self.file is None:
+            os.write(self.done_writer, b"\0")
+        else:
+            self.done.set()
+
+    def read(self, timeout):
+        """
+        Read the text that CBC wrote since the last read.
+
+        :param timeout: Number of seconds to wait for new text
+        :return: String, empty if there is no new text
+        """
+        if self.file is not None:
+            self.done.wait(timeout)
+            return self.file.read()
+        readable, _, _ = select.select([self.terminal, self.done_reader], [], [], timeout)
+        if self.terminal not in readable:
+            return ""
+        return os.read(self.terminal, 65536).decode(errors="replace").replace("\r", "")
+
+    def __exit__(self, *args):
+        """Close the pseudo terminal or remove the temporary file."""
+        if self.file is None:
+            for fd in (self.terminal, self.writer, self.done_reader, self.done_writer):
+                os.close(fd)
+        else:
+            self.file.close()
+            os.remove(self.path)
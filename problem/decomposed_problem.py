@@ -0,0 +1,416 @@
+from typing import NamedTuple, Tuple
+from pulp import LpMaximize, LpProblem, LpSolutionOptimal, LpStatus, lpSum, LpVariable, PULP_CBC_CMD
+from problem.anytime import MIN_TIME_LIMIT, TIME_LIMIT, Incumbent, Progress
+from problem.entities.neighboors import NeighboorTable
+from problem.offline_problem import MAX_GROUP_SIZE, SIZE_STRINGS, SparseProblem
+
+# Maximum number of rounds in which new seatings are generated for the components
+MAX_ITERATIONS = 50
+# Minimum improvement of the objective for a new seating to be added to the master problem
+EPSILON = 1e-6
+
+
+class Seating(NamedTuple):
+    """A seating of the groups in one component"""
+
+    seats: int
+    groups: Tuple[int, ...]  # number of groups per group size
+    taken: Tuple[Tuple[int, int], ...]  # (row, column) of the taken seats in the grid of the component
+
+
+EMPTY_SEATING = Seating(0, (0,) * MAX_GROUP_SIZE, ())
+
+
+class Component:
+    """
+    Seats that are within corona distance of each other, but not of any other seat in the grid.
+    The seating of one component does not restrict the seating of another, apart from the shared number of groups.
+    """
+
+    def __init__(self, begin_row, begin_col, grid):
+        """
+        Initialize variables.
+
+        :param begin_row: Row of the grid where the component begins
+        :param begin_col: Column of the grid where the component begins
+        :param grid: Smallest part of the grid that contains the component, with only its own seats as 1
+        """
+        self.begin_row = begin_row
+        self.begin_col = begin_col
+        self.grid = grid
+        self.seatings = [EMPTY_SEATING]
+
+
+class PricingProblem(SparseProblem):
+    """The ILP of a single component, in which each group size has its own value per group instead of its number of seats."""
+
+    # The heuristic seats as many seats as possible, which says little about the value of a seating
+    warm_start = False
+
+    def __init__(self, g, ng, r, c, values, v=None):
+        """
+        Initialize variables.
+
+        :param values: Value of one group per group size
+        :param v: Number of VIP groups per group size that need to be seated, none by default
+        """
+        self.values = values
+        # Groups without a positive value are never seated, so they need no window variables
+        ng = [n if value > EPSILON else 0 for n, value in zip(ng, values)]
+        super().__init__(g, ng, r, c, v or [0] * MAX_GROUP_SIZE)
+
+    def add_objective(self):
+        """Add the objective function to the model: the total value of the seated groups."""
+        self.model += lpSum(self.values[size - 1] * lpSum(size_dict.values()) for size, size_dict in self.windows.items())
+
+    def get_seating(self):
+        """
+        Read the seating from the solved model.
+
+        :return: Seating
+        """
+        taken = tuple((row, col + i) for row, col, size in self.solution.placements for i in range(size))
+        return Seating(self.solution.seats, self.solution.groups, taken)
+
+    def is_proven(self):
+        """Return True if CBC proved that the seating from the solved model is the most valuable one."""
+        return self.status == "Optimal" and self.model.sol_status == LpSolutionOptimal
+
+
+class DecomposedProblem:
+    """
+    Solves the offline problem per component of seats that are within corona distance of each other.
+    Empty rows, empty columns and separate islands of seats each split the grid into components.
+
+    The components only share the number of groups of each size. A master problem chooses one seating per component,
+    such that the groups of all chosen seatings are available. New seatings are generated by column generation:
+    each component is solved as a small ILP in which every group is worth its seats minus the price of its group size in the master problem.
+    """
+
+    def __init__(self, g, ng, r, c, v, exact=True):
+        """
+        Initialize variables.
+
+        :param exact: If True, solve the whole grid as one SparseProblem when the chosen seatings are not proven optimal
+        """
+        self.grid = g
+        self.number_of_groups = ng
+        self.rows = r
+        self.cols = c
+        self.vips = v
+        self.exact = exact
+
+        self.components = self.get_components()
+        self.chosen = []
+        self.bound = None
+        self.status = None
+        self.seatings_cache = {}
+        # Progress and time limit of the running solve, which the pricing problems share
+        self.progress = None
+        self.time_limit = TIME_LIMIT
+        # False once a pricing problem was stopped before its seating was proven the most valuable
+        self.proven = True
+
+    def get_components(self):
+        """
+        Split the seats of the grid into components, by searching through the neighboors of each seat.
+
+        :return: List of Components, ordered by their first seat
+        """
+        table = NeighboorTable([[int(position) for position in row] for row in self.grid])
+        component_of = {}
+        components = []
+        for index in range(self.rows * self.cols):
+            row, col = table.get_coordinates(index)
+            if int(self.grid[row][col]) != 1 or index in component_of:
+                continue
+            component_of[index] = len(components)
+            members = [index]
+            for member in members:
+                for neighboor in table.get_neighboors(member):
+                    if neighboor not in component_of:
+                        component_of[neighboor] = len(components)
+                        members.append(neighboor)
+            components.append(self.create_component([table.get_coordinates(member) for member in members]))
+        return components
+
+    @staticmethod
+    def create_component(coordinates):
+        """
+        Create a component with the smallest grid that contains the given seats.
+
+        :param coordinates: List of (row, column) of the seats of the component
+        :return: Component
+        """
+        begin_row = min(row for row, _ in coordinates)
+        begin_col = min(col for _, col in coordinates)
+        rows = max(row for row, _ in coordinates) - begin_row + 1
+        cols = max(col for _, col in coordinates) - begin_col + 1
+        grid = [[0] * cols for _ in range(rows)]
+        for row, col in coordinates:
+            grid[row - begin_row][col - begin_col] = 1
+        return Component(begin_row, begin_col, grid)
+
+    def get_solution(self, time_limit=TIME_LIMIT, gap=0, callback=None):
+        """
+        Find the best seating of every component on its own. If the components together do not use more groups than there are,
+        these seatings are optimal. Otherwise continue with column generation, until the time limit has passed.
+
+        :param time_limit: Number of seconds that the solve may take
+        :param gap: Only solve the whole grid if the chosen seatings may take more than this fraction less than the optimum
+        :param callback: Function that is called with an Incumbent whenever a better seating is found
+        :return: Incumbent with the chosen seatings and the bound on the optimum
+        """
+        values = list(range(1, MAX_GROUP_SIZE + 1))
+        if len(self.components) == 1:
+            # Without other components, the VIPs can be seated by the ILP of the component itself
+            component = self.components[0]
+            p = PricingProblem(component.grid, self.number_of_groups.copy(), len(component.grid), len(component.grid[0]),
+                               values, self.vips)
+            incumbent = p.get_solution(time_limit, gap, callback)
+            self.chosen = [p.get_seating()]
+            self.bound = incumbent.bound
+            self.status = LpStatus[p.model.status]
+            return incumbent
+
+        progress = Progress(callback)
+        self.progress, self.time_limit, self.proven = progress, time_limit, True
+        for component in self.components:
+            component.seatings.append(self.solve_component(component, values))
+        self.chosen = [component.seatings[-1] for component in self.components]
+        # The best seatings of the components only bound the optimum if they are proven the best
+        self.bound = sum(seating.seats for seating in self.chosen) if self.proven else None
+        progress.update(bound=self.bound)
+        if self.fits_budget(self.chosen):
+            self.status = "Optimal"
+            progress.update(seats=self.get_taken_seats())
+            return progress.get_incumbent()
+
+        for _ in range(MAX_ITERATIONS):
+            if progress.get_elapsed() > time_limit:
+                break
+            master, choices = self.solve_master(integer=False)
+            values = self.get_group_values(master)
+            # Lagrangian bound: the LP value plus the improvement that each component could still make
+            bound = master.objective.value()
+            added = False
+            self.proven = True
+            for index, component in enumerate(self.components):
+                seating = self.solve_component(component, values)
+                reduced = sum(values[size] * seating.groups[size] for size in range(MAX_GROUP_SIZE))
+                reduced -= master.constraints[f"Component{index}"].pi
+                if reduced > EPSILON and seating not in component.seatings:
+                    component.seatings.append(seating)
+                    added = True
+                bound += max(reduced, 0)
+            if self.proven:
+                self.bound = bound if self.bound is None else min(self.bound, bound)
+            if not added:
+                break
+        progress.update(bound=self.bound)
+
+        master, choices = self.solve_master(integer=True)
+        self.chosen = self.get_chosen(master, choices)
+        if self.chosen is None:
+            self.status = "Infeasible" if LpStatus[master.status] == "Infeasible" else "Not Solved"
+            self.chosen = [EMPTY_SEATING] * len(self.components)
+        else:
+            self.status = "Optimal"
+            self.improve_chosen()
+            progress.update(seats=self.get_taken_seats())
+        incumbent = progress.get_incumbent(self.get_taken_seats())
+        if self.exact and (incumbent.gap is None or incumbent.gap > gap) and progress.get_elapsed() < time_limit:
+            self.solve_whole_grid(progress.get_remaining(time_limit), gap, progress)
+            incumbent = progress.get_incumbent(self.get_taken_seats())
+        if self.status != "Optimal":
+            # Without a seating of the VIPs, the empty seating is returned and nothing is known about the optimum
+            incumbent = Incumbent(0, None, progress.get_elapsed())
+        self.bound = incumbent.bound
+        return incumbent
+
+    def improve_chosen(self):
+        """
+        Add seatings close to the chosen ones to the master problem, and solve it again while that takes more seats.
+        For each component these are the best seating with the groups that the other components leave,
+        and the best seatings with one group less of a size that the component uses.
+        """
+        while (self.bound is None or self.get_taken_seats() < self.bound - EPSILON) and self.get_remaining_time() > 0:
+            taken = self.get_taken_seats()
+            for index, component in enumerate(self.components):
+                others = [seating for number, seating in enumerate(self.chosen) if number != index]
+                left = [self.number_of_groups[size] - sum(seating.groups[size] for seating in others) for size in range(MAX_GROUP_SIZE)]
+                budgets = [left]
+                for size in range(MAX_GROUP_SIZE):
+                    if self.chosen[index].groups[size] > 0:
+                        budget = left.copy()
+                        budget[size] = self.chosen[index].groups[size] - 1
+                        budgets.append(budget)
+                for budget in budgets:
+                    seating = self.solve_component(component, list(range(1, MAX_GROUP_SIZE + 1)), budget)
+                    if seating not in component.seatings:
+                        component.seatings.append(seating)
+
+            master, choices = self.solve_master(integer=True)
+            chosen = self.get_chosen(master, choices)
+            if chosen is None or sum(seating.seats for seating in chosen) <= taken:
+                break
+            self.chosen = chosen
+
+    def solve_whole_grid(self, time_limit=TIME_LIMIT, gap=0, progress=None):
+        """
+        Solve the grid as one SparseProblem, and take its solution as the seating of the components if it takes more seats.
+
+        :param time_limit: Number of seconds that the solve may take
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param progress: Progress of the solve, which gets the seatings and the bound of the SparseProblem
+        """
+        progress = progress or Progress()
+        p = SparseProblem([row[:] for row in self.grid], self.number_of_groups.copy(), self.rows, self.cols, self.vips)
+        p.get_solution(time_limit, gap, lambda incumbent: progress.update(incumbent.seats, incumbent.bound))
+        if p.status != "Optimal" or p.get_taken_seats() <= self.get_taken_seats():
+            progress.update(bound=p.bound)
+            return
+        self.status = p.status
+        component_of = {}
+        for index, component in enumerate(self.components):
+            for row in range(len(component.grid)):
+                for col in range(len(component.grid[0])):
+                    if component.grid[row][col] == 1:
+                        component_of[(component.begin_row + row, component.begin_col + col)] = index
+
+        taken_by_component = [[] for _ in self.components]
+        groups_by_component = [[0] * MAX_GROUP_SIZE for _ in self.components]
+        for row, col, size in p.solution.placements:
+            index = component_of[(row, col)]
+            component = self.components[index]
+            taken_by_component[index] += [(row - component.begin_row, col + i - component.begin_col) for i in range(size)]
+            groups_by_component[index][size - 1] += 1
+        self.chosen = [
+            Seating(len(taken), tuple(groups), tuple(taken)) for taken, groups in zip(taken_by_component, groups_by_component)
+        ]
+        progress.update(seats=self.get_taken_seats(), bound=p.bound)
+
+    def fits_budget(self, seatings):
+        """
+        Check if the given seatings together use at most the available groups and at least the VIP groups.
+
+        :param seatings: List of Seatings
+        :return: Boolean
+        """
+        for size in range(MAX_GROUP_SIZE):
+            used = sum(seating.groups[size] for seating in seatings)
+            if used > self.number_of_groups[size] or used < self.vips[size]:
+                return False
+        return True
+
+    def get_remaining_time(self):
+        """Return the number of seconds that are left of the time limit of the running solve, negative once it has passed."""
+        if self.progress is None:
+            return self.time_limit
+        return self.time_limit - self.progress.get_elapsed()
+
+    def solve_component(self, component, values, budget=None):
+        """
+        Find the most valuable seating of a component within the time that is left. Components with the same grid share their seatings.
+        A seating that is not proven the most valuable one is not shared, and sets proven to False.
+
+        :param component: Component
+        :param values: Value of one group per group size
+        :param budget: Number of groups per group size that the component can use, all groups by default
+        :return: Seating, empty once the time limit has passed
+        """
+        budget = budget or self.number_of_groups
+        key = (tuple(map(tuple, component.grid)), tuple(values), tuple(budget))
+        if key in self.seatings_cache:
+            return self.seatings_cache[key]
+        if self.get_remaining_time() <= 0:
+            self.proven = False
+            return EMPTY_SEATING
+
+        p = PricingProblem(component.grid, budget.copy(), len(component.grid), len(component.grid[0]), values)
+        p.get_solution(max(self.get_remaining_time(), MIN_TIME_LIMIT))
+        seating = p.get_seating()
+        if p.is_proven():
+            self.seatings_cache[key] = seating
+        else:
+            self.proven = False
+        return seating
+
+    def solve_master(self, integer):
+        """
+        Choose one seating for each component, such that the most seats are taken and the groups are available.
+
+        :param integer: If False, solve the LP relaxation to get the prices of the group sizes
+        :return: The solved model, and per component a list of tuples with a seating and its variable
+        """
+        master = LpProblem(name="Cinema_Seating_Master", sense=LpMaximize)
+        category = "Binary" if integer else "Continuous"
+        choices = [
+            [(seating, LpVariable(name=f"c{index}_{number}", lowBound=0, upBound=1, cat=category))
+             for number, seating in enumerate(component.seatings)]
+            for index, component in enumerate(self.components)
+        ]
+        for index, choice in enumerate(choices):
+            master += (lpSum(var for _, var in choice) == 1, f"Component{index}")
+        for size in range(MAX_GROUP_SIZE):
+            used = lpSum(seating.groups[size] * var for choice in choices for seating, var in choice if seating.groups[size])
+            master += (used <= self.number_of_groups[size], f"GroupCheck_{SIZE_STRINGS[size]}")
+            if self.vips[size] != 0:
+                master += (used >= self.vips[size], f"VIPCheck_{SIZE_STRINGS[size]}")
+        master += lpSum(seating.seats * var for choice in choices for seating, var in choice)
+        master.solve(PULP_CBC_CMD(timeLimit=max(self.get_remaining_time(), MIN_TIME_LIMIT), msg=False, gapRel=0))
+        return master, choices
+
+    def get_chosen(self, master, choices):
+        """
+        Read the seating that the integer master problem chose for each component.
+
+        :param master: The solved master problem
+        :param choices: Per component a list of tuples with a seating and its variable
+        :return: List of Seatings, None if CBC found no seating that uses the available groups and seats the VIPs
+        """
+        if LpStatus[master.status] != "Optimal":
+            return None
+        chosen = [
+            next((seating for seating, var in choice if round(var.value() or 0) == 1), EMPTY_SEATING) for choice in choices
+        ]
+        return chosen if self.fits_budget(chosen) else None
+
+    def get_group_values(self, master):
+        """
+        Get the value of one group per group size: its number of seats minus the price of the group size in the master problem.
+
+        :param master: The solved LP relaxation of the master problem
+        :return: List of values per group size
+        """
+        values = []
+        for size in range(MAX_GROUP_SIZE):
+            price = master.constraints[f"GroupCheck_{SIZE_STRINGS[size]}"].pi
+            if self.vips[size] != 0:
+                price += master.constraints[f"VIPCheck_{SIZE_STRINGS[size]}"].pi
+            values.append(size + 1 - price)
+        return values
+
+    def update_grid(self):
+        """Update the grid with the found solution by filling in the seats that are taken."""
+        for row in range(self.rows):
+            for col in range(self.cols):
+                self.grid[row][col] = "1" if str(self.grid[row][col]) in ("1", "x") else "0"
+        for component, seating in zip(self.components, self.chosen):
+            for row, col in seating.taken:
+                self.grid[component.begin_row + row][component.begin_col + col] = "x"
+
+    def output(self):
+        """Update the grid with the found solution and print the output."""
+        self.update_grid()
+        for r in range(self.rows):
+            print("".join(self.grid[r]))
+
+    def update_group_sizes(self):
+        """Update the list of group sizes."""
+        for size in range(MAX_GROUP_SIZE):
+            self.number_of_groups[size] -= sum(seating.groups[size] for seating in self.chosen)
+
+    def get_taken_seats(self):
+        """Return the number of taken seats in the given grid."""
+        return sum(seating.seats for seating in self.chosen)
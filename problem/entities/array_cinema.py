@@ -0,0 +1,407 @@
+import numpy as np
+from tabulate import tabulate
+from .cinema import FreeRunIndex
+from .neighboors import NeighboorTable
+
+
+class ArrayCinema:
+    """
+    Cinema backend that stores the state of every position in compact NumPy arrays, instead of one Seat or Spacer object per position.
+    It exposes the same public methods as Cinema, so the online algorithms can run on it unchanged.
+    ...
+
+    Attributes
+    ----------
+    seats : numpy.ndarray(bool)
+        seats[row, column] is True if there is a seat at that position, False for a spacer
+    eligible : numpy.ndarray(bool)
+        eligible[row, column] is True if a group can still be placed on the seat
+    taken : numpy.ndarray(bool)
+        taken[row, column] is True if the seat is occupied by a group
+    taken_by : numpy.ndarray(int32)
+        Index of the group that occupies the seat in group_ids, -1 if the seat is not taken
+    group_ids : dict
+        Group id per index of a seated group. The index of a released group is removed, so the dict only holds the seated groups
+    blockers : numpy.ndarray(int32)
+        Number of seated groups that have the seat within corona distance
+    group_seats : dict
+        Coordinates of the seats of each seated group that has an id
+
+    Positions are represented by their coordinates: tuple(row, column), wherever Cinema would return a position object.
+    """
+
+    def __init__(self, grid, row_nr, column_nr):
+        """Creates a cinema object that holds the state of the seats in arrays, and the number of rows and columns.
+
+        Args:
+            grid (list(list)): A list with lists containing 0s for no seats, and 1s for seats: grid[row][column]
+            row_nr (int): Number of rows in the cinema
+            column_nr (int): Number of columns in the cinema
+        """
+        self.grid = grid  # list of lists
+        self.row_nr = row_nr  # int
+        self.column_nr = column_nr  # int
+        self.seats = self._init_seats()
+        self.eligible = self.seats.copy()
+        self.taken = np.zeros(self.seats.shape, dtype=np.bool_)
+        self.taken_by = np.full(self.seats.shape, -1, dtype=np.int32)
+        self.group_ids = {}
+        # Index of the next group that is placed. It is never reused, also not after a restore, so that it differs from the seated groups
+        self.next_group_index = 0
+        self.blockers = np.zeros(self.seats.shape, dtype=np.int32)
+        self.group_seats = {}
+        self.neighboor_table = NeighboorTable(self.seats)
+        self.free_runs = self._init_free_runs()
+
+    def _init_seats(self):
+        """Initializes the seats array from the grid
+
+        Raises:
+            ValueError: is raised if during initialization of the object, the grid argument contains any item other than integer 0 or 1
+
+        Returns:
+            numpy.ndarray(bool): seats[row, column]
+        """
+        grid_array = np.array(self.grid, dtype=np.int64, ndmin=2)
+        invalid = (grid_array != 0) & (grid_array != 1)
+        if invalid.any():
+            row_nr, column_nr = np.argwhere(invalid)[0]
+            raise ValueError(
+                "invalid value found in grid: should be '0' or '1', but is",
+                self.grid[row_nr][column_nr],
+            )
+        return grid_array == 1
+
+    def _init_free_runs(self):
+        """Initiates the index with the uninterrupted series of eligible seats in each row
+
+        Returns:
+            FreeRunIndex
+        """
+        free_runs = FreeRunIndex(*self.seats.shape)
+        for row_nr in range(self.seats.shape[0]):
+            self._update_free_runs(free_runs, row_nr)
+        return free_runs
+
+    def _update_free_runs(self, free_runs, row_nr):
+        """Recomputes the series of eligible seats for one row
+
+        Args:
+            free_runs (FreeRunIndex): index to update
+            row_nr (int): row that changed
+        """
+        free_runs.update_row(row_nr, self.eligible[row_nr].tolist())
+
+    def __str__(self) -> str:
+        print_grid = tabulate(self._get_state_characters())
+        return (
+            f"\nCinema with properties:\n\n"
+            f"Number of rows: {self.row_nr}\n"
+            f"Number of columns: {self.column_nr}\n"
+            f"Seating grid: \n{print_grid}"
+        )
+
+    def _get_state_characters(self):
+        """Represents each position with the same characters as Seat and Spacer: F(ree), T(aken), U(navailable) or X (spacer)
+
+        Returns:
+            numpy.ndarray(str)
+        """
+        characters = np.full(self.seats.shape, "X")
+        characters[self.seats] = "U"
+        characters[self.taken] = "T"
+        characters[self.eligible] = "F"
+        return characters
+
+    def _in_grid(self, coordinates):
+        row_nr, column_nr = self.seats.shape
+        return 0 <= coordinates[0] < row_nr and 0 <= coordinates[1] < column_nr
+
+    def get_position(self, coordinates):
+        """Returns the position at the given coordinates. Since the state is stored in arrays, a position is the coordinates tuple itself.
+
+        Args:
+            coordinates (tuple(int, int)): (row, column)
+
+        Raises:
+            IndexError: If the coordinates are outside of the grid
+
+        Returns:
+            tuple(int, int): (row, column)
+        """
+        coordinates = (int(coordinates[0]), int(coordinates[1]))
+        if not self._in_grid(coordinates):
+            raise IndexError("Coordinates are outside of the cinema:", coordinates)
+        return coordinates
+
+    def get_group_id(self, coordinates):
+        """Returns the id of the group that occupies the seat at the given coordinates
+
+        Args:
+            coordinates (tuple(int, int)): (row, column)
+
+        Returns:
+            ?: The group id that was given to place_group, None if the seat is not taken
+        """
+        group_index = self.taken_by[coordinates[0], coordinates[1]]
+        if group_index < 0:
+            return None
+        return self.group_ids[group_index]
+
+    def get_neighboors_from_coordinates(self, coordinates):
+        """Generates a list with all neighboors for given coordinates
+
+        Args:
+            coordinates (tuple(int, int)): (row, column)
+
+        Returns:
+            list(tuple(int, int)): every position that is neighbooring to the inputted coordinates. Excluding the input position
+        """
+        return self.get_neighboors_from_position(self.get_position(coordinates))
+
+    def get_neighboors_from_position(self, position):
+        """Generates a list with all neighbooring seats for given position
+
+        Args:
+            position (tuple(int, int)): tuple(row, column)
+
+        Returns:
+            list(tuple(int, int)): every seat that is neighbooring to the inputted coordinates. Excluding the input position
+        """
+        table = self.neighboor_table
+        return [
+            table.get_coordinates(neighboor)
+            for neighboor in table.get_neighboors(table.get_index(position))
+        ]
+
+    def get_eligible_neighboors_from_position(self, position):
+        """Gathers all neighboors that are still eligible (so not occupied or unavailable) from input position
+
+        Args:
+            position (tuple(int, int))
+
+        Returns:
+            list(tuple(int, int))
+        """
+        eligible = self.eligible
+        return [
+            neighboor
+            for neighboor in self.get_neighboors_from_position(position)
+            if eligible[neighboor]
+        ]
+
+    def get_eligible_neighboors_from_group_of_coordinates(
+        self, coordinates_list: list
+    ) -> set:
+        """Gather all neighboors that are within corona distance of the given list of coordinates
+
+        Args:
+            coordinates_list (list(tuple(row_nr, column_nr))): List with coordinates for the positions that neighboors need to be collected for.
+
+        Returns:
+            set(tuple(int, int)): a set with the coordinates of the eligible neighboors
+        """
+        result = set()
+        for coordinates in coordinates_list:
+            result.update(self.get_eligible_neighboors_from_position(coordinates))
+
+        # Remove the seats that are input from the set, but only if the group of seats is greater than 1
+        if len(coordinates_list) > 1:
+            for coordinates in coordinates_list:
+                result.remove(tuple(coordinates))
+        return result
+
+    def get_placement_position_coordinates(self):
+        """Generates a list with tuples containing the coordinates of still eligible seats
+
+        Returns:
+            list(tuple): tuple(row, column)
+        """
+        return self.free_runs.get_coordinates()
+
+    def get_occupied_seats(self):
+        """Generates a list with the coordinates of the seats that are taken
+
+        Returns:
+            list(tuple): tuple(row, column)
+        """
+        rows, columns = np.nonzero(self.taken)
+        return list(zip(rows.tolist(), columns.tolist()))
+
+    def get_placement_possibilities(self):
+        """Returns a list with each uninterrupted series of eligible seats in a row, ordered from the top left to the bottom right of the grid.
+
+        Returns:
+            list(PlacementPossibility):
+        """
+        return self.free_runs.get_placement_possibilities()
+
+    def place_group(self, coordinates, size, group_id=None):
+        """Occupies the places in the seating grid
+
+        Args:
+            coordinates (tuple(int, int)): first int denotes row, second int denotes lefter occupied seat
+            size (int): number of seats that will be taken
+            group_id (?, optional): Group id, to later determine which group occupies these seats, and to release the group with release_group. Defaults to None.
+
+        Raises:
+            Exception: If a group with the same id is already seated
+        """
+        if group_id is not None and group_id in self.group_seats:
+            raise Exception("A group with this id is already seated:", group_id)
+
+        row = int(coordinates[0])
+        column = int(coordinates[1])
+        group_coordinates = [(row, column + n) for n in range(size)]
+        self.occupy_seats(group_coordinates, group_id)
+        self.blockers.flat[self.get_group_neighboor_indices(group_coordinates)] += 1
+
+        # Everything within two columns in the same row, and within one column in the rows above and below is a neighboor
+        self.make_seats_unavailable(
+            [
+                (row, slice(max(column - 2, 0), column + size + 2)),
+                (slice(max(row - 1, 0), row + 2), slice(max(column - 1, 0), column + size + 1)),
+            ]
+        )
+        if group_id is not None:
+            self.group_seats[group_id] = tuple(group_coordinates)
+
+        # Only the row of the group and the rows directly above and below it have changed
+        self._update_free_runs_around(row)
+
+    def release_group(self, group_id):
+        """Frees the seats of a seated group, for example when it cancels. Only the seats of the group and its neighboors are updated:
+        a neighboor becomes eligible again once no other seated group has it within corona distance.
+
+        Args:
+            group_id (?): Id that was given to place_group
+
+        Raises:
+            KeyError: If no group with this id is seated
+
+        Returns:
+            tuple(tuple(int, int)): Coordinates of the seats that the group occupied
+        """
+        try:
+            group_coordinates = self.group_seats.pop(group_id)
+        except KeyError:
+            raise KeyError("No group with this id is seated:", group_id) from None
+
+        del self.group_ids[int(self.taken_by[group_coordinates[0]])]
+        for position in group_coordinates:
+            self.eligible[position] = True
+            self.taken[position] = False
+            self.taken_by[position] = -1
+        neighboors = self.get_group_neighboor_indices(group_coordinates)
+        self.blockers.flat[neighboors] -= 1
+        self.eligible.flat[neighboors] = (self.blockers.flat[neighboors] == 0) & ~self.taken.flat[neighboors]
+
+        self._update_free_runs_around(group_coordinates[0][0])
+        return group_coordinates
+
+    def get_group_neighboor_indices(self, coordinates_list):
+        """Gathers the seats within corona distance of a group
+
+        Args:
+            coordinates_list (list(tuple(int, int))): Coordinates of the seats of the group
+
+        Returns:
+            list(int): flat indices of the neighbooring seats, see NeighboorTable. Excluding the seats of the group
+        """
+        table = self.neighboor_table
+        return table.get_group_neighboors([table.get_index(coordinates) for coordinates in coordinates_list])
+
+    def _update_free_runs_around(self, row):
+        """Recomputes the series of eligible seats of a row and the rows directly above and below it
+
+        Args:
+            row (int): row of a group that was placed or released
+        """
+        for row_nr in range(max(row - 1, 0), min(row + 2, self.seats.shape[0])):
+            self._update_free_runs(self.free_runs, row_nr)
+
+    def snapshot(self):
+        """Takes a snapshot of the occupancy state of all seats in O(seats), so that the cinema can later be brought back to this state with restore
+
+        Returns:
+            tuple: Opaque snapshot, to be passed to restore of this cinema
+        """
+        return (
+            self.eligible.copy(),
+            self.taken.copy(),
+            self.taken_by.copy(),
+            self.group_ids.copy(),
+            self.free_runs.copy(),
+            self.blockers.copy(),
+            self.group_seats.copy(),
+        )
+
+    def restore(self, snapshot):
+        """Brings the occupancy state of all seats back to the moment the snapshot was taken
+
+        Args:
+            snapshot (tuple): Snapshot from the snapshot method of this cinema
+        """
+        eligible, taken, taken_by, group_ids, free_runs, blockers, group_seats = snapshot
+        np.copyto(self.eligible, eligible)
+        np.copyto(self.taken, taken)
+        np.copyto(self.taken_by, taken_by)
+        self.group_ids = group_ids.copy()
+        np.copyto(self.blockers, blockers)
+        self.group_seats = group_seats.copy()
+        # The snapshot can be restored more than once, so the index in it is not used itself
+        self.free_runs = free_runs.copy()
+
+    def load_eligible(self, eligible):
+        """Brings the cinema to the state in which exactly the given seats are eligible and no seat is taken. Groups are then placed as in a cinema with that eligibility, so that placements in another cinema can be simulated on this one.
+        The seats that are not eligible get a blocker that is never released, so they stay unavailable when a group placed afterwards is released.
+
+        Args:
+            eligible (numpy.ndarray(bool)): eligible[row, column], of the same shape as the seats
+        """
+        np.copyto(self.eligible, eligible)
+        self.taken[:] = False
+        self.taken_by[:] = -1
+        self.group_ids = {}
+        np.copyto(self.blockers, self.seats & ~self.eligible)
+        self.group_seats = {}
+        self.free_runs = self._init_free_runs()
+
+    def occupy_seats(self, position_list: list, group_id=None):
+        """Occupies seats for positions in input
+
+        Args:
+            position_list (list): A list with coordinates to be set to occupied
+            group_id (?, optional): Group id, to later determine which group occupies these seats. Defaults to None.
+
+        Raises:
+            Exception: If seat that will be occupied is not eligible
+            Exception: If position that will be occupied is a spacer instead of a seat
+        """
+        for position in position_list:
+            if not self.seats[position]:
+                raise Exception(
+                    "Position that is tried to be occupied is no Seat, but a Spacer. Coordinates:",
+                    position,
+                )
+            if not self.eligible[position]:
+                raise Exception(
+                    "Position that is trying to be occupied is not eligible:", position,
+                )
+
+        group_index = self.next_group_index
+        self.next_group_index += 1
+        self.group_ids[group_index] = group_id
+        for position in position_list:
+            self.eligible[position] = False
+            self.taken[position] = True
+            self.taken_by[position] = group_index
+
+    def make_seats_unavailable(self, position_list):
+        """Sets the seats to unavailable. Spacers and taken seats are left as they are.
+
+        Args:
+            position_list (list): list with coordinates (or slices of them) to be set to unavailable
+        """
+        for position in position_list:
+            self.eligible[position] = False
@@ -1,10 +1,10 @@
 from typing import NamedTuple, Tuple
 from tabulate import tabulate
-from .utils import get_neighboors_from_grid, create_cinema_graph
+from bisect import bisect_left, insort
+import numpy as np
+from .neighboors import NeighboorTable
 from .positions import Seat, Spacer
-from itertools import groupby
-from operator import itemgetter
-from collections import namedtuple
+from .input import Input
 
 
 class Cinema:
@@ -20,7 +20,15 @@ class Cinema:
         self.row_nr = row_nr  # int
         self.column_nr = column_nr  # int
         self.seating_grid = self._init_seating_grid()
-        self.seating_graph = self._init_seating_graph()
+        self.eligible = self._init_eligible()
+        self.neighboor_table = NeighboorTable(self.eligible)
+        self._positions = [position for row in self.seating_grid for position in row]
+        self._seats = [position for position in self._positions if isinstance(position, Seat)]
+        self.free_runs = self._init_free_runs()
+        # Number of seated groups that have the seat within corona distance, per position
+        self.blockers = np.zeros(self.eligible.shape, dtype=np.int32)
+        # Coordinates of the seats of each seated group that has an id
+        self.group_seats = {}
 
     def _init_seating_grid(self):
         """Initializes seating_grid which is the same as grid, but has objects populating the positions instead of 0s or 1s. 
@@ -47,13 +55,37 @@ class Cinema:
 
         return seating_grid
 
-    def _init_seating_graph(self):
-        """Initiates the seating graph, which is used to determine neighboors of each seat
+    def _init_eligible(self):
+        """Initiates the eligibility array, which mirrors the eligible attribute of the seats so that it can be evaluated in vectorised form. Initially every seat is eligible.
 
         Returns:
-            networkx.Graph: A graph with nodes representing Position objects (Seat or Spacer), and the edges denote the positions that are within Corona distance.
+            numpy.ndarray(bool): eligible[row, column]
         """
-        return create_cinema_graph(self.seating_grid)
+        return np.array(
+            [[isinstance(position, Seat) for position in row] for row in self.seating_grid],
+            dtype=np.bool_,
+            ndmin=2,
+        )
+
+    def _init_free_runs(self):
+        """Initiates the index with the uninterrupted series of eligible seats in each row
+
+        Returns:
+            FreeRunIndex
+        """
+        free_runs = FreeRunIndex(*self.eligible.shape)
+        for row_nr in range(self.eligible.shape[0]):
+            self._update_free_runs(free_runs, row_nr)
+        return free_runs
+
+    def _update_free_runs(self, free_runs, row_nr):
+        """Recomputes the series of eligible seats for one row
+
+        Args:
+            free_runs (FreeRunIndex): index to update
+            row_nr (int): row that changed
+        """
+        free_runs.update_row(row_nr, self.eligible[row_nr].tolist())
 
     def __str__(self) -> str:
         print_grid = tabulate(self.seating_grid)
@@ -80,16 +112,17 @@ class Cinema:
         return self.get_neighboors_from_position(position)
 
     def get_neighboors_from_position(self, position):
-        """Generates a list with all neighboors for given position
+        """Generates a list with all neighbooring seats for given position
 
         Args:
-            position (tuple(int, int)): tuple(row, column)
+            position (Position)
 
         Returns:
-            list(position objects): every position that is neighbooring to the inputted coordinates. Excluding the input position
+            list(Seat): every seat that is neighbooring to the inputted position. Excluding the input position
         """
-        position_container = self.seating_graph[position]
-        return [position for position in position_container]
+        positions = self._positions
+        index = self.neighboor_table.get_index(position.get_coordinates())
+        return [positions[neighboor] for neighboor in self.neighboor_table.get_neighboors(index)]
 
     def get_eligible_neighboors_from_position(self, position):
         """Gathers all neighboors that are still eligible (so not occupied or unavailable) from input position
@@ -100,21 +133,11 @@ class Cinema:
         Returns:
             list(position)
         """
-        all_neighboors = self.get_neighboors_from_position(position)
-
-        eligible_positions = []
-        for position in all_neighboors:
-            try:
-                is_position_eligible = position.eligible
-            except AttributeError:
-                if isinstance(position, Spacer):
-                    continue
-                else:
-                    raise
-            if is_position_eligible:
-                eligible_positions.append(position)
-
-        return eligible_positions
+        return [
+            neighboor
+            for neighboor in self.get_neighboors_from_position(position)
+            if neighboor.eligible
+        ]
 
     def get_eligible_neighboors_from_group_of_coordinates(
         self, coordinates_list: list
@@ -152,19 +175,7 @@ class Cinema:
         Returns:
             list(tuple): tuple(row, column)
         """
-        # scan through grid for eligible seats
-        eligible_coordinates = []
-        for row in self.seating_grid:
-            for position in row:
-                try:
-                    if position.eligible:
-                        eligible_coordinates.append(position.get_coordinates())
-                except AttributeError:
-                    if isinstance(position, Spacer):
-                        pass
-                    else:
-                        raise
-        return eligible_coordinates
+        return self.free_runs.get_coordinates()
 
     def get_occupied_seats(self):
         occupied_seats = []
@@ -181,31 +192,12 @@ class Cinema:
         return occupied_seats
 
     def get_placement_possibilities(self):
-        """Returns a list with dictionaries in which as keys the max group size that can be placed for that item, and as value the position coordinates of the lefter seat of that item.
+        """Returns a list with each uninterrupted series of eligible seats in a row, ordered from the top left to the bottom right of the grid.
 
         Returns:
-            list(PlacementPossibility): 
+            list(PlacementPossibility):
         """
-        coord_list = self.get_placement_position_coordinates()
-
-        result = []
-        for row in groupby(coord_list, lambda x: x[0]):  # Group by row
-            coords = list(row[1])
-            row_number = coords[0][0]
-            col_numbers_sorted = sorted([coord[1] for coord in coords])
-
-            # Creates a seperate list of each uninterrupted seats next to each other that are available -> single placement possibility
-            series_list = [
-                list(map(itemgetter(1), g))
-                for k, g in groupby(
-                    enumerate(col_numbers_sorted), lambda x: x[0] - x[1]
-                )
-            ]
-            # For each of this placement possibility, return a dict item with as key the number of seats in that possibility, and as value the most lefter seat belonging to that possibility
-            for serie in series_list:
-                result.append(PlacementPossibility(len(serie), (row_number, serie[0])))
-
-        return result
+        return self.free_runs.get_placement_possibilities()
 
     def place_group(self, coordinates, size, group_id=None):
         """Occupies the places in the seating grid
@@ -213,29 +205,120 @@ class Cinema:
         Args:
             coordinates (tuple(int, int)): first int denotes row, second int denotes lefter occupied seat
             size (int): number of seats that will be taken
-            group_id (?, optional): Group id, to later determine which group occupies these seats. Defaults to None.
+            group_id (?, optional): Group id, to later determine which group occupies these seats, and to release the group with release_group. Defaults to None.
+
+        Raises:
+            Exception: If a group with the same id is already seated
         """
+        if group_id is not None and group_id in self.group_seats:
+            raise Exception("A group with this id is already seated:", group_id)
+
         # Gather position objects
-        positions = []
-        for n in range(size):
-            row = int(coordinates[0])
-            column = int(coordinates[1]) + n
-            positions.append(self.get_position((row, column)))
+        row = int(coordinates[0])
+        group_coordinates = [(row, int(coordinates[1]) + n) for n in range(size)]
+        positions = [self.get_position(position_coordinates) for position_coordinates in group_coordinates]
         self.occupy_seats(positions, group_id)
 
-        # Gather all neighboors for position objects
-        eligible_neighboors = []
-        for position in positions:
-            eligible_neighboors = (
-                eligible_neighboors
-                + self.get_eligible_neighboors_from_position(position)
-            )
-        # Remove duplicates
-        eligible_neighboors = set(eligible_neighboors)
+        # Gather all neighboors for position objects, without duplicates
+        neighboors = self.get_group_neighboor_indices(group_coordinates)
+        self.blockers.flat[neighboors] += 1
+        eligible_neighboors = [self._positions[index] for index in neighboors if self._positions[index].eligible]
 
         # Make neighbooring seats unavailble
         self.make_seats_unavailable(eligible_neighboors)
 
+        for position in positions + eligible_neighboors:
+            self.eligible[position.get_coordinates()] = False
+        if group_id is not None:
+            self.group_seats[group_id] = tuple(group_coordinates)
+
+        # Only the row of the group and the rows directly above and below it have changed
+        self._update_free_runs_around(row)
+
+    def release_group(self, group_id):
+        """Frees the seats of a seated group, for example when it cancels. Only the seats of the group and its neighboors are updated:
+        a neighboor becomes eligible again once no other seated group has it within corona distance.
+
+        Args:
+            group_id (?): Id that was given to place_group
+
+        Raises:
+            KeyError: If no group with this id is seated
+
+        Returns:
+            tuple(tuple(int, int)): Coordinates of the seats that the group occupied
+        """
+        try:
+            group_coordinates = self.group_seats.pop(group_id)
+        except KeyError:
+            raise KeyError("No group with this id is seated:", group_id) from None
+
+        neighboors = self.get_group_neighboor_indices(group_coordinates)
+        self.blockers.flat[neighboors] -= 1
+        for position_coordinates in group_coordinates:
+            self.get_position(position_coordinates).free_seat()
+            self.eligible[position_coordinates] = True
+        for index in neighboors:
+            position = self._positions[index]
+            if self.blockers.flat[index] == 0 and not position.taken:
+                position.free_seat()
+                self.eligible.flat[index] = True
+
+        self._update_free_runs_around(group_coordinates[0][0])
+        return group_coordinates
+
+    def get_group_neighboor_indices(self, coordinates_list):
+        """Gathers the seats within corona distance of a group
+
+        Args:
+            coordinates_list (list(tuple(int, int))): Coordinates of the seats of the group
+
+        Returns:
+            list(int): flat indices of the neighbooring seats, see NeighboorTable. Excluding the seats of the group
+        """
+        table = self.neighboor_table
+        return table.get_group_neighboors([table.get_index(coordinates) for coordinates in coordinates_list])
+
+    def _update_free_runs_around(self, row):
+        """Recomputes the series of eligible seats of a row and the rows directly above and below it
+
+        Args:
+            row (int): row of a group that was placed or released
+        """
+        for row_nr in range(max(row - 1, 0), min(row + 2, self.eligible.shape[0])):
+            self._update_free_runs(self.free_runs, row_nr)
+
+    def snapshot(self):
+        """Takes a snapshot of the occupancy state of all seats in O(seats), so that the cinema can later be brought back to this state with restore
+
+        Returns:
+            tuple: Opaque snapshot, to be passed to restore of this cinema
+        """
+        return (
+            self.eligible.copy(),
+            [(seat.eligible, seat.taken, seat.taken_by) for seat in self._seats],
+            self.free_runs.copy(),
+            self.blockers.copy(),
+            self.group_seats.copy(),
+        )
+
+    def restore(self, snapshot):
+        """Brings the occupancy state of all seats back to the moment the snapshot was taken
+
+        Args:
+            snapshot (tuple): Snapshot from the snapshot method of this cinema
+        """
+        eligible_array, seat_states, free_runs, blockers, group_seats = snapshot
+        np.copyto(self.eligible, eligible_array)
+        np.copyto(self.blockers, blockers)
+        self.group_seats = group_seats.copy()
+        for seat, (eligible, taken, taken_by) in zip(self._seats, seat_states):
+            seat.eligible = eligible
+            seat.taken = taken
+            seat.taken_by = taken_by
+        # The snapshot can be restored more than once, so the index in it is not used itself
+        self.free_runs = free_runs.copy()
+
     @staticmethod
     def occupy_seats(position_list: list, group_id=None):
         """Occupies seats for positions in input
@@ -335,3 +418,284 @@ class PlacementPossibility(NamedTuple):
             (self.coordinates[0], self.coordinates[1] + col) for col in range(self.size)
         ]
 
+
+class CinemaTemplate(NamedTuple):
+    """
+    Compact, read-only and picklable description of a cinema and its group sequence, from which fresh cinema objects can be built without reading and parsing the input file again.
+    ...
+
+    Attributes
+    ----------
+    grid : tuple(bytes)
+        One bytes object per row, with 0 for no seat and 1 for a seat
+    row_nr : int
+        Number of rows in the cinema
+    column_nr : int
+        Number of columns in the cinema
+    groups : tuple(int)
+        The group sequence from the input file
+
+    Methods
+    -------
+    from_file(filepath: str):
+        Parses an online input file into a template.
+    build(cinema_class):
+        Creates a new cinema, with all seats free.
+    """
+
+    grid: tuple
+    row_nr: int
+    column_nr: int
+    groups: tuple = ()
+
+    @classmethod
+    def from_file(cls, filepath):
+        """Parses an online input file into a template
+
+        Args:
+            filepath (str): Path to the input file
+
+        Returns:
+            CinemaTemplate
+        """
+        file_input = Input(filepath, "online")
+        return cls(
+            tuple(bytes(row) for row in file_input.grid),
+            file_input.row_nr,
+            file_input.column_nr,
+            tuple(file_input.groups),
+        )
+
+    def build(self, cinema_class=None):
+        """Creates a new cinema from the template, with all seats free
+
+        Args:
+            cinema_class (type, optional): Cinema or ArrayCinema. Defaults to Cinema.
+
+        Returns:
+            Cinema
+        """
+        cinema_class = cinema_class or Cinema
+        return cinema_class([list(row) for row in self.grid], self.row_nr, self.column_nr)
+
+
+class FreeRunIndex:
+    """
+    Index with, for each row, the uninterrupted series of eligible seats as PlacementPossibility objects. The cinema recomputes only the rows that are changed by a placement, so the placement possibilities do not have to be rebuilt from the whole grid for every group.
+    The series are also bucketed on size, so that the fit queries of the online algorithms run in logarithmic time. Ties are always broken on the top left series, like a scan through the grid would do.
+    ...
+
+    Methods
+    -------
+    update_row(row_nr: int, row_eligibility: list):
+        Recomputes the series of eligible seats of a single row.
+    get_placement_possibilities():
+        Returns all series, ordered from the top left to the bottom right of the grid.
+    smallest_at_least(size: int):
+        Returns the first series of the smallest size that still fits size.
+    largest():
+        Returns the first series of the largest size.
+    first_at_least(size: int):
+        Returns the first series in scan order that fits size.
+    """
+
+    def __init__(self, row_nr: int, column_nr: int) -> None:
+        self.column_nr = column_nr
+        self._rows = [[] for _ in range(row_nr)]
+        # Series by position of their first seat: row * column_nr + column
+        self._runs_by_start = {}
+        # Sorted positions of the first seats of all series, per series size
+        self._starts_by_size = {}
+        # Fenwick tree with the number of series per size, to find the smallest or largest size present
+        self._size_tree = [0] * (column_nr + 1)
+        self._size_tree_step = 1 << column_nr.bit_length() >> 1
+        # Max segment tree over the start positions, with as leaf value the size of the series starting there
+        self._leaf_offset = 1 << max(row_nr * column_nr - 1, 0).bit_length()
+        self._start_tree = [0] * (2 * self._leaf_offset)
+
+    def update_row(self, row_nr: int, row_eligibility: list):
+        """Recomputes the series of eligible seats of a row
+
+        Args:
+            row_nr (int): Index of the row
+            row_eligibility (list(bool)): For each column of the row, whether the position is an eligible seat
+        """
+        runs = []
+        start = None
+        for column_nr, eligible in enumerate(row_eligibility):
+            if eligible:
+                if start is None:
+                    start = column_nr
+            elif start is not None:
+                runs.append(PlacementPossibility(column_nr - start, (row_nr, start)))
+                start = None
+        if start is not None:
+            runs.append(
+                PlacementPossibility(len(row_eligibility) - start, (row_nr, start))
+            )
+
+        for run in self._rows[row_nr]:
+            self._remove_run(run)
+        for run in runs:
+            self._add_run(run)
+        self._rows[row_nr] = runs
+
+    def _get_start(self, run):
+        return run.coordinates[0] * self.column_nr + run.coordinates[1]
+
+    def _add_run(self, run):
+        start = self._get_start(run)
+        self._runs_by_start[start] = run
+        insort(self._starts_by_size.setdefault(run.size, []), start)
+        self._update_size_tree(run.size, 1)
+        self._update_start_tree(start, run.size)
+
+    def _remove_run(self, run):
+        start = self._get_start(run)
+        del self._runs_by_start[start]
+        starts = self._starts_by_size[run.size]
+        del starts[bisect_left(starts, start)]
+        self._update_size_tree(run.size, -1)
+        self._update_start_tree(start, 0)
+
+    def _update_size_tree(self, size, delta):
+        tree = self._size_tree
+        while size <= self.column_nr:
+            tree[size] += delta
+            size += size & -size
+
+    def _count_sizes_up_to(self, size):
+        """Returns the number of series with a size smaller than or equal to size"""
+        tree = self._size_tree
+        count = 0
+        while size > 0:
+            count += tree[size]
+            size -= size & -size
+        return count
+
+    def _find_size(self, rank):
+        """Returns the size of the series at the given rank (starting at 1), when all series are sorted on size"""
+        tree = self._size_tree
+        size = 0
+        step = self._size_tree_step
+        while step:
+            if size + step <= self.column_nr and tree[size + step] < rank:
+                size += step
+                rank -= tree[size]
+            step >>= 1
+        return size + 1
+
+    def _update_start_tree(self, start, size):
+        tree = self._start_tree
+        node = start + self._leaf_offset
+        tree[node] = size
+        node >>= 1
+        while node:
+            new_max = max(tree[2 * node], tree[2 * node + 1])
+            if tree[node] == new_max:
+                break
+            tree[node] = new_max
+            node >>= 1
+
+    def _get_first_run_of_size(self, size):
+        return self._runs_by_start[self._starts_by_size[size][0]]
+
+    def smallest_at_least(self, size: int):
+        """Best fit query: the smallest series in which size fits. If there are multiple, the top left one is returned.
+
+        Args:
+            size (int): Minimum size of the series
+
+        Returns:
+            PlacementPossibility: None if no series is large enough
+        """
+        total = len(self._runs_by_start)
+        if size > self.column_nr or total == 0:
+            return None
+        smaller = self._count_sizes_up_to(size - 1) if size > 1 else 0
+        if smaller == total:
+            return None
+        return self._get_first_run_of_size(self._find_size(smaller + 1))
+
+    def largest(self):
+        """Worst fit query: the largest series. If there are multiple, the top left one is returned.
+
+        Returns:
+            PlacementPossibility: None if there are no series
+        """
+        total = len(self._runs_by_start)
+        if total == 0:
+            return None
+        return self._get_first_run_of_size(self._find_size(total))
+
+    def first_at_least(self, size: int):
+        """First fit query: the first series in scan order (top left to bottom right) in which size fits.
+
+        Args:
+            size (int): Minimum size of the series
+
+        Returns:
+            PlacementPossibility: None if no series is large enough
+        """
+        tree = self._start_tree
+        if tree[1] < size:
+            return None
+        node = 1
+        while node < self._leaf_offset:
+            node = 2 * node if tree[2 * node] >= size else 2 * node + 1
+        return self._runs_by_start[node - self._leaf_offset]
+
+    def get_row(self, row_nr: int) -> list:
+        """Returns the series of eligible seats of a row
+
+        Returns:
+            list(PlacementPossibility): ordered from left to right
+        """
+        return self._rows[row_nr]
+
+    def get_placement_possibilities(self) -> list:
+        """Returns all series of eligible seats
+
+        Returns:
+            list(PlacementPossibility): ordered from the top left to the bottom right of the grid
+        """
+        return [run for row in self._rows for run in row]
+
+    def get_coordinates(self) -> list:
+        """Returns the coordinates of all eligible seats
+
+        Returns:
+            list(tuple): tuple(row, column), ordered from the top left to the bottom right of the grid
+        """
+        return [
+            coordinates
+            for row in self._rows
+            for run in row
+            for coordinates in run.get_list_of_seat_coordinates()
+        ]
+
+    def copy(self):
+        """Returns an independent copy of the index
+
+        Returns:
+            FreeRunIndex
+        """
+        index = FreeRunIndex.__new__(FreeRunIndex)
+        index.column_nr = self.column_nr
+        index._rows = self._rows.copy()
+        index._runs_by_start = self._runs_by_start.copy()
+        index._starts_by_size = {
+            size: starts.copy() for size, starts in self._starts_by_size.items()
+        }
+        index._size_tree = self._size_tree.copy()
+        index._size_tree_step = self._size_tree_step
+        index._leaf_offset = self._leaf_offset
+        index._start_tree = self._start_tree.copy()
+        return index
+
+    def __iter__(self):
+        for row in self._rows:
+            yield from row
+
+    def __len__(self) -> int:
+        return len(self._runs_by_start)
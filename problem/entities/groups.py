@@ -50,3 +50,11 @@ class OnlineGroups:
 
     def get_next_group(self):
         return self._groups_deque.popleft()
+
+    def get_remaining_groups(self):
+        """Returns the groups that still have to be placed
+
+        Returns:
+            list(int): Group sizes in the order they will be placed
+        """
+        return list(self._groups_deque)
@@ -0,0 +1,133 @@
+from array import array
+from functools import lru_cache
+import numpy as np
+
+# (row, column) offsets of all positions within corona distance of a seat:
+# 2 horizontally, 1 vertically and 1 diagonally
+NEIGHBOOR_OFFSETS = (
+    (0, -2),
+    (0, -1),
+    (0, 1),
+    (0, 2),
+    (-1, -1),
+    (-1, 0),
+    (-1, 1),
+    (1, -1),
+    (1, 0),
+    (1, 1),
+)
+
+
+@lru_cache(maxsize=None)
+def get_flat_offsets_by_mask(column_nr):
+    """Computes for every combination of the neighboor offsets, the offsets in a flattened grid with column_nr columns
+
+    Args:
+        column_nr (int): Number of columns of the grid
+
+    Returns:
+        tuple(tuple(int)): At index mask, the flat offsets of the neighboors that have their bit set in mask
+    """
+    flat_offsets = [row * column_nr + column for row, column in NEIGHBOOR_OFFSETS]
+    return tuple(
+        tuple(offset for bit, offset in enumerate(flat_offsets) if mask >> bit & 1)
+        for mask in range(1 << len(NEIGHBOOR_OFFSETS))
+    )
+
+
+class NeighboorTable:
+    """
+    Lookup structure for the seats within corona distance of each position, as a lightweight replacement of a graph.
+    It stores one bitmask per position, denoting which of the NEIGHBOOR_OFFSETS lead to a seat inside the grid. Positions are addressed by their flat index: row * column_nr + column.
+    ...
+
+    Methods
+    -------
+    get_neighboors(index: int):
+        Returns the flat indices of the neighbooring seats.
+    get_group_neighboors(indices: list):
+        Returns the flat indices of the seats neighbooring any of the positions of a group.
+    """
+
+    def __init__(self, grid) -> None:
+        """Builds the table in linear time from the grid
+
+        Args:
+            grid (list(list)): A list with lists containing 0s for no seats, and 1s for seats: grid[row][column]
+        """
+        seats = np.array(grid, dtype=np.bool_, ndmin=2)
+        self.row_nr, self.column_nr = seats.shape
+        self._masks = array("H", self._compute_masks(seats).tobytes())
+        self._offsets_by_mask = get_flat_offsets_by_mask(self.column_nr)
+
+    @staticmethod
+    def _compute_masks(seats):
+        """Sets for each position a bit per neighboor offset that leads to a seat
+
+        Args:
+            seats (numpy.ndarray(bool)): seats[row, column]
+
+        Returns:
+            numpy.ndarray(uint16): Bitmask per position
+        """
+        row_nr, column_nr = seats.shape
+        masks = np.zeros(seats.shape, dtype=np.uint16)
+        for bit, (row_offset, column_offset) in enumerate(NEIGHBOOR_OFFSETS):
+            # The position (row, column) has neighboor seats[row + row_offset, column + column_offset]
+            target = (
+                slice(max(-row_offset, 0), row_nr - max(row_offset, 0)),
+                slice(max(-column_offset, 0), column_nr - max(column_offset, 0)),
+            )
+            source = (
+                slice(max(row_offset, 0), row_nr + min(row_offset, 0)),
+                slice(max(column_offset, 0), column_nr + min(column_offset, 0)),
+            )
+            masks[target] |= seats[source].astype(np.uint16) << bit
+        return masks
+
+    def get_index(self, coordinates):
+        """Converts coordinates to a flat index
+
+        Args:
+            coordinates (tuple(int, int)): (row, column)
+
+        Returns:
+            int
+        """
+        return coordinates[0] * self.column_nr + coordinates[1]
+
+    def get_coordinates(self, index):
+        """Converts a flat index to coordinates
+
+        Args:
+            index (int)
+
+        Returns:
+            tuple(int, int): (row, column)
+        """
+        return divmod(index, self.column_nr)
+
+    def get_neighboors(self, index):
+        """Returns the neighbooring seats of a position
+
+        Args:
+            index (int): flat index of the position
+
+        Returns:
+            list(int): flat indices of the neighbooring seats. Excluding the input position
+        """
+        return [index + offset for offset in self._offsets_by_mask[self._masks[index]]]
+
+    def get_group_neighboors(self, indices):
+        """Returns the seats that are neighbooring any of the positions of a group
+
+        Args:
+            indices (list(int)): flat indices of the positions of the group
+
+        Returns:
+            list(int): flat indices of the neighbooring seats, in ascending order. Excluding the positions of the group
+        """
+        neighboors = set()
+        for index in indices:
+            neighboors.update(self.get_neighboors(index))
+        return sorted(neighboors.difference(indices))
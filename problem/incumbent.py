@@ -0,0 +1,73 @@
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import CinemaTemplate
+from problem.offline_problem import MAX_GROUP_SIZE
+
+
+def get_offline_group_sequence(number_of_groups, vips):
+    """
+    Order the groups of the offline problem for an online algorithm: first the VIP groups, then the other groups, both largest first.
+
+    :param number_of_groups: Number of groups per group size
+    :param vips: Number of VIP groups per group size
+    :return: List of group sizes, ending with 0
+    """
+    sequence = []
+    for size in range(MAX_GROUP_SIZE, 0, -1):
+        sequence += [size] * vips[size - 1]
+    for size in range(MAX_GROUP_SIZE, 0, -1):
+        sequence += [size] * (number_of_groups[size - 1] - vips[size - 1])
+    return sequence + [0]
+
+
+def get_placements(taken):
+    """
+    Split the taken seats into groups. Groups in a row are always separated by at least two empty seats,
+    so every series of taken seats is one group.
+
+    :param taken: numpy.ndarray(bool), taken[row, column]
+    :return: List of tuples (row, column of the first seat, size)
+    """
+    placements = []
+    for row, columns in enumerate(taken.tolist()):
+        length = 0
+        for col, is_taken in enumerate(columns + [False]):
+            if is_taken:
+                length += 1
+            elif length > 0:
+                placements.append((row, col - length, length))
+                length = 0
+    return placements
+
+
+def get_greedy_seating(g, ng, r, c, v, algorithms=None):
+    """
+    Seat the groups of the offline problem with online algorithms, as a first solution for the ILP.
+
+    :param g: Grid
+    :param ng: Number of groups per group size
+    :param r: Number of rows
+    :param c: Number of columns
+    :param v: Number of VIP groups per group size
+    :param algorithms: Online algorithm classes to try, Greedy and Hybrid by default
+    :return: List of placements (row, column of the first seat, size) of the seating with the most taken seats
+             that seats all VIP groups, or None if no algorithm seats them all
+    """
+    # The online algorithms import the problem module, so they are only imported once they are used
+    from algorithms.online import Greedy, Hybrid
+
+    template = CinemaTemplate(
+        tuple(bytes(int(position) for position in row) for row in g), r, c, tuple(get_offline_group_sequence(ng, v))
+    )
+    best = None
+    best_seats = -1
+    for algorithm in algorithms or (Greedy, Hybrid):
+        alg = algorithm(cinema_class=ArrayCinema, template=template)
+        alg.execute(log_grid=False, report=False)
+        placements = get_placements(alg.cinema.taken)
+        seated = [0] * MAX_GROUP_SIZE
+        for _, _, size in placements:
+            seated[size - 1] += 1
+        if alg.filled_seats > best_seats and all(n >= vip for n, vip in zip(seated, v)):
+            best = placements
+            best_seats = alg.filled_seats
+    return best
@@ -0,0 +1,293 @@
+import os
+import subprocess
+import tempfile
+import numpy as np
+from pulp import PULP_CBC_CMD
+from problem.offline_problem import MAX_GROUP_SIZE, SparseProblem
+
+# Sense of a constraint in an MPS file: equal to, at most, or at least its right hand side
+EQUAL, AT_MOST, AT_LEAST = "E", "L", "G"
+
+
+class MatrixProblem(SparseProblem):
+    """
+    The ILP of SparseProblem, built with NumPy as a sparse matrix of coefficients in coordinate form, instead of as pulp constraints.
+    No Python object or name is made per constraint: the matrix is written to an MPS file at once,
+    and solved by the CBC executable that comes with pulp.
+
+    The first columns of the matrix are the seats, in the order of their keys, followed by the windows of each group size.
+    """
+
+    def init_decision_variables(self):
+        """Number the columns of the decision variables: first the seats, then the windows of each group size that has groups."""
+        self.seat_keys = np.array(self.get_seat_keys(), dtype=np.int64)
+        # Column of the seat with a key, -1 for cells without a seat and for keys below the grid
+        self.column_of = np.full(self.rows * self.cols + self.cols + 3, -1, dtype=np.int64)
+        self.column_of[self.seat_keys] = np.arange(len(self.seat_keys))
+
+        self.windows = {}
+        self.window_columns = {}
+        self.number_of_columns = len(self.seat_keys)
+        for size in range(1, MAX_GROUP_SIZE + 1):
+            if self.number_of_groups[size - 1] > 0:
+                self.windows[size] = np.array(self.get_window_keys(size), dtype=np.int64)
+                self.window_columns[size] = self.number_of_columns + np.arange(len(self.windows[size]))
+                self.number_of_columns += len(self.windows[size])
+
+        # Per block of constraints the rows, columns and values of the coefficients
+        self.coefficients = []
+        self.senses = []
+        self.right_hand_sides = []
+        self.number_of_rows = 0
+        self.values = np.zeros(self.number_of_columns, dtype=np.int64)
+        self.initial_values = None
+
+    def add_constraints(self, number, rows, columns, values, sense, right_hand_side):
+        """
+        Add a block of constraints to the model.
+
+        :param number: Number of constraints in the block
+        :param rows: Array with the constraint of each coefficient, counted from 0 within the block
+        :param columns: Array with the column of each coefficient
+        :param values: Array with the value of each coefficient, or one value for all of them
+        :param sense: EQUAL, AT_MOST or AT_LEAST
+        :param right_hand_side: Array with the right hand side of each constraint, or one for all of them
+        """
+        rows = np.asarray(rows, dtype=np.int64)
+        self.coefficients.append((
+            rows + self.number_of_rows,
+            np.asarray(columns, dtype=np.int64),
+            np.broadcast_to(np.asarray(values, dtype=np.int64), rows.shape),
+        ))
+        self.senses.append(np.full(number, sense))
+        self.right_hand_sides.append(np.broadcast_to(np.asarray(right_hand_side, dtype=np.int64), (number,)))
+        self.number_of_rows += number
+
+    def add_objective(self):
+        """The objective function, the number of taken seats, is added when the model is written."""
+
+    def add_window_constraints(self):
+        """Add constraints so that a seat is taken if and only if it is part of exactly one chosen window."""
+        seats = np.arange(len(self.seat_keys))
+        rows = [seats]
+        columns = [seats]
+        values = [np.ones(len(seats), dtype=np.int64)]
+        for size, keys in self.windows.items():
+            for i in range(size):
+                rows.append(self.column_of[keys + i])
+                columns.append(self.window_columns[size])
+                values.append(np.full(len(keys), -1))
+        self.add_constraints(len(seats), np.concatenate(rows), np.concatenate(columns), np.concatenate(values), EQUAL, 0)
+
+    def add_separation_constraints(self):
+        """
+        Add the constraints that keep groups at corona distance from each other.
+        The two seats to the right of a group stay empty, and a taken seat has no taken seats directly or diagonally below it.
+        Seats to the left of a group are covered by the constraint of the group that ends there.
+        """
+        ends = np.concatenate([keys + size - 1 for size, keys in self.windows.items()] + [np.zeros(0, dtype=np.int64)])
+        window_columns = np.concatenate(list(self.window_columns.values()) + [np.zeros(0, dtype=np.int64)])
+        for distance in (1, 2):
+            # One constraint per seat on which windows end, with the seat at the distance to its right
+            valid = ((ends - 1) % self.cols + distance < self.cols) & (self.column_of[ends + distance] >= 0)
+            seats, rows = np.unique(ends[valid], return_inverse=True)
+            self.add_constraints(
+                len(seats),
+                np.concatenate([rows, np.arange(len(seats))]),
+                np.concatenate([window_columns[valid], self.column_of[seats + distance]]),
+                1, AT_MOST, 1,
+            )
+
+        cols = (self.seat_keys - 1) % self.cols
+        for col_offset in (-1, 0, 1):
+            below = self.seat_keys + self.cols + col_offset
+            valid = (cols + col_offset >= 0) & (cols + col_offset < self.cols) & (self.column_of[below] >= 0)
+            rows = np.arange(np.count_nonzero(valid))
+            self.add_constraints(
+                len(rows),
+                np.concatenate([rows, rows]),
+                np.concatenate([self.column_of[self.seat_keys[valid]], self.column_of[below[valid]]]),
+                1, AT_MOST, 1,
+            )
+
+    def determine_biggest_sum(self):
+        """
+        Add constraints so that no more groups of a size are seated than there are.
+        The constraint is left out if that many groups never fit in the grid.
+        """
+        for size in range(1, MAX_GROUP_SIZE + 1):
+            columns = self.window_columns.get(size, np.zeros(0, dtype=np.int64))
+            rows = np.zeros(len(columns), dtype=np.int64)
+            if size in self.windows and self.number_of_groups[size - 1] < self.get_max_groups(size):
+                self.add_constraints(1, rows, columns, 1, AT_MOST, self.number_of_groups[size - 1])
+            if self.vips[size - 1] != 0:
+                self.add_constraints(1, rows, columns, 1, AT_LEAST, self.vips[size - 1])
+
+    def add_mirror_constraint(self, is_first, is_second, name):
+        """
+        Add a constraint that at least as many seats are taken in the first half of the grid as in the second half.
+
+        :param is_first: Function that returns True for the keys of the first half
+        :param is_second: Function that returns True for the keys of the second half
+        :param name: Name of the constraint, which is not used in the matrix
+        """
+        first = np.flatnonzero(is_first(self.seat_keys))
+        second = np.flatnonzero(is_second(self.seat_keys))
+        self.add_constraints(
+            1,
+            np.zeros(len(first) + len(second), dtype=np.int64),
+            np.concatenate([first, second]),
+            np.concatenate([np.ones(len(first), dtype=np.int64), np.full(len(second), -1)]),
+            AT_LEAST, 0,
+        )
+
+    def add_capacity_cuts(self):
+        """
+        Add for every series of seats in a row a constraint on the number of taken seats in it.
+        These constraints follow from the others, but can make the LP relaxation tighter.
+        """
+        runs = [(start, length, self.get_run_capacity(length)) for start, length in self.get_seat_runs()]
+        runs = [(start, length, capacity) for start, length, capacity in runs if capacity < length]
+        if not runs:
+            return
+        starts, lengths, capacities = (np.array(column, dtype=np.int64) for column in zip(*runs))
+        rows = np.repeat(np.arange(len(runs)), lengths)
+        keys = np.repeat(starts, lengths) + np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        self.add_constraints(len(runs), rows, self.column_of[keys], 1, AT_MOST, capacities)
+
+    def set_initial_values(self):
+        """
+        Give the decision variables the values of the seating of the online Greedy and Hybrid algorithms,
+        with the groups seated from large to small. The model then has to take at least as many seats.
+
+        :return: True if the heuristic seated all VIP groups
+        """
+        placements = self.get_initial_placements()
+        if placements is None:
+            return False
+
+        self.initial_values = np.zeros(self.number_of_columns, dtype=np.int64)
+        for row, col, size in placements:
+            key = row * self.cols + col + 1
+            self.initial_values[self.column_of[key:key + size]] = 1
+            self.initial_values[self.window_columns[size][np.searchsorted(self.windows[size], key)]] = 1
+
+        seats = len(self.seat_keys)
+        self.initial_placements = placements
+        self.incumbent = int(self.initial_values[:seats].sum())
+        self.add_constraints(1, np.zeros(seats), np.arange(seats), 1, AT_LEAST, self.incumbent)
+        return True
+
+    def get_model_size(self):
+        """
+        Count the size of the model.
+
+        :return: Dictionary with the number of variables, constraints and nonzero coefficients
+        """
+        return {
+            "variables": self.number_of_columns,
+            "constraints": self.number_of_rows,
+            "nonzeros": sum(len(rows) for rows, _, _ in self.coefficients),
+        }
+
+    def write_mps(self, path):
+        """
+        Write the model to a file in fixed MPS format. Constraint i is named R{i}, column j is named C{j},
+        and the objective function, the number of taken seats, is named OBJ. Names have at most eight characters.
+
+        :param path: File name
+        """
+        # Row -1 holds the coefficients of the objective function
+        seats = np.arange(len(self.seat_keys))
+        rows = np.concatenate([np.full(len(seats), -1)] + [rows for rows, _, _ in self.coefficients])
+        columns = np.concatenate([seats] + [columns for _, columns, _ in self.coefficients])
+        values = np.concatenate([np.ones(len(seats), dtype=np.int64)] + [values for _, _, values in self.coefficients])
+        order = np.lexsort((rows, columns))
+        senses = np.concatenate(self.senses + [np.zeros(0, dtype="<U1")])
+        right_hand_sides = np.concatenate(self.right_hand_sides + [np.zeros(0, dtype=np.int64)])
+        nonzero = np.flatnonzero(right_hand_sides)
+
+        with open(path, "w") as file:
+            file.write("NAME Cinema_Seating_Problem\nROWS\n N OBJ\n")
+            file.write("".join(map(" %s  R%d\n".__mod__, zip(senses.tolist(), range(self.number_of_rows)))))
+            file.write("COLUMNS\n")
+            file.write("".join(map(
+                "    C%-7d  %-8s  %d\n".__mod__,
+                zip(columns[order].tolist(), ("R%d" % row if row >= 0 else "OBJ" for row in rows[order].tolist()),
+                    values[order].tolist()),
+            )))
+            file.write("RHS\n")
+            file.write("".join(map("    RHS       R%-7d  %d\n".__mod__, zip(nonzero.tolist(), right_hand_sides[nonzero].tolist()))))
+            file.write("BOUNDS\n")
+            file.write("".join(map(" BV BND       C%d\n".__mod__, range(self.number_of_columns))))
+            file.write("ENDATA\n")
+
+    def write_initial_values(self, path):
+        """
+        Write the initial values of the decision variables in the format of a CBC solution file.
+
+        :param path: File name
+        """
+        columns = np.flatnonzero(self.initial_values)
+        with open(path, "w") as file:
+            file.write("Stopped on time - objective value 0\n")
+            file.write("".join(map("%7d C%d 1 0\n".__mod__, zip(columns.tolist(), columns.tolist()))))
+
+    def read_solution(self, path):
+        """
+        Read the values of the decision variables and the status from a CBC solution file.
+
+        :param path: File name
+        """
+        self.values[:] = 0
+        with open(path) as file:
+            status = file.readline().split()
+            for line in file:
+                # The line starts with ** if the value violates a constraint
+                name, value = line.split()[-3:-1]
+                if name.startswith("C"):
+                    self.values[int(name[1:])] = round(float(value))
+
+        if status[0] == "Optimal":
+            self.status = "Optimal"
+        elif status[0] in ("Infeasible", "Integer"):
+            self.status = "Infeasible"
+        elif status[0] == "Stopped" and len(status) >= 5 and status[4] == "objective":
+            # Stopped on the time limit with a seating, which pulp also reports as optimal. Without an integer solution
+            # the line reads "Stopped on time (no integer solution - continuous used) - objective value", and the values
+            # are those of the LP relaxation
+            self.status = "Optimal"
+        else:
+            self.status = "Not Solved"
+
+    def run_cbc(self, log_path, time_limit, gap, warm_start):
+        """
+        Write the model to an MPS file, run CBC on it and read the solution.
+
+        :param log_path: File to which CBC writes its log
+        :param time_limit: Number of seconds that CBC may take
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param warm_start: If True, CBC starts from the initial values of the decision variables
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            model_path = os.path.join(folder, "model.mps")
+            solution_path = os.path.join(folder, "model.sol")
+            self.write_mps(model_path)
+            arguments = [PULP_CBC_CMD().path, model_path, "-max", "-sec", str(time_limit), "-timeMode", "elapsed",
+                         "-ratio", str(gap)]
+            if warm_start:
+                start_path = os.path.join(folder, "start.sol")
+                self.write_initial_values(start_path)
+                arguments += ["-mips", start_path]
+            arguments += ["-solve", "-solution", solution_path]
+            with open(log_path, "w") as log:
+                subprocess.run(arguments, stdout=log, stderr=log, stdin=subprocess.DEVNULL, check=True)
+            self.read_solution(solution_path)
+
+    def get_objective_value(self):
+        """Return the number of taken seats of the solution."""
+        return int(self.values[:len(self.seat_keys)].sum())
+
+    def get_taken_keys(self):
+        """Return the keys of the seats that are taken in the solution."""
+        return self.seat_keys[self.values[:len(self.seat_keys)] == 1]
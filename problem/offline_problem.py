@@ -1,9 +1,80 @@
-from pulp import LpMaximize, LpProblem, lpSum, LpVariable, PULP_CBC_CMD
+from typing import NamedTuple, Tuple
+from pulp import LpMaximize, LpProblem, LpStatus, lpSum, LpVariable, PULP_CBC_CMD
 from termcolor import colored
 import math
+import numpy as np
+from problem.anytime import TIME_LIMIT, Progress
+
+MAX_GROUP_SIZE = 8
+SIZE_STRINGS = ["One", "Two", "Three", "Four", "Five", "Six", "Seven", "Eight"]
+
+
+class Solution(NamedTuple):
+    """The seating of a solved model, read from the solver once"""
+
+    taken: np.ndarray  # True for the taken seats, per row and column
+    placements: Tuple[Tuple[int, int, int], ...]  # (row, column, size) of each seated group, from top left to bottom right
+    groups: Tuple[int, ...]  # number of seated groups per group size
+    seats: int
+
+
+def create_solution(keys, rows, cols):
+    """
+    Create the solution that takes the given seats. Every series of taken seats in a row is one group,
+    since groups are kept apart by at least two empty seats.
+
+    :param keys: Keys of the taken seats, row * cols + col + 1
+    :param rows: Number of rows of the grid
+    :param cols: Number of columns of the grid
+    :return: Solution
+    """
+    keys = np.sort(np.asarray(keys, dtype=np.int64))
+    taken = np.zeros(rows * cols, dtype=bool)
+    taken[keys - 1] = True
+    # A group starts on a taken seat that is the first of its row or does not follow a taken seat
+    starts = np.flatnonzero((np.diff(keys, prepend=-1) != 1) | ((keys - 1) % cols == 0))
+    sizes = np.diff(np.append(starts, len(keys)))
+    start_rows, start_cols = np.divmod(keys[starts] - 1, cols)
+    return Solution(
+        taken.reshape(rows, cols),
+        tuple(zip(start_rows.tolist(), start_cols.tolist(), sizes.tolist())),
+        tuple(np.bincount(sizes, minlength=MAX_GROUP_SIZE + 1)[1:MAX_GROUP_SIZE + 1].tolist()),
+        len(keys),
+    )
+
+
+def is_feasible(solution, grid, number_of_groups, vips):
+    """
+    Check a seating against the grid and the groups: only seats are taken, the groups keep corona distance from each other,
+    and the number of seated groups of every size is at least the number of VIP groups and at most the number of groups.
+
+    :param solution: Solution
+    :param grid: Grid, in which "0" or 0 is a cell without a seat
+    :param number_of_groups: Number of groups per group size
+    :param vips: Number of VIP groups per group size
+    :return: True if the seating is valid
+    """
+    taken = solution.taken
+    seats = np.array([[str(cell) != "0" for cell in row] for row in grid], dtype=bool)
+    if taken.shape != seats.shape or (taken & ~seats).any():
+        return False
+    # A taken seat has no taken seats directly or diagonally below it
+    if (taken[:-1] & (taken[1:] | np.pad(taken[1:, 1:], ((0, 0), (0, 1))) | np.pad(taken[1:, :-1], ((0, 0), (1, 0))))).any():
+        return False
+    # Two groups in a row have at least two empty seats between them
+    if (taken[:, :-2] & ~taken[:, 1:-1] & taken[:, 2:]).any():
+        return False
+    if any(size > MAX_GROUP_SIZE for _, _, size in solution.placements):
+        return False
+    return all(vips[size] <= seated <= number_of_groups[size] for size, seated in enumerate(solution.groups))
 
 
 class Problem:
+    # Start CBC from the seating of a fast heuristic, see set_initial_values
+    warm_start = False
+    # SolutionCache in which solutions are looked up before solving, and stored after solving
+    cache = None
+
     def __init__(self, g, ng, r, c, v):
         """Initialize variables."""
         self.grid = g
@@ -11,11 +82,21 @@ class Problem:
         self.rows = r
         self.cols = c
         self.vips = v
+        self.incumbent = None
+        self.initial_placements = None
+        self.solution = None
+        self.bound = None
+        self.status = None
+        self.nodes = None
+        self.build_time = None
+        self.solve_time = None
 
         # Create the model
         self.model = LpProblem(name="Cinema_Seating_Problem", sense=LpMaximize)
+        self.init_decision_variables()
 
-        # Initialize the decision variables
+    def init_decision_variables(self):
+        """Initialize the decision variables for every cell of the grid."""
         self.x = {i: LpVariable(name=f"x{i}", lowBound=0, cat="Binary") for i in range(1, self.rows * self.cols + 1)}
         self.left = {i: LpVariable(name=f"left{i}", lowBound=0, cat="Binary") for i in
                      range(1, self.rows * self.cols - self.rows + 1)}
@@ -44,8 +125,41 @@ class Problem:
         return {i: LpVariable(name=f"{size_string}{i}", lowBound=0, cat="Binary") for i in
                 range(1, self.rows * self.cols - s * self.rows + 1)}
 
-    def get_solution(self):
-        """Set a number of constrains for the model and then solve the ILP."""
+    def get_solution(self, time_limit=TIME_LIMIT, gap=0, callback=None):
+        """
+        Build the model and then solve the ILP.
+
+        :param time_limit: Number of seconds that building and solving may take together
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param callback: Function that is called with an Incumbent whenever a better seating is found
+        :return: Incumbent with the best seating found and the bound on the optimum
+        """
+        progress = Progress(callback)
+        if self.cache is not None:
+            cached = self.cache.get(self, gap)
+            if cached is not None:
+                self.solution, self.bound = cached
+                self.status = "Optimal"
+                self.build_time, self.solve_time = 0, progress.get_elapsed()
+                progress.update(seats=self.solution.seats, bound=self.bound)
+                return progress.get_incumbent()
+
+        self.build_model()
+        self.build_time = progress.get_elapsed()
+        incumbent = self.solve(time_limit, gap, progress)
+        self.solve_time = progress.get_elapsed() - self.build_time
+        # Only a seating that CBC found is stored, never the empty or warm-start seating of a solve that did not finish
+        if (
+            self.cache is not None
+            and self.status == "Optimal"
+            and incumbent.bound is not None
+            and is_feasible(self.solution, self.grid, self.number_of_groups, self.vips)
+        ):
+            self.cache.put(self, self.solution, incumbent.bound)
+        return incumbent
+
+    def build_model(self):
+        """Set a number of constrains for the model and add the objective function."""
         self.update_model_with_decision_variables()
         self.add_constraints_to_model()
 
@@ -58,8 +172,80 @@ class Problem:
         # Add the objective function to the model
         self.model += lpSum(self.x)
 
-        # Solve the problem
-        self.model.solve(PULP_CBC_CMD(timeLimit=600, msg=False, gapRel=0))
+    def solve(self, time_limit=TIME_LIMIT, gap=0, progress=None):
+        """
+        Solve the ILP. With warm_start, CBC starts from the seating of a fast heuristic.
+        CBC runs in a thread, while its log is read for better seatings and bounds.
+
+        :param time_limit: Number of seconds that the solve may take, counted from the start of progress
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param progress: Progress of the solve so far, a new one by default
+        :return: Incumbent with the best seating found and the bound on the optimum
+        """
+        progress = progress or Progress()
+        warm_start = self.warm_start and self.set_initial_values()
+        if warm_start:
+            progress.update(seats=self.incumbent)
+
+        final_bound = progress.follow_cbc(
+            lambda log_path: self.run_cbc(log_path, progress.get_remaining(time_limit), gap, warm_start)
+        )
+        self.nodes = progress.nodes
+        if self.status != "Optimal":
+            # Without a seating from CBC, the seating that CBC started from is the best one found
+            self.solution = create_solution(self.get_initial_keys() if warm_start else [], self.rows, self.cols)
+            return progress.get_incumbent()
+        self.solution = create_solution(self.get_taken_keys(), self.rows, self.cols)
+        seats = self.get_objective_value()
+        # CBC only reports a bound on its final seating if it did not prove it optimal
+        progress.update(seats=seats, bound=None if final_bound else seats)
+        incumbent = progress.get_incumbent(seats)
+        self.bound = incumbent.bound
+        return incumbent
+
+    def run_cbc(self, log_path, time_limit, gap, warm_start):
+        """
+        Run CBC on the model and set the status of the solve.
+
+        :param log_path: File to which CBC writes its log
+        :param time_limit: Number of seconds that CBC may take
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param warm_start: If True, CBC starts from the initial values of the decision variables
+        """
+        self.model.solve(PULP_CBC_CMD(timeLimit=time_limit, msg=False, gapRel=gap, warmStart=warm_start, logPath=log_path))
+        self.status = LpStatus[self.model.status]
+
+    def get_objective_value(self):
+        """Return the value of the objective function of the solved model, rounded to an integer."""
+        return round(self.model.objective.value() or 0)
+
+    def get_taken_keys(self):
+        """Return the keys of the seats that are taken in the solved model."""
+        return [key for key, var in self.x.items() if round(var.value() or 0) == 1]
+
+    def get_initial_keys(self):
+        """Return the keys of the seats that are taken in the seating that CBC started from."""
+        return [row * self.cols + col + 1 + i for row, col, size in self.initial_placements for i in range(size)]
+
+    def set_initial_values(self):
+        """
+        Give the decision variables the values of a first solution, for CBC to start from.
+
+        :return: True if the variables got initial values
+        """
+        return False
+
+    def get_model_size(self):
+        """
+        Count the size of the model.
+
+        :return: Dictionary with the number of variables, constraints and nonzero coefficients
+        """
+        return {
+            "variables": len(self.model.variables()),
+            "constraints": len(self.model.constraints),
+            "nonzeros": sum(len(constraint) for constraint in self.model.constraints.values()),
+        }
 
     def update_model_with_decision_variables(self):
         """
@@ -165,18 +351,7 @@ class Problem:
 
     def output(self):
         """Update the grid with the found solution and print the output."""
-        for var in self.model.variables():
-            if var.name[0:1] == 'x':
-                coor = int(var.name[1:])
-                xCoor = (coor - 1) % self.cols
-                yCoor = math.floor((coor - 1) / self.cols)
-                if self.grid[yCoor][xCoor] == 0:
-                    self.grid[yCoor][xCoor] = "0"
-                    continue
-                if var.value() == 1:
-                    self.grid[yCoor][xCoor] = "x"
-                else:
-                    self.grid[yCoor][xCoor] = "1"
+        self.update_grid()
 
         for r in range(self.rows):
             row = ""
@@ -208,29 +383,294 @@ class Problem:
         """
         Update the grid for the balcony problem with the new found solution by filling in the seats that are taken.
         """
-        for var in self.model.variables():
-            if var.name[0:1] == 'x':
-                coor = int(var.name[1:])
-                xCoor = (coor - 1) % self.cols
-                yCoor = math.floor((coor - 1) / self.cols)
-                if self.grid[yCoor][xCoor] == 0:
+        taken = self.solution.taken.tolist()
+        for yCoor in range(self.rows):
+            for xCoor in range(self.cols):
+                if str(self.grid[yCoor][xCoor]) == "0":
                     self.grid[yCoor][xCoor] = "0"
-                    continue
-                if var.value() == 1:
+                elif taken[yCoor][xCoor]:
                     self.grid[yCoor][xCoor] = "x"
                 else:
                     self.grid[yCoor][xCoor] = "1"
 
     def update_group_sizes(self):
         """Update the list of group sizes."""
-        size = 0
-        for name, constraint in self.model.constraints.items():
-            if name[0:5] == 'Group' and name[-5:] != "Large":
-                self.number_of_groups[size] = int(abs(constraint.value()))
-                size += 1
+        for size in range(MAX_GROUP_SIZE):
+            self.number_of_groups[size] -= self.solution.groups[size]
 
     def get_taken_seats(self):
         """Return the number of taken seats in the given grid."""
-        return int(self.model.objective.value())
+        return self.solution.seats
+
+
+class SparseProblem(Problem):
+    """
+    The same ILP as Problem, but with decision variables only for the seats, and for the windows of seats next to each other
+    in which a group can be placed. Cells without a seat get no variables and no constraints.
+
+    A window variable is 1 if a group occupies exactly the seats of that window. Every taken seat belongs to exactly one window,
+    so the left and right variables and the nine family, which forbids runs of more than eight seats, are not needed.
+    """
+
+    warm_start = True
+    # Allow only one of the mirror images of a seating in a symmetric grid, see add_symmetry_constraints
+    symmetry_breaking = False
+    # Limit the taken seats of every series of seats in a row, see add_capacity_cuts
+    capacity_cuts = False
+
+    def init_decision_variables(self):
+        """Initialize the decision variables for the seats and for the windows of seats."""
+        self.x = {key: LpVariable(name=f"x{key}", lowBound=0, cat="Binary") for key in self.get_seat_keys()}
+
+        # Only group sizes that have groups to seat get window variables
+        self.windows = {}
+        for size in range(1, MAX_GROUP_SIZE + 1):
+            if self.number_of_groups[size - 1] > 0:
+                size_string = SIZE_STRINGS[size - 1].lower()
+                self.windows[size] = {key: LpVariable(name=f"{size_string}{key}", lowBound=0, cat="Binary")
+                                      for key in self.get_window_keys(size)}
+
+    def get_seat_keys(self):
+        """
+        Get the keys of all cells that contain a seat.
+
+        :return: List of keys, where the key of a cell is row * cols + col + 1
+        """
+        return [row * self.cols + col + 1 for row in range(self.rows) for col in range(self.cols)
+                if int(self.grid[row][col]) == 1]
+
+    def get_seat_runs(self):
+        """
+        Get every uninterrupted series of seats in a row.
+
+        :return: List of tuples with the key of the first seat and the number of seats
+        """
+        runs = []
+        for row in range(self.rows):
+            length = 0
+            for col in range(self.cols + 1):
+                if col < self.cols and int(self.grid[row][col]) == 1:
+                    length += 1
+                elif length > 0:
+                    runs.append((row * self.cols + col - length + 1, length))
+                    length = 0
+        return runs
+
+    def get_window_keys(self, size):
+        """
+        Get the keys of the first seat of every window of seats next to each other for the given group size.
+
+        :param size: Number of the group size
+        :return: List of keys
+        """
+        return [start + i for start, length in self.get_seat_runs() for i in range(length - size + 1)]
+
+    def get_max_groups(self, size):
+        """
+        Get an upper bound on the number of groups of the given size that fit in the grid.
+        In a series of seats every group but the last one needs two empty seats on its right.
+
+        :param size: Number of the group size
+        :return: Maximum number of groups
+        """
+        return sum((length + 2) // (size + 2) for _, length in self.get_seat_runs())
+
+    def build_model(self):
+        """Set the constraints for the model and add the objective function."""
+        self.add_window_constraints()
+        self.add_separation_constraints()
+        self.determine_biggest_sum()
+        if self.symmetry_breaking:
+            self.add_symmetry_constraints()
+        if self.capacity_cuts:
+            self.add_capacity_cuts()
+        self.add_objective()
+
+    def add_objective(self):
+        """Add the objective function to the model: the number of taken seats."""
+        self.model += lpSum(self.x.values())
+
+    def add_window_constraints(self):
+        """Add constraints so that a seat is taken if and only if it is part of exactly one chosen window."""
+        covering = {key: [] for key in self.x}
+        for size, size_dict in self.windows.items():
+            for key, var in size_dict.items():
+                for i in range(size):
+                    covering[key + i].append(var)
+        for key, var in self.x.items():
+            self.model += (var == lpSum(covering[key]), f"x{key}_Window")
+
+    def add_separation_constraints(self):
+        """
+        Add the constraints that keep groups at corona distance from each other.
+        The two seats to the right of a group stay empty, and a taken seat has no taken seats directly or diagonally below it.
+        Seats to the left of a group are covered by the constraint of the group that ends there.
+        """
+        ending = {}
+        for size, size_dict in self.windows.items():
+            for key, var in size_dict.items():
+                ending.setdefault(key + size - 1, []).append(var)
+
+        for key, windows in ending.items():
+            col = (key - 1) % self.cols
+            for distance in (1, 2):
+                if col + distance < self.cols and key + distance in self.x:
+                    self.model += (lpSum(windows) + self.x[key + distance] <= 1,
+                                   f"x{key}_{distance}RightSeparation")
+
+        for key, var in self.x.items():
+            col = (key - 1) % self.cols
+            for col_offset in (-1, 0, 1):
+                below = key + self.cols + col_offset
+                if 0 <= col + col_offset < self.cols and below in self.x:
+                    self.model += (var + self.x[below] <= 1, f"x{key}_{col_offset + 1}BelowSeparation")
+
+    def determine_biggest_sum(self):
+        """
+        Add constraints so that no more groups of a size are seated than there are.
+        The constraint is left out if that many groups never fit in the grid.
+        """
+        for size in range(1, MAX_GROUP_SIZE + 1):
+            size_dict = self.windows.get(size, {})
+            size_string = SIZE_STRINGS[size - 1]
+            if size in self.windows and self.number_of_groups[size - 1] < self.get_max_groups(size):
+                self.model += (lpSum(size_dict.values()) <= self.number_of_groups[size - 1], f"GroupCheck_{size_string}")
+            if self.vips[size - 1] != 0:
+                self.model += (lpSum(size_dict.values()) >= self.vips[size - 1], f"VIPCheck_{size_string}")
+
+    def get_symmetries(self):
+        """
+        Find the mirror symmetries of the grid. Mirroring a seating in a symmetry of the grid gives a seating with the same groups.
+
+        :return: Tuple of Booleans: the grid is the same mirrored left-right, mirrored top-bottom, and turned half around
+        """
+        grid = [[int(position) for position in row] for row in self.grid]
+        left_right = all(row == row[::-1] for row in grid)
+        top_bottom = grid == grid[::-1]
+        half_turn = grid == [row[::-1] for row in grid[::-1]]
+        return left_right, top_bottom, half_turn
+
+    def is_left(self, key):
+        """Return True if the cell with the given key is in the left half of the grid, without the middle column."""
+        return (key - 1) % self.cols < self.cols // 2
+
+    def is_right(self, key):
+        """Return True if the cell with the given key is in the right half of the grid, without the middle column."""
+        return (key - 1) % self.cols >= self.cols - self.cols // 2
+
+    def is_top(self, key):
+        """Return True if the cell with the given key is in the top half of the grid, without the middle row."""
+        return (key - 1) // self.cols < self.rows // 2
+
+    def is_bottom(self, key):
+        """Return True if the cell with the given key is in the bottom half of the grid, without the middle row."""
+        return (key - 1) // self.cols >= self.rows - self.rows // 2
+
+    def add_symmetry_constraints(self):
+        """
+        Add constraints that allow only one of the mirror images of a seating in a symmetric grid: at least as many taken seats
+        in the left half as in the right half, and in the top half as in the bottom half.
+        Mirroring left-right does not change the taken seats per row, so a seating can always be mirrored to satisfy both.
+        """
+        left_right, top_bottom, half_turn = self.get_symmetries()
+        if left_right:
+            self.add_mirror_constraint(self.is_left, self.is_right, "MirrorLeftRight")
+        # Turning half around also swaps the top and the bottom half
+        if top_bottom or half_turn:
+            self.add_mirror_constraint(self.is_top, self.is_bottom, "MirrorTopBottom")
+
+    def add_mirror_constraint(self, is_first, is_second, name):
+        """
+        Add a constraint that at least as many seats are taken in the first half of the grid as in the second half.
+
+        :param is_first: Function that returns True for the keys of the first half
+        :param is_second: Function that returns True for the keys of the second half
+        :param name: Name of the constraint
+        """
+        self.model += (lpSum(var for key, var in self.x.items() if is_first(key))
+                       >= lpSum(var for key, var in self.x.items() if is_second(key)), name)
+
+    def get_run_capacity(self, length):
+        """
+        Get the most seats that can be taken in a series of seats: groups are at most as large as the largest group size
+        that has groups, and need two empty seats between them.
+
+        :param length: Number of seats in the series
+        :return: Number of seats
+        """
+        largest = max(self.windows, default=0)
+        return max(min(largest * groups, length - 2 * (groups - 1)) for groups in range(1, length // 2 + 2))
+
+    def add_capacity_cuts(self):
+        """
+        Add for every series of seats in a row a constraint on the number of taken seats in it.
+        These constraints follow from the others, but can make the LP relaxation tighter.
+        """
+        for start, length in self.get_seat_runs():
+            capacity = self.get_run_capacity(length)
+            if capacity < length:
+                self.model += (lpSum(self.x[start + i] for i in range(length)) <= capacity, f"x{start}_Capacity")
+
+    def orient_placements(self, placements):
+        """
+        Mirror a seating such that it satisfies the symmetry constraints.
+
+        :param placements: List of tuples (row, column of the first seat, size)
+        :return: List of tuples (row, column of the first seat, size)
+        """
+        left_right, top_bottom, half_turn = self.get_symmetries()
+
+        def count(is_half):
+            return sum(is_half(row * self.cols + col + 1 + i) for row, col, size in placements for i in range(size))
+
+        if left_right and count(self.is_left) < count(self.is_right):
+            placements = [(row, self.cols - col - size, size) for row, col, size in placements]
+        if (top_bottom or half_turn) and count(self.is_top) < count(self.is_bottom):
+            placements = [(self.rows - 1 - row, col, size) for row, col, size in placements]
+            if not top_bottom:
+                placements = [(row, self.cols - col - size, size) for row, col, size in placements]
+        return placements
+
+    def get_initial_placements(self):
+        """
+        Seat the groups with the online Greedy and Hybrid algorithms, from large to small, for CBC to start from.
+
+        :return: List of tuples (row, column of the first seat, size), or None if the algorithms do not seat all VIP groups
+        """
+        # The heuristic uses the online algorithms, which import this module
+        from problem.incumbent import get_greedy_seating
+
+        placements = get_greedy_seating(self.grid, self.number_of_groups, self.rows, self.cols, self.vips)
+        if placements is not None and self.symmetry_breaking:
+            placements = self.orient_placements(placements)
+        return placements
+
+    def set_initial_values(self):
+        """
+        Give the decision variables the values of the seating of the online Greedy and Hybrid algorithms,
+        with the groups seated from large to small. The model then has to take at least as many seats.
+
+        :return: True if the heuristic seated all VIP groups
+        """
+        placements = self.get_initial_placements()
+        if placements is None:
+            return False
+
+        taken = set()
+        chosen = set()
+        for row, col, size in placements:
+            key = row * self.cols + col + 1
+            taken.update(range(key, key + size))
+            chosen.add((size, key))
+        for key, var in self.x.items():
+            var.setInitialValue(int(key in taken))
+        for size, size_dict in self.windows.items():
+            for key, var in size_dict.items():
+                var.setInitialValue(int((size, key) in chosen))
+
+        self.initial_placements = placements
+        self.incumbent = len(taken)
+        self.model += (lpSum(self.x.values()) >= self.incumbent, "Cutoff")
+        return True
 
 # SUCCESS!!
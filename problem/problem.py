@@ -1,73 +1,144 @@
 from .entities.input import Input
-from .entities.cinema import Cinema
+from .entities.cinema import Cinema, CinemaTemplate
 from .entities.groups import OnlineGroups
-from problem.offline_problem import Problem
+from problem.anytime import TIME_LIMIT
+from problem.matrix_problem import MatrixProblem
+from problem.decomposed_problem import DecomposedProblem
+from problem.profile_problem import MAX_PROFILE_COLUMNS, RowProfileProblem
+from problem.solution_cache import SolutionCache
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from multiprocessing import cpu_count
+
+
+def create_problem(g, ng, r, c, v, cache=None):
+    """
+    Create the solver for the offline problem: the row profile DP for narrow halls, otherwise the sparse ILP built as a matrix.
+
+    :param g: Grid
+    :param ng: List of the group sizes
+    :param r: Number of rows
+    :param c: Number of columns
+    :param v: List of the VIP group sizes
+    :param cache: SolutionCache of the ILP, none by default
+    :return: RowProfileProblem or MatrixProblem
+    """
+    if c <= MAX_PROFILE_COLUMNS:
+        p = RowProfileProblem(g, ng, r, c, v)
+        if p.is_tractable():
+            return p
+    p = MatrixProblem(g, ng, r, c, v)
+    p.cache = cache
+    return p
 
 
 class Offline:
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, decompose=False, time_limit=TIME_LIMIT, gap=0, callback=None, cache=True) -> None:
         """
         Read the input file, create a Problem object then get the solution and print it.
 
         :param filepath: File name
+        :param decompose: If True, solve the independent parts of the grid separately with a DecomposedProblem
+        :param time_limit: Number of seconds after which the best seating found so far is printed
+        :param gap: Stop once the seating is proven to take at least this fraction less than the optimum
+        :param callback: Function that is called with an Incumbent whenever a better seating is found
+        :param cache: If True, look up and store the solution of the ILP in a SolutionCache
         """
         file_input = Input(filepath, "offline")
-        p = Problem(
-            file_input.grid,
-            file_input.groups,
-            file_input.row_nr,
-            file_input.column_nr,
-            file_input.vips,
-        )
-        p.get_solution()
+        if decompose:
+            p = DecomposedProblem(
+                file_input.grid,
+                file_input.groups,
+                file_input.row_nr,
+                file_input.column_nr,
+                file_input.vips,
+            )
+        else:
+            p = create_problem(
+                file_input.grid,
+                file_input.groups,
+                file_input.row_nr,
+                file_input.column_nr,
+                file_input.vips,
+                SolutionCache() if cache else None,
+            )
+        self.incumbent = p.get_solution(time_limit, gap, callback)
         p.output()
 
 
 class Onfline:
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, cache=True) -> None:
         """
         Read the input file, create a Problem object then get the solution and print it.
 
         :param filepath: File name
+        :param cache: If True, look up and store the solution of the ILP in a SolutionCache
         """
         file_input = Input(filepath, "onfline")
-        p = Problem(
+        p = create_problem(
             file_input.grid,
             file_input.groups,
             file_input.row_nr,
             file_input.column_nr,
             file_input.vips,
+            SolutionCache() if cache else None,
         )
         p.get_solution()
         p.output()
-        self.result = p.model.objective.value()
+        self.result = p.get_taken_seats()
 
     def __result__():
         return self.result
 
 
 class Online:
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, cinema_class=Cinema) -> None:
+        """
+        Read the input file and initialize the cinema and the groups from it.
+
+        :param filepath: File name
+        :param cinema_class: Cinema backend to hold the seating state, Cinema or ArrayCinema
+        """
         # Read file
-        file_input = Input(filepath, "online")
+        template = CinemaTemplate.from_file(filepath)
 
         # From file input, initialize cinema and groups object
         try:
-            self.cinema = Cinema(
-                file_input.grid, file_input.row_nr, file_input.column_nr
-            )
-            self.groups = OnlineGroups(file_input.groups)
+            self.cinema = template.build(cinema_class)
+            self.groups = OnlineGroups(list(template.groups))
         except Exception as err:
             raise type(err)(str(err), "filepath:", str(filepath))
 
 
+def solve_balcony(grid, sizes, rows, cols, vips, cache=None):
+    """
+    Solve the problem for one balcony. Runs in a worker process of the balcony problem.
+
+    :param grid: Grid of the balcony
+    :param sizes: List of the group sizes
+    :param rows: Number of rows of the balcony
+    :param cols: Number of columns of the balcony
+    :param vips: List of the VIP group sizes
+    :param cache: SolutionCache, none by default
+    :return: Number of taken seats, the number of used groups per group size and the solved grid
+    """
+    p = MatrixProblem(grid, sizes.copy(), rows, cols, vips)
+    p.cache = cache
+    p.get_solution()
+    p.update_grid()
+    p.update_group_sizes()
+    used = tuple(before - after for before, after in zip(sizes, p.number_of_groups))
+    return p.get_taken_seats(), used, p.grid
+
+
 class BalconyProblem:
-    def __init__(self, filepath) -> None:
+    def __init__(self, filepath, n_jobs=None, cache=True) -> None:
         """
         Read the input file. Then initialize some variables, find a solution and print it.
 
         :param filepath: File name
+        :param n_jobs: Number of processes that solve balconies at the same time, by default the number of cores
+        :param cache: If True, look up and store the solutions of the balconies in a SolutionCache
         """
         file_input = Input(filepath, "offline")
         self.rows = file_input.row_nr
@@ -75,6 +146,10 @@ class BalconyProblem:
         self.grid = file_input.grid
         self.groups = file_input.groups
         self.vips = file_input.vips
+        self.n_jobs = n_jobs or cpu_count()
+        self.pool = None
+        self.solutions = {}
+        self.cache = SolutionCache() if cache else None
 
         start = datetime.now()
 
@@ -92,13 +167,15 @@ class BalconyProblem:
         """
         balcony = self.get_balconies()
         if len(balcony) == 0:
-            p = Problem(self.grid, self.groups, self.rows, self.cols, self.vips)
+            p = MatrixProblem(self.grid, self.groups, self.rows, self.cols, self.vips)
+            p.cache = self.cache
             p.get_solution()
             self.output()
             self.taken = p.get_taken_seats()
 
         else:
-            self.get_best_balcony(balcony, self.groups)
+            with ProcessPoolExecutor(max_workers=min(self.n_jobs, len(balcony))) as self.pool:
+                self.get_best_balcony(balcony, self.groups)
 
     def get_balconies(self):
         """
@@ -142,17 +219,12 @@ class BalconyProblem:
         """
         best_score = 0
         sol_balcony = None
-        for i in balcony:
-            grid_copy = [x[:] for x in self.grid[i.begin : i.end]]
-            p = Problem(grid_copy, sizes.copy(), i.end - i.begin, self.cols, self.vips)
-            p.get_solution()
-            p.update_grid()
-            p.update_group_sizes()
-            grid = p.grid
-            i.seats_taken = p.get_taken_seats()
-            if i.seats_taken > best_score:
-                i.sizes = p.number_of_groups
-                i.grid = grid
+        for i, (seats_taken, used, grid) in zip(balcony, self.solve_balconies(balcony, sizes)):
+            i.seats_taken = seats_taken
+            # The first balcony is kept when no balcony can seat anyone anymore
+            if sol_balcony is None or i.seats_taken > best_score:
+                i.sizes = [size - n for size, n in zip(sizes, used)]
+                i.grid = [row[:] for row in grid]
                 sol_balcony = i
                 best_score = i.seats_taken
         self.update_grid(sol_balcony)
@@ -160,6 +232,40 @@ class BalconyProblem:
         self.taken += best_score
         self.find_best_balcony(balcony, sol_balcony.sizes)
 
+    def solve_balconies(self, balcony, sizes):
+        """
+        Solve the problem for each of the given balconies at the same time in the process pool.
+        A balcony is only solved again if its model changed: the model only depends on the number of groups per group size
+        up to the number of groups of that size that fit in the balcony.
+
+        :param balcony: List of Balconies
+        :param sizes: List of the group sizes
+        :return: List with per balcony the number of taken seats, the number of used groups per group size and the solved grid
+        """
+        keys = [self.get_solution_key(i, sizes) for i in balcony]
+        futures = {}
+        for i, key in zip(balcony, keys):
+            if key not in self.solutions and key not in futures:
+                grid_copy = [x[:] for x in self.grid[i.begin : i.end]]
+                futures[key] = self.pool.submit(
+                    solve_balcony, grid_copy, list(key[2]), i.end - i.begin, self.cols, self.vips, self.cache
+                )
+        for key, future in futures.items():
+            self.solutions[key] = future.result()
+        return [self.solutions[key] for key in keys]
+
+    def get_solution_key(self, i, sizes):
+        """
+        Get the key under which the solution of a balcony is stored.
+
+        :param i: Balcony
+        :param sizes: List of the group sizes
+        :return: Tuple with the first and last row of the balcony and the number of groups per group size that can be used in it
+        """
+        p = MatrixProblem(self.grid[i.begin : i.end], sizes, i.end - i.begin, self.cols, self.vips)
+        budget = tuple(min(n, p.get_max_groups(size + 1)) for size, n in enumerate(sizes))
+        return i.begin, i.end, budget
+
     @staticmethod
     def remove_balcony(bal_list, b):
         """
@@ -194,17 +300,13 @@ class BalconyProblem:
         """
         if len(balcony) == 1:
             i = balcony[0]
-            p = Problem(
-                self.grid[i.begin : i.end], sizes, i.end - i.begin, self.cols, self.vips
-            )
-            p.get_solution()
-            p.update_grid()
-            p.update_group_sizes()
-            grid = p.grid
-            i.grid = grid
+            seats_taken, used, grid = self.solve_balconies(balcony, sizes)[0]
+            for size, n in enumerate(used):
+                sizes[size] -= n
+            i.grid = [row[:] for row in grid]
             self.update_grid(i)
             self.output()
-            self.taken += p.get_taken_seats()
+            self.taken += seats_taken
         else:
             self.get_best_balcony(balcony, sizes)
 
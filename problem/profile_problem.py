@@ -0,0 +1,194 @@
+from functools import lru_cache
+from typing import NamedTuple, Tuple
+import numpy as np
+from problem.anytime import TIME_LIMIT, Progress
+from problem.offline_problem import MAX_GROUP_SIZE
+
+# Halls with at most this many columns can be solved with the row profile DP
+MAX_PROFILE_COLUMNS = 12
+# Maximum number of values that the DP keeps to trace back the seating: per row, the row patterns times the combinations of used groups
+MAX_PROFILE_STATES = 25_000_000
+UNREACHABLE = -1
+
+
+class RowPattern(NamedTuple):
+    """The taken seats of one row"""
+
+    mask: int  # bit column is set if the seat in that column is taken
+    seats: int
+    groups: Tuple[int, ...]  # number of groups per group size
+
+
+@lru_cache(maxsize=None)
+def get_row_patterns(row):
+    """
+    Get every way to seat groups in a row: series of at most eight taken seats, with at least two empty seats in between.
+
+    :param row: Tuple with 0s for no seats, and 1s for seats
+    :return: List of RowPatterns, starting with the empty row
+    """
+    patterns = []
+
+    def extend(col, mask, groups):
+        if col >= len(row):
+            patterns.append(RowPattern(mask, bin(mask).count("1"), groups))
+            return
+        extend(col + 1, mask, groups)
+        for length in range(1, MAX_GROUP_SIZE + 1):
+            if col + length > len(row) or int(row[col + length - 1]) != 1:
+                break
+            # The two positions after the group stay empty
+            extend(
+                col + length + 2,
+                mask | ((1 << length) - 1) << col,
+                groups[: length - 1] + (groups[length - 1] + 1,) + groups[length:],
+            )
+
+    extend(0, 0, (0,) * MAX_GROUP_SIZE)
+    return patterns
+
+
+class RowProfileProblem:
+    """
+    Solves the offline problem exactly with dynamic programming over the rows, without an ILP solver.
+
+    A row only restricts the row directly above and below it, so the best seating of the rows up to a row only depends on
+    the taken seats of that row (its profile) and on the number of groups used so far. Only the group sizes of which
+    more groups fit in the grid than there are, or that have VIPs, need to be counted.
+    This is fast for halls with few columns, because a row then has few patterns.
+    """
+
+    def __init__(self, g, ng, r, c, v):
+        """Initialize variables."""
+        self.grid = g
+        self.number_of_groups = ng
+        self.rows = r
+        self.cols = c
+        self.vips = v
+
+        self.patterns = [get_row_patterns(tuple(self.grid[row])) for row in range(self.rows)]
+        self.tracked = self.get_tracked_sizes()
+        self.shape = tuple(self.number_of_groups[size] + 1 for size in self.tracked)
+        self.chosen = []
+        self.taken = None
+
+    def is_tractable(self):
+        """
+        Check if the DP keeps few enough values. The hall should have at most MAX_PROFILE_COLUMNS columns,
+        otherwise creating the row patterns already takes too long.
+
+        :return: Boolean
+        """
+        return self.get_number_of_states() <= MAX_PROFILE_STATES
+
+    def get_tracked_sizes(self):
+        """
+        Get the group sizes for which the number of used groups has to be counted.
+
+        :return: List of group sizes, starting at 0 for groups of one
+        """
+        tracked = []
+        for size in range(MAX_GROUP_SIZE):
+            fitting = sum(max(pattern.groups[size] for pattern in patterns) for patterns in self.patterns)
+            if self.number_of_groups[size] < fitting or self.vips[size] != 0:
+                tracked.append(size)
+        return tracked
+
+    def get_number_of_states(self):
+        """Return the number of values that the DP keeps for all rows together."""
+        return sum(len(patterns) for patterns in self.patterns) * int(np.prod(self.shape))
+
+    def get_solution(self, time_limit=TIME_LIMIT, gap=0, callback=None):
+        """
+        Solve the DP. It is only used when it is tractable and it finds no seatings before the optimal one,
+        so it does not stop early for the time limit or the gap.
+
+        :param time_limit: Number of seconds that the solve may take
+        :param gap: Fraction of the optimum that the seating may take less
+        :param callback: Function that is called with an Incumbent whenever a better seating is found
+        :return: Incumbent with the optimal seating and its bound
+        """
+        progress = Progress(callback)
+        self.solve()
+        if self.taken != UNREACHABLE:
+            progress.update(seats=self.taken, bound=self.taken)
+        return progress.get_incumbent()
+
+    def solve(self):
+        """Fill in the best number of taken seats row by row, and then trace back the best seating from the last row."""
+        previous_patterns = [RowPattern(0, 0, (0,) * MAX_GROUP_SIZE)]
+        previous_values = np.full((1,) + self.shape, UNREACHABLE, dtype=np.int32)
+        previous_values[(0,) * previous_values.ndim] = 0
+
+        # Per row, for each pattern and number of used groups, the index of the best pattern of the row above
+        backtrack = []
+        for patterns in self.patterns:
+            values = np.full((len(patterns),) + self.shape, UNREACHABLE, dtype=np.int32)
+            best_previous = np.zeros((len(patterns),) + self.shape, dtype=np.int16)
+            for index, pattern in enumerate(patterns):
+                used = [pattern.groups[size] for size in self.tracked]
+                if any(n >= dim for n, dim in zip(used, self.shape)):
+                    continue
+                # Diagonal and vertical neighboors of the taken seats may not be taken in the row above
+                blocked = pattern.mask | pattern.mask << 1 | pattern.mask >> 1
+                compatible = [i for i, previous in enumerate(previous_patterns) if not previous.mask & blocked]
+                stacked = previous_values[compatible]
+                best = stacked.argmax(axis=0)
+                best_values = np.take_along_axis(stacked, best[np.newaxis], axis=0)[0]
+
+                # The groups of the pattern move the values up by their number per group size
+                source = tuple(slice(0, dim - n) for n, dim in zip(used, self.shape))
+                target = (index,) + tuple(slice(n, None) for n in used)
+                reachable = best_values[source] != UNREACHABLE
+                values[target] = np.where(reachable, best_values[source] + pattern.seats, UNREACHABLE)
+                best_previous[target] = np.asarray(compatible)[best[source]]
+            backtrack.append(best_previous)
+            previous_patterns, previous_values = patterns, values
+
+        # Enough VIP groups have to be seated
+        for axis, size in enumerate(self.tracked, start=1):
+            index = [slice(None)] * previous_values.ndim
+            index[axis] = slice(0, self.vips[size])
+            previous_values[tuple(index)] = UNREACHABLE
+
+        position = np.unravel_index(previous_values.argmax(), previous_values.shape)
+        self.taken = int(previous_values[position])
+        if self.taken == UNREACHABLE:
+            self.chosen = []
+            return
+
+        index, used = int(position[0]), list(position[1:])
+        self.chosen = [None] * self.rows
+        for row in range(self.rows - 1, -1, -1):
+            pattern = self.patterns[row][index]
+            self.chosen[row] = pattern
+            index = int(backtrack[row][(index,) + tuple(used)])
+            used = [n - pattern.groups[size] for n, size in zip(used, self.tracked)]
+
+    def update_grid(self):
+        """Update the grid with the found solution by filling in the seats that are taken."""
+        for row in range(self.rows):
+            mask = self.chosen[row].mask if self.chosen else 0
+            for col in range(self.cols):
+                if str(self.grid[row][col]) == "0":
+                    self.grid[row][col] = "0"
+                elif mask >> col & 1:
+                    self.grid[row][col] = "x"
+                else:
+                    self.grid[row][col] = "1"
+
+    def output(self):
+        """Update the grid with the found solution and print the output."""
+        self.update_grid()
+        for r in range(self.rows):
+            print("".join(self.grid[r]))
+
+    def update_group_sizes(self):
+        """Update the list of group sizes."""
+        for pattern in self.chosen:
+            for size in range(MAX_GROUP_SIZE):
+                self.number_of_groups[size] -= pattern.groups[size]
+
+    def get_taken_seats(self):
+        """Return the number of taken seats in the given grid."""
+        return max(self.taken, 0)
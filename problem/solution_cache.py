@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+import numpy as np
+from problem.offline_problem import create_solution, is_feasible
+
+# Folder in which the solutions are stored by default
+CACHE_FOLDER = "cache"
+# Number of bytes that the stored solutions may take together, the least recently used ones are removed first
+MAX_CACHE_SIZE = 64 * 1024 * 1024
+
+# Mirrorings of the grid under which a seating stays valid, each of them is its own inverse
+TRANSFORMS = [
+    lambda grid: grid,
+    lambda grid: grid[:, ::-1],
+    lambda grid: grid[::-1, :],
+    lambda grid: grid[::-1, ::-1],
+]
+
+
+def get_canonical_grid(grid):
+    """
+    Get the orientation of the grid that is the same for all of its mirror images.
+
+    :param grid: Grid, in which "0" or 0 is a cell without a seat
+    :return: Boolean array of the seats in the canonical orientation, and the mirroring that turns the grid into it
+    """
+    seats = np.array([[str(cell) != "0" for cell in row] for row in grid], dtype=bool)
+    transform = min(TRANSFORMS, key=lambda transform: np.packbits(transform(seats)).tobytes())
+    return transform(seats), transform
+
+
+class SolutionCache:
+    """
+    Stores the solutions of offline problems on disk, one JSON file per problem, so that the same hall with the same groups
+    is only solved once. The file name is a hash of the grid in its canonical orientation, the groups and the VIPs.
+    Once the files take more than max_size bytes, the least recently used ones are removed.
+    """
+
+    def __init__(self, folder=CACHE_FOLDER, max_size=MAX_CACHE_SIZE):
+        """
+        Initialize variables.
+
+        :param folder: Folder in which the solutions are stored, created when the first solution is stored
+        :param max_size: Number of bytes that the stored solutions may take together
+        """
+        self.folder = folder
+        self.max_size = max_size
+
+    def get_key(self, p):
+        """
+        Get the canonical description of a problem.
+
+        :param p: Problem
+        :return: Dictionary with the canonical grid, the number of groups and the number of VIP groups per group size,
+            and the mirroring of the grid of the problem that gives the canonical grid
+        """
+        seats, transform = get_canonical_grid(p.grid)
+        key = {
+            "grid": ["".join("1" if seat else "0" for seat in row) for row in seats.tolist()],
+            "groups": [int(n) for n in p.number_of_groups],
+            "vips": [int(n) for n in p.vips],
+        }
+        return key, transform
+
+    def get_path(self, key):
+        """
+        Get the file in which the solution of a problem is stored.
+
+        :param key: Canonical description of the problem
+        :return: File name
+        """
+        digest = hashlib.sha256(json.dumps(key, sort_keys=True).encode()).hexdigest()
+        return os.path.join(self.folder, digest + ".json")
+
+    def get(self, p, gap=0):
+        """
+        Look up the solution of a problem.
+
+        :param p: Problem
+        :param gap: Largest fraction of the bound by which the stored seating may be improved
+        :return: Solution in the orientation of the grid of the problem and the bound on the optimum, or None if not stored
+            or if the stored seating is not valid for the problem
+        """
+        key, transform = self.get_key(p)
+        path = self.get_path(key)
+        try:
+            with open(path) as file:
+                entry = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if entry["key"] != key or entry["bound"] - entry["seats"] > gap * entry["bound"]:
+            return None
+        # Mark the solution as recently used. Another process may have evicted it since it was read
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+
+        taken = np.zeros(p.rows * p.cols, dtype=bool)
+        taken[np.array(entry["taken"], dtype=np.int64) - 1] = True
+        taken = transform(taken.reshape(p.rows, p.cols))
+        keys = np.flatnonzero(taken.ravel()) + 1
+        solution = create_solution(keys, p.rows, p.cols)
+        # A seating that does not fit the problem is solved again, which overwrites it
+        if solution.seats != entry["seats"] or not is_feasible(solution, p.grid, p.number_of_groups, p.vips):
+            return None
+        return solution, entry["bound"]
+
+    def put(self, p, solution, bound):
+        """
+        Store the solution of a problem, and remove the least recently used solutions if the cache is too large.
+
+        :param p: Problem
+        :param solution: Solution in the orientation of the grid of the problem
+        :param bound: Upper bound on the number of taken seats
+        """
+        key, transform = self.get_key(p)
+        taken = transform(solution.taken)
+        entry = {
+            "key": key,
+            "seats": solution.seats,
+            "bound": int(bound),
+            "taken": (np.flatnonzero(taken.ravel()) + 1).tolist(),
+        }
+        os.makedirs(self.folder, exist_ok=True)
+        # Write to a temporary file first, so that other processes never read half a solution
+        fd, temporary = tempfile.mkstemp(dir=self.folder, suffix=".tmp")
+        with os.fdopen(fd, "w") as file:
+            json.dump(entry, file)
+        os.replace(temporary, self.get_path(key))
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used solutions until the cache takes at most max_size bytes."""
+        entries = []
+        for entry in os.scandir(self.folder):
+            if entry.name.endswith(".json"):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                # Already removed by another process
+                pass
+            size -= entry_size
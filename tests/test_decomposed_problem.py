@@ -0,0 +1,49 @@
+"""Randomized checks of DecomposedProblem against MatrixProblem, which solves the whole grid as one ILP.
+
+Run from the root of the project:
+
+    python -m pytest tests
+"""
+import random
+
+import pytest
+
+from problem.decomposed_problem import DecomposedProblem
+from problem.matrix_problem import MatrixProblem
+
+
+def random_hall(rng):
+    """Creates a hall of blocks that are split by empty rows, so that the grid has several components.
+    With gap columns every five columns, no run is longer than four seats, and a VIP group of five or more cannot be seated.
+
+    Returns:
+        tuple: grid, groups, vips, number of rows and number of columns
+    """
+    rows, cols = rng.randint(5, 9), rng.randint(6, 11)
+    gaps = rng.random() < 0.5
+    grid = [
+        "0" * cols if row % 3 == 2 else
+        "".join("0" if (gaps and column % 5 == 4) or rng.random() < 0.15 else "1" for column in range(cols))
+        for row in range(rows)
+    ]
+    groups = [rng.randint(0, 3) for _ in range(8)]
+    vips = [0] * 8
+    size = rng.randrange(8)
+    vips[size] = min(groups[size], 1)
+    return grid, groups, vips, rows, cols
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_same_seats_as_matrix_problem(seed):
+    grid, groups, vips, rows, cols = random_hall(random.Random(seed))
+    matrix = MatrixProblem(grid, groups.copy(), rows, cols, vips)
+    expected = matrix.get_solution()
+    decomposed = DecomposedProblem([list(row) for row in grid], groups.copy(), rows, cols, vips)
+    incumbent = decomposed.get_solution()
+
+    assert decomposed.status == matrix.status
+    assert incumbent.seats == decomposed.get_taken_seats() == expected.seats
+    if matrix.status != "Optimal":
+        # The VIPs cannot be seated
+        assert incumbent.bound is None
+        assert all(seating.seats == 0 for seating in decomposed.chosen)
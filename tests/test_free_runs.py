@@ -0,0 +1,105 @@
+"""Randomized checks of the FreeRunIndex fit queries against a scan through all series of eligible seats.
+
+Run from the root of the project:
+
+    python -m pytest tests
+"""
+import random
+
+import pytest
+
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import Cinema, FreeRunIndex
+
+
+def scan_runs(eligibility):
+    """Returns the series of eligible seats of a grid as (row, column, size), from the top left to the bottom right"""
+    runs = []
+    for row_nr, row in enumerate(eligibility):
+        start = None
+        for column_nr, eligible in enumerate(row + [False]):
+            if eligible and start is None:
+                start = column_nr
+            elif not eligible and start is not None:
+                runs.append((row_nr, start, column_nr - start))
+                start = None
+    return runs
+
+
+def as_tuple(run):
+    return None if run is None else (*run.coordinates, run.size)
+
+
+def build_index(eligibility, column_nr):
+    index = FreeRunIndex(len(eligibility), column_nr)
+    for row_nr, row in enumerate(eligibility):
+        index.update_row(row_nr, row)
+    return index
+
+
+def check_index(index, eligibility, column_nr):
+    runs = scan_runs(eligibility)
+    assert [as_tuple(run) for run in index.get_placement_possibilities()] == runs
+    assert len(index) == len(runs)
+    largest = max(runs, key=lambda run: run[2], default=None)
+    assert as_tuple(index.largest()) == largest
+    for size in range(1, column_nr + 2):
+        fitting = [run for run in runs if run[2] >= size]
+        smallest = min(fitting, key=lambda run: run[2], default=None)
+        assert as_tuple(index.smallest_at_least(size)) == smallest
+        assert as_tuple(index.first_at_least(size)) == (fitting[0] if fitting else None)
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_queries_after_row_updates(seed):
+    rng = random.Random(seed)
+    row_nr, column_nr = rng.randint(1, 10), rng.randint(1, 20)
+    density = rng.random()
+    eligibility = [[rng.random() < density for _ in range(column_nr)] for _ in range(row_nr)]
+    index = build_index(eligibility, column_nr)
+    check_index(index, eligibility, column_nr)
+
+    for _ in range(40):
+        changed = rng.randrange(row_nr)
+        row = eligibility[changed]
+        for _ in range(rng.randint(1, 3)):
+            column = rng.randrange(column_nr)
+            row[column] = not row[column]
+        index.update_row(changed, row.copy())
+        check_index(index, eligibility, column_nr)
+        check_index(build_index(eligibility, column_nr), eligibility, column_nr)
+
+
+@pytest.mark.parametrize("cinema_class", [Cinema, ArrayCinema])
+@pytest.mark.parametrize("seed", range(20))
+def test_queries_after_placements(cinema_class, seed):
+    rng = random.Random(seed)
+    row_nr, column_nr = rng.randint(1, 8), rng.randint(1, 16)
+    grid = [[int(rng.random() < 0.85) for _ in range(column_nr)] for _ in range(row_nr)]
+    cinema = cinema_class(grid, row_nr, column_nr)
+
+    while True:
+        eligibility = cinema.eligible.tolist()
+        check_index(cinema.free_runs, eligibility, column_nr)
+        runs = cinema.get_placement_possibilities()
+        if not runs:
+            break
+        run = rng.choice(runs)
+        size = rng.randint(1, run.size)
+        offset = rng.randint(0, run.size - size)
+        cinema.place_group((run.coordinates[0], run.coordinates[1] + offset), size)
+
+
+def test_copy_is_independent():
+    rng = random.Random(0)
+    eligibility = [[rng.random() < 0.7 for _ in range(12)] for _ in range(6)]
+    index = build_index(eligibility, 12)
+    copy = index.copy()
+    before = [row.copy() for row in eligibility]
+
+    for row_nr in range(6):
+        eligibility[row_nr] = [not eligible for eligible in eligibility[row_nr]]
+        index.update_row(row_nr, eligibility[row_nr])
+
+    check_index(index, eligibility, 12)
+    check_index(copy, before, 12)
@@ -0,0 +1,63 @@
+"""Checks of the seatings that MatrixProblem reads back from CBC when it stops on the time limit.
+
+Run from the root of the project:
+
+    python -m pytest tests
+"""
+import numpy as np
+
+from problem.entities.input import Input
+from problem.matrix_problem import MatrixProblem
+
+
+def check_seating(solution, grid, number_of_groups, vips):
+    """Checks that a seating only takes seats, keeps the groups at corona distance and seats at most the available groups"""
+    taken = solution.taken
+    seats = np.array([[int(cell) == 1 for cell in row] for row in grid])
+    assert not (taken & ~seats).any()
+    # No taken seat directly or diagonally below a taken seat
+    assert not (taken[:-1] & taken[1:]).any()
+    assert not (taken[:-1, :-1] & taken[1:, 1:]).any()
+    assert not (taken[:-1, 1:] & taken[1:, :-1]).any()
+    # Two groups in a row have at least two empty seats between them
+    for row, column, size in solution.placements:
+        assert size <= 8
+        assert not taken[row, column + size + 1:column + size + 2].any()
+    for size, seated in enumerate(solution.groups):
+        assert seated <= number_of_groups[size]
+        # The seating is empty if no seating was found
+        assert seated >= vips[size] or solution.seats == 0
+
+
+def test_read_solution_without_integer_solution(tmp_path):
+    p = MatrixProblem(["1111", "1111"], [2] * 8, 2, 4, [0] * 8)
+    path = tmp_path / "model.sol"
+    path.write_text(
+        "Stopped on time (no integer solution - continuous used) - objective value 6.00000000\n"
+        "      0 C0                     0.5                      0\n"
+        "      1 C1                       1                      0\n"
+    )
+    p.read_solution(path)
+    assert p.status == "Not Solved"
+
+    path.write_text(
+        "Stopped on time - objective value 2.00000000\n"
+        "      0 C0                       1                      0\n"
+        "      1 C1                       1                      0\n"
+    )
+    p.read_solution(path)
+    assert p.status == "Optimal"
+    assert p.get_objective_value() == 2
+
+
+def test_timeout_without_warm_start():
+    # The heuristic cannot seat all VIPs, so CBC has no seating to start from
+    file_input = Input("input/offline_20x20.txt", "offline")
+    vips = [5] * 8
+    for warm_start in (True, False):
+        p = MatrixProblem(file_input.grid, file_input.groups, file_input.row_nr, file_input.column_nr, vips)
+        p.warm_start = warm_start
+        incumbent = p.get_solution(time_limit=2)
+        if p.status != "Optimal":
+            assert incumbent.seats == p.solution.seats == 0
+        check_seating(p.solution, file_input.grid, file_input.groups, vips)
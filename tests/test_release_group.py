@@ -0,0 +1,204 @@
+"""Randomized checks of release_group against a cinema that is rebuilt from the groups that are still seated.
+
+Run from the root of the project:
+
+    python -m pytest tests
+"""
+import random
+
+import numpy as np
+import pytest
+
+from algorithms.online import BestFit
+from problem.entities.array_cinema import ArrayCinema
+from problem.entities.cinema import Cinema
+from problem.entities.positions import Seat
+
+CINEMA_CLASSES = [Cinema, ArrayCinema]
+
+
+def random_grid(rng):
+    row_nr, column_nr = rng.randint(1, 8), rng.randint(1, 14)
+    return [[int(rng.random() < 0.85) for _ in range(column_nr)] for _ in range(row_nr)], row_nr, column_nr
+
+
+def place_random_group(cinema, rng, group_id):
+    """Places a group of random size on random eligible seats
+
+    Returns:
+        tuple: (coordinates, size) of the group, None if no seat is eligible
+    """
+    runs = cinema.get_placement_possibilities()
+    if not runs:
+        return None
+    run = rng.choice(runs)
+    size = rng.randint(1, run.size)
+    coordinates = (run.coordinates[0], run.coordinates[1] + rng.randint(0, run.size - size))
+    cinema.place_group(coordinates, size, group_id)
+    return coordinates, size
+
+
+def get_state(cinema):
+    return (
+        cinema.eligible.tolist(),
+        cinema.blockers.tolist(),
+        [(*run.coordinates, run.size) for run in cinema.get_placement_possibilities()],
+        sorted(cinema.group_seats.items()),
+    )
+
+
+def check_seats(cinema, placed):
+    """Checks the occupancy of the seats with the groups that are seated"""
+    taken = {
+        (coordinates[0], coordinates[1] + n)
+        for coordinates, size in placed.values()
+        for n in range(size)
+    }
+    if isinstance(cinema, Cinema):
+        for row in cinema.seating_grid:
+            for position in row:
+                if isinstance(position, Seat):
+                    assert position.eligible == cinema.eligible[position.get_coordinates()]
+                    assert position.taken == (position.get_coordinates() in taken)
+    else:
+        assert set(zip(*np.nonzero(cinema.taken))) == taken
+
+
+def rebuild(cinema_class, grid, placed, rng):
+    cinema = cinema_class([row.copy() for row in grid], len(grid), len(grid[0]))
+    for group_id, (coordinates, size) in sorted(placed.items(), key=lambda _: rng.random()):
+        cinema.place_group(coordinates, size, group_id)
+    return cinema
+
+
+def eligible_after(grid, eligible, placed):
+    """Returns the eligibility of a cinema with the given eligible seats, after placing the groups"""
+    cinema = ArrayCinema([row.copy() for row in grid], len(grid), len(grid[0]))
+    cinema.load_eligible(eligible)
+    for group_id, (coordinates, size) in placed.items():
+        cinema.place_group(coordinates, size, group_id)
+    return cinema.eligible.tolist()
+
+
+@pytest.mark.parametrize("cinema_class", CINEMA_CLASSES)
+@pytest.mark.parametrize("seed", range(40))
+def test_release_matches_rebuild(cinema_class, seed):
+    rng = random.Random(seed)
+    grid, row_nr, column_nr = random_grid(rng)
+    cinema = cinema_class([row.copy() for row in grid], row_nr, column_nr)
+    placed = {}
+
+    for group_id in range(1, 41):
+        if placed and rng.random() < 0.4:
+            released = rng.choice(list(placed))
+            coordinates, size = placed.pop(released)
+            assert cinema.release_group(released) == tuple((coordinates[0], coordinates[1] + n) for n in range(size))
+        else:
+            placement = place_random_group(cinema, rng, group_id)
+            if placement is not None:
+                placed[group_id] = placement
+
+        assert get_state(cinema) == get_state(rebuild(cinema_class, grid, placed, rng))
+        check_seats(cinema, placed)
+
+
+@pytest.mark.parametrize("cinema_class", CINEMA_CLASSES)
+def test_release_of_unknown_group(cinema_class):
+    cinema = cinema_class([[1, 1, 1]], 1, 3)
+    cinema.place_group((0, 0), 1, 1)
+    with pytest.raises(KeyError):
+        cinema.release_group(2)
+    with pytest.raises(Exception):
+        cinema.place_group((0, 2), 1, 1)
+
+
+@pytest.mark.parametrize("cinema_class", CINEMA_CLASSES)
+@pytest.mark.parametrize("seed", range(20))
+def test_release_after_restore(cinema_class, seed):
+    rng = random.Random(seed)
+    grid, row_nr, column_nr = random_grid(rng)
+    cinema = cinema_class([row.copy() for row in grid], row_nr, column_nr)
+    placed = {}
+    for group_id in range(1, 6):
+        placement = place_random_group(cinema, rng, group_id)
+        if placement is not None:
+            placed[group_id] = placement
+    snapshot = cinema.snapshot()
+    expected = get_state(cinema)
+
+    # The snapshot is restored twice, with groups placed and released in between
+    for _ in range(2):
+        current = dict(placed)
+        for group_id in range(6, 12):
+            placement = place_random_group(cinema, rng, group_id)
+            if placement is not None:
+                current[group_id] = placement
+        for released in rng.sample(list(current), len(current) // 2):
+            cinema.release_group(released)
+            del current[released]
+        assert get_state(cinema) == get_state(rebuild(cinema_class, grid, current, rng))
+
+        cinema.restore(snapshot)
+        assert get_state(cinema) == expected
+        check_seats(cinema, placed)
+
+    for released in list(placed):
+        cinema.release_group(released)
+    assert get_state(cinema) == get_state(rebuild(cinema_class, grid, {}, rng))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_release_after_load_eligible(seed):
+    rng = random.Random(seed)
+    grid, row_nr, column_nr = random_grid(rng)
+    source = ArrayCinema([row.copy() for row in grid], row_nr, column_nr)
+    for group_id in range(1, 4):
+        place_random_group(source, rng, group_id)
+    eligible = source.eligible.copy()
+
+    cinema = ArrayCinema([row.copy() for row in grid], row_nr, column_nr)
+    place_random_group(cinema, rng, 1)
+    cinema.load_eligible(eligible)
+    placed = {}
+    for group_id in range(1, 21):
+        if placed and rng.random() < 0.4:
+            released = rng.choice(list(placed))
+            cinema.release_group(released)
+            del placed[released]
+        else:
+            placement = place_random_group(cinema, rng, group_id)
+            if placement is not None:
+                placed[group_id] = placement
+
+        # Seats that were not eligible when loaded stay unavailable
+        assert not (cinema.eligible & ~eligible).any()
+        expected = np.zeros_like(eligible)
+        for coordinates, size in placed.values():
+            expected[coordinates[0], coordinates[1]:coordinates[1] + size] = True
+        assert (cinema.taken == expected).all()
+        assert cinema.eligible.tolist() == eligible_after(grid, eligible, placed)
+
+
+@pytest.mark.parametrize("cinema_class", CINEMA_CLASSES)
+def test_execute_twice(cinema_class):
+    algorithm = BestFit("input/online/Online5.txt", cinema_class=cinema_class)
+    for _ in range(2):
+        algorithm.set_new_groups([2, 3, 1])
+        algorithm.execute(report=False)
+        assert algorithm.filled_seats == 6
+
+    # Only the groups of the last run can be released, by their number in that run
+    assert sorted(algorithm.cinema.group_seats) == [1, 2, 3]
+    for group_id in range(1, 4):
+        algorithm.release_group(group_id)
+
+
+def test_group_ids_only_hold_seated_groups():
+    cinema = ArrayCinema([[1] * 6 for _ in range(3)], 3, 6)
+    cinema.place_group((2, 2), 3, "seated")
+    for group_id in range(1000):
+        cinema.place_group((0, 0), 2, group_id)
+        assert cinema.get_group_id((0, 1)) == group_id
+        cinema.release_group(group_id)
+    assert len(cinema.group_ids) == 1
+    assert cinema.get_group_id((2, 4)) == "seated"
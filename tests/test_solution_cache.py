@@ -0,0 +1,93 @@
+"""Checks that the SolutionCache only serves seatings that are valid for the problem.
+
+Run from the root of the project:
+
+    python -m pytest tests
+"""
+import json
+import os
+
+from problem.matrix_problem import MatrixProblem
+from problem.offline_problem import create_solution, is_feasible
+from problem.solution_cache import SolutionCache
+
+GRID = ["11111", "11111", "11110"]
+GROUPS = [1, 1, 1, 0, 0, 0, 0, 0]
+VIPS = [0] * 8
+
+
+def create_problem(cache):
+    p = MatrixProblem(GRID, GROUPS.copy(), 3, 5, VIPS)
+    p.cache = cache
+    return p
+
+
+def test_is_feasible():
+    assert is_feasible(create_solution([1, 2, 3, 13], 3, 5), GRID, GROUPS, VIPS)
+    # Seat without a seat under it
+    assert not is_feasible(create_solution([15], 3, 5), GRID, GROUPS, VIPS)
+    # One empty seat between two groups
+    assert not is_feasible(create_solution([1, 3], 3, 5), GRID, GROUPS, VIPS)
+    # Diagonally below a taken seat
+    assert not is_feasible(create_solution([1, 7], 3, 5), GRID, GROUPS, VIPS)
+    # More groups of size 1 than there are
+    assert not is_feasible(create_solution([1, 5], 3, 5), GRID, GROUPS, VIPS)
+    # Fewer VIP groups of size 3 than there are
+    assert not is_feasible(create_solution([1], 3, 5), GRID, GROUPS, [0, 0, 1, 0, 0, 0, 0, 0])
+
+
+def test_stored_solution_is_served(tmp_path):
+    cache = SolutionCache(str(tmp_path))
+    p = create_problem(cache)
+    incumbent = p.get_solution()
+    assert p.status == "Optimal"
+
+    cached = cache.get(create_problem(cache))
+    assert cached is not None
+    solution, bound = cached
+    assert solution.seats == incumbent.seats == bound
+
+
+def test_invalid_entry_is_not_served(tmp_path):
+    cache = SolutionCache(str(tmp_path))
+    p = create_problem(cache)
+    p.get_solution()
+    key, _ = cache.get_key(p)
+    path = cache.get_path(key)
+
+    # Every seat of the first row taken, as rounded from a fractional seating
+    with open(path) as file:
+        entry = json.load(file)
+    entry.update(seats=5, bound=5, taken=[1, 2, 3, 4, 5])
+    with open(path, "w") as file:
+        json.dump(entry, file)
+    assert cache.get(create_problem(cache)) is None
+
+    # The problem is solved again, which overwrites the entry
+    incumbent = create_problem(cache).get_solution()
+    assert cache.get(create_problem(cache))[0].seats == incumbent.seats
+    assert os.path.exists(path)
+
+
+def test_unsolved_problem_is_not_stored(tmp_path):
+    cache = SolutionCache(str(tmp_path))
+    p = create_problem(cache)
+    p.status = "Not Solved"
+    p.warm_start = False
+    # A seating that was not found by CBC is never stored
+    p.run_cbc = lambda log_path, time_limit, gap, warm_start: None
+    p.get_solution()
+    assert not os.listdir(tmp_path)
+
+
+def test_entry_evicted_after_reading_is_a_miss(tmp_path, monkeypatch):
+    cache = SolutionCache(str(tmp_path))
+    create_problem(cache).get_solution()
+
+    # Another process evicts the entry between reading it and marking it as recently used
+    def evicted(path):
+        os.remove(path)
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", evicted)
+    assert cache.get(create_problem(cache)) is None
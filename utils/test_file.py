@@ -17,6 +17,21 @@ def generate_group_sequence(
     return random.choices(sizes, probability, k=n)
 
 
+def generate_group_sequence_from_rng(
+    n: int,
+    rng: random.Random,
+    seq_range: range = range(1, 9),
+    probability: list = [0.2, 0.2, 0.2, 0.1, 0.1, 0.1, 0.05, 0.05],
+):
+    # Same sequence as generate_group_sequence with a seed drawn from rng, but the global random generator is not seeded
+    if len(seq_range) != len(probability):
+        raise ValueError(
+            "number of items in range and probability list does not match.",
+            f"\nRange: {len(seq_range)}\n Prob: {len(probability)}",
+        )
+    return random.Random(rng.random()).choices(list(seq_range), probability, k=n)
+
+
 def generate_group_sequences(
     n_groups: int,
     seq_length: int,